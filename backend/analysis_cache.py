@@ -0,0 +1,83 @@
+"""Content-addressed cache for /analyze results.
+
+Keyed on a hash of the whitespace-normalized resume text plus GEMINI_MODEL, so
+re-uploading the same PDF skips scoring and the Gemini call. Two tiers:
+an in-process LRU (fast, lost on cold start) in front of the
+`analysis_cache` MongoDB collection (shared across workers and serverless
+invocations, expired by a TTL index).
+"""
+import copy
+import hashlib
+from datetime import datetime, timezone, timedelta
+from backend.cache import TTLCache
+from backend.config import GEMINI_MODEL, ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL_SECONDS
+from backend.database import get_db
+
+_memory = TTLCache(ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL_SECONDS)
+_stats = {"mongo_hits": 0, "mongo_misses": 0, "mongo_errors": 0, "stores": 0}
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def cache_key(text: str, model: str = GEMINI_MODEL) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+async def get(text: str):
+    """Return a copy of the cached analysis result for `text`, or None."""
+    key = cache_key(text)
+    result = _memory.get(key)
+    if result is not None:
+        return copy.deepcopy(result)
+
+    db = get_db()
+    if db is None:
+        return None
+    try:
+        doc = await db.analysis_cache.find_one({"_id": key})
+    except Exception as e:
+        _stats["mongo_errors"] += 1
+        print(f"[CACHE] lookup failed: {type(e).__name__}: {e}")
+        return None
+    if doc is None or doc["expires_at"].replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc):
+        # TTL monitor runs about once a minute, so check expiry ourselves
+        _stats["mongo_misses"] += 1
+        return None
+
+    _stats["mongo_hits"] += 1
+    _memory.set(key, doc["result"])
+    return copy.deepcopy(doc["result"])
+
+
+async def put(text: str, result: dict):
+    """Store an analysis result in both tiers."""
+    key = cache_key(text)
+    _memory.set(key, copy.deepcopy(result))
+    _stats["stores"] += 1
+
+    db = get_db()
+    if db is None:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        await db.analysis_cache.replace_one(
+            {"_id": key},
+            {
+                "_id": key,
+                "model": GEMINI_MODEL,
+                "result": result,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ANALYSIS_CACHE_TTL_SECONDS),
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        _stats["mongo_errors"] += 1
+        print(f"[CACHE] store failed: {type(e).__name__}: {e}")
+
+
+def get_stats() -> dict:
+    return {"memory": _memory.stats(), **_stats}
@@ -1,24 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import bcrypt
+from bson import ObjectId
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from backend.config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_MINUTES
+from backend.cache import TTLCache
+from backend.config import (
+    JWT_SECRET,
+    JWT_ALGORITHM,
+    JWT_EXPIRE_MINUTES,
+    AUTH_CACHE_ENABLED,
+    USER_CACHE_TTL_SECONDS,
+    USER_CACHE_MAX_ENTRIES,
+    TOKEN_CACHE_MAX_ENTRIES,
+    BCRYPT_ROUNDS,
+    BCRYPT_WORKERS,
+)
 from backend.database import get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Per-process caches: verified token -> user id (until the token expires),
+# and user id -> user doc (short TTL). Every write to a users doc calls
+# invalidate_user; today that is only the login rehash in routes_auth.
+# Other workers see a change once their USER_CACHE_TTL_SECONDS expires.
+_token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES, ttl=JWT_EXPIRE_MINUTES * 60)
+_user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+
+# bcrypt releases the GIL, so threads run hashes in parallel; the pool size
+# caps how many cores a login burst can take from the rest of the worker.
+_hash_pool = None
+
 
 def hash_password(password: str) -> str:
     pwd_bytes = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode("utf-8")[:72], hashed.encode("utf-8"))
 
 
+def needs_rehash(hashed: str) -> bool:
+    """True if `hashed` was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_pool
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), verify_password, plain, hashed)
+
+
+def shutdown():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False)
+        _hash_pool = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=JWT_EXPIRE_MINUTES))
@@ -26,6 +83,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
+def invalidate_user(user_id: str):
+    """Drop a cached user doc after its role/profile/password changes (this worker only)."""
+    _user_cache.pop(user_id)
+
+
+def get_cache_stats() -> dict:
+    return {"enabled": AUTH_CACHE_ENABLED, "tokens": _token_cache.stats(), "users": _user_cache.stats()}
+
+
+def _decode_token(token: str) -> Optional[str]:
+    """Return the token's user id, or None if invalid/expired. Memoized until expiry."""
+    if AUTH_CACHE_ENABLED:
+        user_id = _token_cache.get(token)
+        if user_id is not None:
+            return user_id
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    if user_id is not None and AUTH_CACHE_ENABLED:
+        _token_cache.set(token, user_id, ttl=payload.get("exp", 0) - time.time())
+    return user_id
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """Decode JWT and return user dict from DB. Raises 401 on failure."""
     credentials_exception = HTTPException(
@@ -33,19 +115,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = _decode_token(token)
+    if user_id is None:
         raise credentials_exception
 
-    db = get_db()
-    from bson import ObjectId
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = _user_cache.get(user_id) if AUTH_CACHE_ENABLED else None
     if user is None:
-        raise credentials_exception
-
-    user["id"] = str(user["_id"])
-    return user
+        db = get_db()
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+        if user is None:
+            raise credentials_exception
+        user["id"] = str(user["_id"])
+        if AUTH_CACHE_ENABLED:
+            _user_cache.set(user_id, user)
+    return dict(user)
@@ -0,0 +1,255 @@
+"""Batch analysis for /analyze/batch: many PDFs (or zips of PDFs) per request.
+
+- extraction and scoring run together in the PDF worker processes, at most
+  a couple of files per worker at a time so no file waits out its timeout
+  in the queue
+- resumes missing from the analysis cache are packed into multi-resume
+  Gemini prompts (BATCH_PROMPT_SIZE / BATCH_PROMPT_CHARS); anything the
+  model leaves out of a grouped reply is retried on its own
+- each group's history documents are written (one insert_many) as soon as
+  the group is done, then its files are yielded with their history ids, so
+  a client that disconnects halfway keeps what finished; a group whose
+  Gemini call fails only fails its own files
+"""
+import asyncio
+import io
+import json
+import time
+import zipfile
+import zlib
+from backend import analysis_cache, llm, pdf_extract, prompts, scoring
+from backend.config import (
+    PDF_MAX_BYTES,
+    PDF_WORKERS,
+    BATCH_MAX_FILES,
+    BATCH_MAX_BYTES,
+    BATCH_PROMPT_SIZE,
+    BATCH_PROMPT_CHARS,
+)
+
+GROUP_RESUME_CHARS = 8000  # per resume, for packing groups up to BATCH_PROMPT_CHARS
+GROUP_RESUME_TOKENS = 2000  # budget per resume inside a grouped prompt (~GROUP_RESUME_CHARS)
+SAVE_BATCH = 50  # cached results written per insert_many
+
+_stats = {"batches": 0, "files": 0, "prompts": 0, "grouped_resumes": 0, "fallback_prompts": 0}
+
+
+def extract_and_score(data: bytes) -> tuple:
+    """Worker-side: PDF text plus its deterministic score."""
+    text = pdf_extract.extract_text(data)
+    return text, scoring.score_resume(text)
+
+
+def _is_zip(filename: str, data: bytes) -> bool:
+    return (filename or "").lower().endswith(".zip") or data[:4] == b"PK\x03\x04"
+
+
+def _check_limits(files: int, total: int):
+    if total > BATCH_MAX_BYTES:
+        raise pdf_extract.PDFExtractionError(
+            f"Batch exceeds the {BATCH_MAX_BYTES // (1024 * 1024)} MB upload limit", status_code=413
+        )
+    if files > BATCH_MAX_FILES:
+        raise pdf_extract.PDFExtractionError(f"Batch is limited to {BATCH_MAX_FILES} resumes", status_code=413)
+
+
+def collect_uploads(files) -> list:
+    """Expand uploads into [(filename, bytes or None, error or None)].
+
+    Raises PDFExtractionError(413) when the request is over the file or byte
+    limits. Zip entries count with their inflated size, checked before each
+    entry is read, so a small archive can't expand past BATCH_MAX_BYTES; an
+    entry that can't be inflated becomes an error item. Blocking (reads and
+    inflates up to BATCH_MAX_BYTES): endpoints call it through
+    `collect_uploads_async`.
+    """
+    items = []
+    total = 0
+    for upload in files:
+        data = pdf_extract.read_upload(upload.file, BATCH_MAX_BYTES)
+        total += len(data)
+        _check_limits(len(items), total)
+        if not _is_zip(upload.filename, data):
+            if len(data) > PDF_MAX_BYTES:
+                items.append((upload.filename, None, "PDF exceeds the upload limit"))
+            else:
+                items.append((upload.filename, data, None))
+            _check_limits(len(items), total)
+            continue
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(data))
+        except zipfile.BadZipFile:
+            items.append((upload.filename, None, "Could not read zip archive"))
+            continue
+        with archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                    continue
+                _check_limits(len(items) + 1, total)
+                if info.file_size > PDF_MAX_BYTES:  # checked before inflating
+                    items.append((name, None, "PDF exceeds the upload limit"))
+                    continue
+                total += info.file_size  # reads stop at the declared size
+                _check_limits(len(items) + 1, total)
+                try:
+                    items.append((name, archive.read(info), None))
+                except (zipfile.BadZipFile, zlib.error, EOFError) as e:  # bad CRC, truncated data
+                    items.append((name, None, f"Could not read zip entry: {type(e).__name__}"))
+                except (RuntimeError, NotImplementedError):  # encrypted, unsupported compression
+                    items.append((name, None, "Zip entry is encrypted or uses an unsupported compression"))
+    return items
+
+
+async def collect_uploads_async(files) -> list:
+    """collect_uploads in a thread, so unzipping a large batch doesn't stall other requests."""
+    return await asyncio.to_thread(collect_uploads, files)
+
+
+async def analyze_group(texts: list) -> list:
+    """Gemini results for several resumes using as few prompts as possible."""
+    from backend import routes_resume  # prompt/parse helpers live with the endpoint
+
+    if len(texts) == 1:
+        _stats["prompts"] += 1
+        return [await routes_resume.analyze_with_gemini(texts[0])]
+
+    _stats["prompts"] += 1
+    _stats["grouped_resumes"] += len(texts)
+    parsed = routes_resume.extract_json_response(await llm.generate(
+        prompts.group_analysis(texts, GROUP_RESUME_TOKENS), endpoint="analyze_batch",
+    ), [])
+    by_index = {}
+    if isinstance(parsed, list):
+        for item in parsed:
+            if isinstance(item, dict) and isinstance(item.get("index"), int):
+                by_index[item.pop("index")] = item
+
+    results = []
+    for i, text in enumerate(texts):
+        if i not in by_index:
+            _stats["fallback_prompts"] += 1
+            by_index[i] = await routes_resume.analyze_with_gemini(text)
+        results.append(by_index[i])
+    return results
+
+
+async def run_batch(db, user: dict, items: list):
+    """Yield one dict per file as it finishes, then a summary with the history ids."""
+    from backend import routes_resume
+
+    _stats["batches"] += 1
+    _stats["files"] += len(items)
+    started = time.perf_counter()
+    out = asyncio.Queue()
+    history_ids = {}  # index -> history id
+    slots = asyncio.Semaphore(max(PDF_WORKERS, 1) * 2)
+
+    async def fail(entries, detail: str):
+        for index, name, *_ in entries:
+            await out.put({"index": index, "filename": name, "status": "error", "detail": detail})
+
+    async def save(entries):
+        """Write (index, name, text, result) entries now, so a disconnect later doesn't lose them."""
+        docs = [await routes_resume.build_history_doc(db, user, name, text, result) for _, name, text, result in entries]
+        try:
+            ids = await routes_resume.save_analyses(db, user, docs)
+        except Exception as e:
+            await fail(entries, f"Could not save: {type(e).__name__}")
+            return
+        for (index, name, _, result), _id in zip(entries, ids):
+            history_ids[index] = _id
+            result["history_id"] = _id
+            await out.put({"index": index, "filename": name, "status": "ok", "score": result["algorithm_score"], "result": result})
+
+    async def extract(index, name, data):
+        async with slots:
+            try:
+                text, scored = await pdf_extract.extract_text_async(data, fn=extract_and_score)
+            except pdf_extract.PDFExtractionError as e:
+                await out.put({"index": index, "filename": name, "status": "error", "detail": str(e)})
+                return None
+        return index, name, text, scored["score"]
+
+    async def run_group(group):
+        try:
+            gemini_results = await analyze_group([text for _, _, text, _ in group])
+            entries = []
+            for (index, name, text, score), gemini_result in zip(group, gemini_results):
+                result = routes_resume.make_result(score, gemini_result)
+                if "raw" not in gemini_result:
+                    await analysis_cache.put(text, result)
+                entries.append((index, name, text, result))
+        except Exception as e:  # only this group's files fail; the others keep going
+            await fail(group, f"Analysis failed: {type(e).__name__}")
+            return
+        await save(entries)
+
+    async def produce():
+        groups = []
+        pending, pending_chars = [], 0
+        cached = []
+        try:
+            tasks = []
+            for index, (name, data, error) in enumerate(items):
+                if error:
+                    await out.put({"index": index, "filename": name, "status": "error", "detail": error})
+                else:
+                    tasks.append(extract(index, name, data))
+            for next_done in asyncio.as_completed(tasks):
+                extracted = await next_done
+                if extracted is None:
+                    continue
+                index, name, text, score = extracted
+                hit = await analysis_cache.get(text)
+                if hit is not None:
+                    cached.append((index, name, text, hit))
+                    if len(cached) >= SAVE_BATCH:
+                        groups.append(asyncio.create_task(save(cached)))
+                        cached = []
+                    continue
+                pending.append(extracted)
+                pending_chars += min(len(text), GROUP_RESUME_CHARS)
+                if len(pending) >= BATCH_PROMPT_SIZE or pending_chars >= BATCH_PROMPT_CHARS:
+                    groups.append(asyncio.create_task(run_group(pending)))
+                    pending, pending_chars = [], 0
+            if pending:
+                groups.append(asyncio.create_task(run_group(pending)))
+            if cached:
+                groups.append(asyncio.create_task(save(cached)))
+        except Exception as e:
+            await out.put({"status": "error", "detail": f"Batch failed: {type(e).__name__}: {e}"})
+        finally:
+            # groups already started finish and save even if the rest of the batch failed
+            await asyncio.gather(*groups, return_exceptions=True)
+            await out.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            line = await out.get()
+            if line is None:
+                break
+            yield line
+        await producer
+
+        elapsed = time.perf_counter() - started
+        yield {
+            "status": "done",
+            "files": len(items),
+            "analyzed": len(history_ids),
+            "history_ids": {str(index): history_ids[index] for index in sorted(history_ids)},
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "files_per_sec": round(len(items) / elapsed, 2) if elapsed else None,
+        }
+    finally:
+        producer.cancel()
+
+
+async def stream_ndjson(db, user: dict, items: list):
+    async for line in run_batch(db, user, items):
+        yield json.dumps(line, default=str) + "\n"
+
+
+def get_stats() -> dict:
+    return dict(_stats)
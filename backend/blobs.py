@@ -0,0 +1,280 @@
+"""Content-addressed, compressed storage for resume text and analysis results.
+
+History documents used to carry up to 20,000 characters of `resume_text`
+and the full `result` dict inline, once per analysis, even when the same
+PDF was analyzed again. Both now live in `resume_blobs`, keyed by hash:
+
+    resume_blobs  {_id: "t:<sha256>" | "r:<sha256>", kind, codec, data,
+                   size, stored, refs, created_at}
+    resumes       {..., text_hash, result_hash}
+
+`data` is zlib-compressed UTF-8 (JSON for results). Result hashes leave out
+`algorithm_score`: the history document's `score` is the source of truth
+and is laid over the result on read, so a rescore never rewrites blobs.
+
+Each history document holds one reference to each of its blobs. Blobs are
+written (refs incremented) before the document that points at them, and
+released after it is deleted; a blob whose refs reach 0 is removed. A
+crash in between can only leave a count too high (a blob kept too long),
+never too low; `--recount` repairs counts while writes are stopped.
+
+    python -m backend.blobs --report
+    python -m backend.blobs --migrate   # move inline text/results of older documents, once after deploying
+    python -m backend.blobs --recount
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from bson import Binary
+from pymongo import UpdateOne
+from backend.config import BLOB_COMPRESSION_LEVEL
+
+TEXT_CHARS = 20000  # stored resume_text cap
+_LOOKUP_BATCH = 1000
+_DECODE_IN_THREAD = 64  # decompress bigger lookups off the event loop
+
+_stats = {"stored": 0, "deduplicated": 0, "released": 0, "deleted": 0, "reads": 0}
+
+
+def text_key(text: str) -> str:
+    return "t:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _result_payload(result: dict) -> str:
+    body = {k: v for k, v in result.items() if k not in ("algorithm_score", "history_id")}
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def result_key(result: dict) -> str:
+    return "r:" + hashlib.sha256(_result_payload(result).encode("utf-8")).hexdigest()
+
+
+def _blob(kind: str, raw: bytes) -> dict:
+    data = zlib.compress(raw, BLOB_COMPRESSION_LEVEL)
+    return {"kind": kind, "codec": "zlib", "data": Binary(data), "size": len(raw), "stored": len(data)}
+
+
+def _decode(doc: dict):
+    raw = zlib.decompress(doc["data"]).decode("utf-8")
+    return raw if doc["kind"] == "text" else json.loads(raw)
+
+
+async def _put(db, blobs: dict, counts: Counter):
+    """Upsert blobs ({key: blob fields}) adding counts[key] references each."""
+    if not counts:
+        return
+    now = datetime.now(timezone.utc)
+    ops = [
+        UpdateOne(
+            {"_id": key},
+            {"$setOnInsert": {**blobs[key], "created_at": now}, "$inc": {"refs": n}},
+            upsert=True,
+        )
+        for key, n in counts.items()
+    ]
+    written = await db.resume_blobs.bulk_write(ops, ordered=False)
+    _stats["stored"] += written.upserted_count
+    _stats["deduplicated"] += sum(counts.values()) - written.upserted_count
+
+
+async def externalize(db, docs: list) -> list:
+    """Move `resume_text`/`result` out of not-yet-inserted history docs into blobs.
+
+    Sets text_hash/result_hash on each doc and returns the texts, in order.
+    """
+    blobs, counts, texts = {}, Counter(), []
+    for doc in docs:
+        text = (doc.pop("resume_text", "") or "")[:TEXT_CHARS]
+        result = doc.pop("result", None) or {}
+        texts.append(text)
+        doc["text_hash"] = key = text_key(text)
+        if key not in blobs:
+            blobs[key] = _blob("text", text.encode("utf-8"))
+        counts[key] += 1
+        doc["result_hash"] = key = result_key(result)
+        if key not in blobs:
+            blobs[key] = _blob("result", _result_payload(result).encode("utf-8"))
+        counts[key] += 1
+    await _put(db, blobs, counts)
+    return texts
+
+
+async def release(db, docs: list):
+    """Drop one reference per blob of each deleted history doc; delete unreferenced blobs."""
+    counts = Counter(doc[field] for doc in docs for field in ("text_hash", "result_hash") if doc.get(field))
+    if not counts:
+        return
+    await db.resume_blobs.bulk_write(
+        [UpdateOne({"_id": key}, {"$inc": {"refs": -n}}) for key, n in counts.items()], ordered=False,
+    )
+    deleted = await db.resume_blobs.delete_many({"_id": {"$in": list(counts)}, "refs": {"$lte": 0}})
+    _stats["released"] += sum(counts.values())
+    _stats["deleted"] += deleted.deleted_count
+
+
+async def _fetch(db, keys) -> dict:
+    """{key: decoded value} for the given blob keys."""
+    keys = list({k for k in keys if k})
+    found = []
+    for i in range(0, len(keys), _LOOKUP_BATCH):
+        chunk = keys[i:i + _LOOKUP_BATCH]
+        found.extend(await db.resume_blobs.find({"_id": {"$in": chunk}}, {"refs": 0, "created_at": 0}).to_list(None))
+    _stats["reads"] += len(found)
+    if len(found) > _DECODE_IN_THREAD:
+        return await asyncio.to_thread(lambda: {d["_id"]: _decode(d) for d in found})
+    return {d["_id"]: _decode(d) for d in found}
+
+
+def _with_score(doc: dict, result: dict) -> dict:
+    if "score" in doc:
+        result["algorithm_score"] = doc["score"]
+    return result
+
+
+async def load_texts(db, docs: list) -> list:
+    """Resume text of each history doc (inline on documents not yet migrated)."""
+    values = await _fetch(db, [d.get("text_hash") for d in docs if "resume_text" not in d])
+    return [d["resume_text"] if "resume_text" in d else values.get(d.get("text_hash"), "") for d in docs]
+
+
+async def load_results(db, docs: list) -> list:
+    """Analysis result of each history doc, with algorithm_score taken from its `score`."""
+    values = await _fetch(db, [d.get("result_hash") for d in docs if "result" not in d])
+    out = []
+    for d in docs:
+        result = d["result"] if "result" in d else values.get(d.get("result_hash"))
+        out.append(_with_score(d, dict(result or {})))
+    return out
+
+
+async def load_text(db, doc: dict) -> str:
+    return (await load_texts(db, [doc]))[0]
+
+
+async def load_result(db, doc: dict) -> dict:
+    return (await load_results(db, [doc]))[0]
+
+
+async def with_results(db, cursor, batch: int = 100):
+    """Yield a cursor's history docs with `result` filled in, looked up `batch` docs at a time."""
+    pending = []
+    async for doc in cursor:
+        pending.append(doc)
+        if len(pending) >= batch:
+            for d, result in zip(pending, await load_results(db, pending)):
+                d["result"] = result
+                yield d
+            pending = []
+    for d, result in zip(pending, await load_results(db, pending)):
+        d["result"] = result
+        yield d
+
+
+# ----- maintenance -----
+
+async def _swap_inline(db, doc: dict) -> bool:
+    """Point one history doc at its blobs; False if another migrator got there first."""
+    updated = await db.resumes.update_one(
+        {"_id": doc["_id"], "text_hash": {"$exists": False}},
+        {"$set": {"text_hash": doc["text_hash"], "result_hash": doc["result_hash"]},
+         "$unset": {"resume_text": "", "result": ""}},
+    )
+    return updated.modified_count == 1
+
+
+async def migrate_documents(db, batch: int = 500) -> dict:
+    """Move inline resume_text/result of existing history docs into blobs.
+
+    Safe to run twice at once: a doc another run already converted gives back
+    the references taken for it.
+    """
+    inline = {"text_hash": {"$exists": False}, "$or": [{"resume_text": {"$exists": True}}, {"result": {"$exists": True}}]}
+    migrated = lost = 0
+    while True:
+        docs = await db.resumes.find(inline, {"resume_text": 1, "result": 1}).limit(batch).to_list(batch)
+        if not docs:
+            break
+        await externalize(db, docs)
+        swapped = await asyncio.gather(*(_swap_inline(db, d) for d in docs))
+        await release(db, [d for d, ok in zip(docs, swapped) if not ok])
+        migrated += sum(swapped)
+        lost += len(docs) - sum(swapped)
+    return {"migrated": migrated, "already_migrated": lost}
+
+
+async def recount(db) -> dict:
+    """Recompute refs from the resumes collection and drop orphans. Run with writes stopped."""
+    counts = Counter()
+    for field in ("text_hash", "result_hash"):
+        async for row in db.resumes.aggregate([
+            {"$match": {field: {"$exists": True}}},
+            {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+        ]):
+            counts[row["_id"]] += row["n"]
+    fixed = 0
+    ops = []
+    async for blob in db.resume_blobs.find({}, {"refs": 1}):
+        if blob.get("refs") != counts.get(blob["_id"], 0):
+            ops.append(UpdateOne({"_id": blob["_id"]}, {"$set": {"refs": counts.get(blob["_id"], 0)}}))
+        if len(ops) >= 1000:
+            fixed += (await db.resume_blobs.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        fixed += (await db.resume_blobs.bulk_write(ops, ordered=False)).modified_count
+    deleted = await db.resume_blobs.delete_many({"refs": {"$lte": 0}})
+    return {"fixed": fixed, "orphans_deleted": deleted.deleted_count}
+
+
+async def storage_report(db) -> dict:
+    """Bytes the blobs would take inline (once per reference) vs. what is stored."""
+    kinds = {}
+    async for row in db.resume_blobs.aggregate([
+        {"$group": {
+            "_id": "$kind",
+            "blobs": {"$sum": 1},
+            "refs": {"$sum": "$refs"},
+            "raw_bytes": {"$sum": "$size"},
+            "stored_bytes": {"$sum": "$stored"},
+            "inline_bytes": {"$sum": {"$multiply": ["$size", "$refs"]}},
+        }},
+    ]):
+        kind = row.pop("_id")
+        row["saved_bytes"] = row["inline_bytes"] - row["stored_bytes"]
+        row["ratio"] = round(row["inline_bytes"] / row["stored_bytes"], 2) if row["stored_bytes"] else None
+        kinds[kind] = row
+    collections = {}
+    for name in ("resumes", "resume_blobs"):
+        stats = await db.command("collStats", name)
+        collections[name] = {k: stats.get(k, 0) for k in ("count", "size", "storageSize", "totalIndexSize")}
+    return {"kinds": kinds, "collections": collections}
+
+
+def get_stats() -> dict:
+    return dict(_stats)
+
+
+async def _main(args):
+    from backend.database import connect_db, close_db, get_db
+
+    await connect_db(migrate=False)
+    try:
+        db = get_db()
+        if args.migrate:
+            print(f"[BLOBS] {await migrate_documents(db)}")
+        if args.recount:
+            print(f"[BLOBS] {await recount(db)}")
+        print(json.dumps(await storage_report(db), indent=2))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--migrate", action="store_true", help="move inline resume_text/result into blobs")
+    parser.add_argument("--recount", action="store_true", help="recompute reference counts (stop writes first)")
+    parser.add_argument("--report", action="store_true", help="print the storage report (always printed)")
+    asyncio.run(_main(parser.parse_args()))
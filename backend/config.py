@@ -1,4 +1,5 @@
 import os
+import socket
 
 # Load .env
 try:
@@ -8,15 +9,102 @@ except ImportError:
     pass
 
 
+# --- Process identity (job and single-flight lease owners) ---
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
 # --- Gemini ---
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "")  # optional override (proxy / local fake)
+
+# --- LLM gateway ---
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))  # in-flight Gemini calls per worker
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "45"))  # per call; Vercel maxDuration is 60
+
+# --- Prompt token budgets (local estimates, see backend/prompts.py) ---
+PROMPT_COMPACTION_ENABLED = os.environ.get("PROMPT_COMPACTION_ENABLED", "1") == "1"
+PROMPT_RESUME_TOKENS = int(os.environ.get("PROMPT_RESUME_TOKENS", "3000"))
+PROMPT_JD_TOKENS = int(os.environ.get("PROMPT_JD_TOKENS", "1500"))
+PROMPT_CONTEXT_TOKENS = int(os.environ.get("PROMPT_CONTEXT_TOKENS", "2000"))  # /career-plan candidate context
+
+# --- Instrumentation ---
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"  # /metrics, Server-Timing, stage histograms
+
+# --- Analysis cache ---
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", "256"))  # in-process LRU tier
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# --- /job-match and /career-plan semantic cache ---
+PROMPT_CACHE_ENABLED = os.environ.get("PROMPT_CACHE_ENABLED", "1") == "1"
+PROMPT_CACHE_MAX_ENTRIES = int(os.environ.get("PROMPT_CACHE_MAX_ENTRIES", "2000"))  # in-process LRU + MinHash index
+PROMPT_CACHE_TTL_SECONDS = int(os.environ.get("PROMPT_CACHE_TTL_SECONDS", str(24 * 3600)))
+PROMPT_CACHE_SIMILARITY = float(os.environ.get("PROMPT_CACHE_SIMILARITY", "0.8"))  # estimated Jaccard of role/JD shingles
+
+# --- Single-flight for duplicate concurrent requests ---
+SINGLEFLIGHT_ENABLED = os.environ.get("SINGLEFLIGHT_ENABLED", "1") == "1"
+SINGLEFLIGHT_MONGO = os.environ.get("SINGLEFLIGHT_MONGO", "0") == "1"  # also coalesce across workers via a lease
+SINGLEFLIGHT_LEASE_SECONDS = int(os.environ.get("SINGLEFLIGHT_LEASE_SECONDS", "90"))  # taken over if not finished by then
+SINGLEFLIGHT_POLL_SECONDS = float(os.environ.get("SINGLEFLIGHT_POLL_SECONDS", "0.25"))
+
+# --- PDF extraction ---
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "2"))  # 0 = extract in a thread instead of processes
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "50"))
+PDF_TIME_BUDGET_SECONDS = float(os.environ.get("PDF_TIME_BUDGET_SECONDS", "10"))
+PDF_TEXT_TARGET_CHARS = int(os.environ.get("PDF_TEXT_TARGET_CHARS", "20000"))  # matches stored resume_text cap
+
+# --- Analytics labels ---
+LABEL_SIMILARITY_THRESHOLD = float(os.environ.get("LABEL_SIMILARITY_THRESHOLD", "0.75"))  # merge near-duplicates at/above
+LABEL_TOPK_CAPACITY = int(os.environ.get("LABEL_TOPK_CAPACITY", "100"))  # Space-Saving counters per label kind
 
 # --- MongoDB ---
 MONGODB_URL = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
 DATABASE_NAME = os.environ.get("DATABASE_NAME", "resume_analyzer")
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "30000"))  # 0 = no timeout
+DB_AUTO_MIGRATE = os.environ.get("DB_AUTO_MIGRATE", "1") == "1"  # apply pending migrations on first connect
 
 # --- JWT Auth ---
 JWT_SECRET = os.environ.get("JWT_SECRET", "change-me-in-production-use-a-long-random-string")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRE_MINUTES = 60 * 24  # 24 hours
+
+# --- Resume ranking ---
+RANK_MAX_DOCS = int(os.environ.get("RANK_MAX_DOCS", "20000"))  # newest resumes indexed per scope
+RANK_INDEX_TTL_SECONDS = float(os.environ.get("RANK_INDEX_TTL_SECONDS", "600"))
+RANK_SHORTLIST = int(os.environ.get("RANK_SHORTLIST", "3"))  # top results reviewed by Gemini
+
+# --- Keyword search ---
+SEARCH_BLOCK_POSTINGS = int(os.environ.get("SEARCH_BLOCK_POSTINGS", "2048"))  # docs per compacted posting block
+SEARCH_MAX_CLAUSES = int(os.environ.get("SEARCH_MAX_CLAUSES", "8"))
+SEARCH_LOCAL_DOCS = int(os.environ.get("SEARCH_LOCAL_DOCS", "200"))  # user-scoped searches up to this many resumes skip the postings
+
+# --- Resume blob storage ---
+BLOB_COMPRESSION_LEVEL = int(os.environ.get("BLOB_COMPRESSION_LEVEL", "6"))  # zlib level for resume_blobs
+
+# --- Batch analysis ---
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "500"))
+BATCH_MAX_BYTES = int(os.environ.get("BATCH_MAX_BYTES", str(200 * 1024 * 1024)))  # whole request, zips included
+BATCH_PROMPT_SIZE = int(os.environ.get("BATCH_PROMPT_SIZE", "5"))  # resumes per grouped Gemini prompt
+BATCH_PROMPT_CHARS = int(os.environ.get("BATCH_PROMPT_CHARS", "32000"))
+
+# --- Async analysis jobs ---
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))  # worker tasks per process
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "180"))  # a job is retried if not finished by then
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", str(24 * 3600)))
+
+# --- Password hashing ---
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))  # hashes at another cost are upgraded on login
+BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# --- Auth caches (per process) ---
+AUTH_CACHE_ENABLED = os.environ.get("AUTH_CACHE_ENABLED", "1") == "1"
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "30"))  # bounds staleness across workers
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "2048"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", "4096"))
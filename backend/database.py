@@ -1,38 +1,127 @@
 import asyncio
+import threading
+import weakref
 from motor.motor_asyncio import AsyncIOMotorClient
-from backend.config import MONGODB_URL, DATABASE_NAME
+from pymongo import monitoring
+from backend import metrics, migrations
+from backend.config import (
+    MONGODB_URL,
+    DATABASE_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    DB_AUTO_MIGRATE,
+)
 
 client: AsyncIOMotorClient = None
 db = None
 _current_loop = None  # track the event loop the client was created on
 
+# A Motor client is bound to the loop it was first used on. Vercel may reuse
+# the process with a NEW event loop, so keep one pooled client per loop
+# instead of tearing down and reconnecting on every loop change.
+_clients = weakref.WeakKeyDictionary()  # loop -> AsyncIOMotorClient
+_schema_checked = False
+_stats = {"clients_created": 0, "loop_switches": 0, "migrations_applied": []}
+_pool_lock = threading.Lock()
+_pool = {"open": 0, "checked_out": 0, "waiting": 0, "checkout_failures": 0, "pools_cleared": 0}
 
-async def connect_db():
+
+class _PoolListener(monitoring.ConnectionPoolListener):
+    """Connection counts across every pooled client, for /debug/health and /metrics.
+
+    Events arrive on driver threads, hence the lock.
+    """
+
+    def _bump(self, **deltas):
+        with _pool_lock:
+            for key, n in deltas.items():
+                _pool[key] += n
+
+    def _ignore(self, event):
+        pass
+
+    pool_created = pool_ready = pool_closed = connection_ready = _ignore
+
+    def pool_cleared(self, event):
+        self._bump(pools_cleared=1)
+
+    def connection_created(self, event):
+        self._bump(open=1)
+
+    def connection_closed(self, event):
+        self._bump(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._bump(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(checked_out=-1)
+
+
+_POOL_LISTENER = _PoolListener()
+
+
+def _new_client() -> AsyncIOMotorClient:
+    _stats["clients_created"] += 1
+    return AsyncIOMotorClient(
+        MONGODB_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS or None,
+        event_listeners=[_POOL_LISTENER, *metrics.mongo_listeners()],
+    )
+
+
+def _close_dead_clients():
+    for loop, stale in list(_clients.items()):
+        if loop.is_closed():
+            try:
+                stale.close()
+            except Exception:
+                pass
+            _clients.pop(loop, None)
+
+
+async def connect_db(migrate: bool = DB_AUTO_MIGRATE):
     """Call on app startup (or lazily on first request in serverless)."""
-    global client, db, _current_loop
-    # Always create a fresh client — Vercel serverless may reuse the process
-    # but with a NEW event loop, making the old Motor client unusable.
-    if client is not None:
-        try:
-            client.close()
-        except Exception:
-            pass
-    client = AsyncIOMotorClient(MONGODB_URL)
+    global client, db, _current_loop, _schema_checked
+    loop = asyncio.get_running_loop()
+    _close_dead_clients()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = _new_client()
+        print(f"[DB] Connected to MongoDB: {DATABASE_NAME}")
     db = client[DATABASE_NAME]
-    _current_loop = asyncio.get_running_loop()
+    _current_loop = loop
 
-    # Create indexes (safe to call repeatedly — MongoDB is idempotent)
-    await db.users.create_index("email", unique=True)
-    await db.resumes.create_index("user_id")
-    await db.resumes.create_index("created_at")
-    print(f"[DB] Connected to MongoDB: {DATABASE_NAME}")
+    if migrate and not _schema_checked:
+        applied = await migrations.migrate(db)
+        _stats["migrations_applied"] += applied
+        _schema_checked = True
+        if applied:
+            print(f"[DB] Applied schema migrations: {applied}")
 
 
 async def close_db():
     """Call on app shutdown."""
     global client, db, _current_loop
+    for pooled in list(_clients.values()):
+        pooled.close()
+    _clients.clear()
     if client:
-        client.close()
         client = None
         db = None
         _current_loop = None
@@ -41,13 +130,29 @@ async def close_db():
 
 async def ensure_db():
     """Ensures DB is connected and the event loop hasn't changed (Vercel serverless fix)."""
-    global _current_loop
     current_loop = asyncio.get_running_loop()
     if db is None or _current_loop is not current_loop:
-        # Event loop changed (Vercel warm restart) or first call — reconnect
+        # Event loop changed (Vercel warm restart) or first call
+        if db is not None:
+            _stats["loop_switches"] += 1
         await connect_db()
 
 
 def get_db():
     """Return the database instance."""
     return db
+
+
+def _pool_snapshot() -> dict:
+    with _pool_lock:
+        return dict(_pool)
+
+
+def get_stats() -> dict:
+    return {
+        **_stats,
+        "live_clients": len(_clients),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "connections": _pool_snapshot(),
+        "schema_version": migrations.SCHEMA_VERSION if _schema_checked else None,
+    }
@@ -0,0 +1,300 @@
+"""Asynchronous /analyze jobs backed by the `analysis_jobs` collection.
+
+POST /analyze?async=1 stores the upload as a queued job and returns its id.
+Workers claim jobs with find_one_and_update and a lease, so any process
+can run them: the app starts JOB_WORKERS tasks per process on first use,
+and a dedicated worker can run alongside it (needed on Vercel, where
+background tasks don't outlive the request):
+
+    python -m backend.jobs --workers 4
+
+Each stage is written to the job document as it completes
+(extracted -> scored -> ai_done -> saved), so the deterministic score is
+visible before the Gemini result. Delivery is at-least-once: a job whose
+lease expires is picked up again. Its history entry is saved under the
+job's own id, so a retry never writes a second one (or counts it twice in
+the leaderboard and rollups).
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone, timedelta
+from bson import Binary, ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from backend import analysis_cache, metrics, pdf_extract, scoring
+from backend.config import (
+    JOB_WORKERS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_TTL_SECONDS,
+    WORKER_ID,
+)
+
+STAGES = ["queued", "extracted", "scored", "ai_done", "saved"]
+
+_workers = []
+_wakeup: asyncio.Event = None
+_current_loop = None
+_listeners = {}  # job id -> asyncio.Event, set when a local worker advances the job
+_stats = {"enqueued": 0, "completed": 0, "failed": 0, "retried": 0}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _event(stage: str, data: dict = None) -> dict:
+    return {"stage": stage, "at": _now(), "data": data or {}}
+
+
+def _notify(job_id):
+    event = _listeners.pop(str(job_id), None)
+    if event is not None:
+        event.set()
+
+
+async def enqueue(db, user: dict, filename: str, data: bytes) -> str:
+    """Queue an uploaded PDF for analysis; returns the job id."""
+    now = _now()
+    doc = {
+        "user": {"id": user["id"], "name": user.get("name", ""), "email": user.get("email", "")},
+        "user_id": user["id"],
+        "filename": filename,
+        "pdf": Binary(data),
+        "status": "queued",
+        "stage": "queued",
+        "events": [_event("queued")],
+        "attempts": 0,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(seconds=JOB_TTL_SECONDS),
+    }
+    inserted = await db.analysis_jobs.insert_one(doc)
+    _stats["enqueued"] += 1
+    ensure_workers()
+    _wakeup.set()
+    return str(inserted.inserted_id)
+
+
+async def get_job(db, job_id: str, user_id: str):
+    try:
+        oid = ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+    return await db.analysis_jobs.find_one({"_id": oid, "user_id": user_id}, {"pdf": 0})
+
+
+def _iso(value):
+    return value.replace(tzinfo=timezone.utc).isoformat() if value else None
+
+
+def public_view(job: dict) -> dict:
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "stage": job["stage"],
+        "filename": job.get("filename", ""),
+        "score": job.get("score"),
+        "breakdown": job.get("breakdown"),
+        "result": job.get("result"),
+        "history_id": job.get("history_id"),
+        "error": job.get("error"),
+        "stages": [{"stage": e["stage"], "at": _iso(e["at"])} for e in job.get("events", [])],
+        "created_at": _iso(job.get("created_at")),
+    }
+
+
+async def wait_for_update(job_id: str, timeout: float):
+    """Return when a local worker advances the job, or after `timeout` (it may run elsewhere)."""
+    event = _listeners.setdefault(job_id, asyncio.Event())
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def stream_events(db, job_id: str, user_id: str, heartbeat: float = 15.0):
+    """SSE frames for each stage the job reaches, ending at done/failed."""
+    sent = 0
+    idle = 0.0
+    try:
+        while True:
+            job = await get_job(db, job_id, user_id)
+            if job is None:
+                return
+            events = job.get("events", [])
+            for e in events[sent:]:
+                payload = {"stage": e["stage"], "at": _iso(e["at"]), **e.get("data", {})}
+                yield f"event: {e['stage']}\ndata: {json.dumps(payload, default=str)}\n\n"
+            if len(events) > sent:
+                sent, idle = len(events), 0.0
+            if job["status"] in ("done", "failed"):
+                return
+            await wait_for_update(job_id, JOB_POLL_INTERVAL_SECONDS)
+            idle += JOB_POLL_INTERVAL_SECONDS
+            if idle >= heartbeat:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+    finally:
+        _listeners.pop(job_id, None)
+
+
+async def _advance(db, job_id, stage: str, fields: dict = None, data: dict = None, unset: dict = None):
+    update = {
+        "$set": {"stage": stage, "updated_at": _now(), **(fields or {})},
+        "$push": {"events": _event(stage, data)},
+    }
+    if unset:
+        update["$unset"] = unset
+    await db.analysis_jobs.update_one({"_id": job_id}, update)
+    _notify(job_id)
+
+
+async def _fail(db, job_id, error: str):
+    _stats["failed"] += 1
+    await _advance(db, job_id, "failed", {"status": "failed", "error": error}, {"error": error}, {"pdf": ""})
+
+
+async def _claim(db):
+    now = _now()
+    return await db.analysis_jobs.find_one_and_update(
+        {"$or": [{"status": "queued"}, {"status": "running", "lease_until": {"$lt": now}}]},
+        {
+            "$set": {"status": "running", "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS), "worker": WORKER_ID},
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def process(db, job: dict):
+    """Run one claimed job through every stage."""
+    from backend import routes_resume  # the analysis helpers live with the endpoint
+
+    job_id = job["_id"]
+    if job["attempts"] > 1:
+        _stats["retried"] += 1
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        await _fail(db, job_id, f"Gave up after {JOB_MAX_ATTEMPTS} attempts")
+        return
+
+    try:
+        text = await pdf_extract.extract_text_async(bytes(job["pdf"]))
+    except pdf_extract.PDFExtractionError as e:
+        await _fail(db, job_id, str(e))
+        return
+    await _advance(db, job_id, "extracted", data={"chars": len(text)})
+
+    with metrics.stage("score"):
+        scored = scoring.score_resume(text)
+    await _advance(
+        db, job_id, "scored",
+        {"score": scored["score"], "breakdown": scored["breakdown"]},
+        {"score": scored["score"], "breakdown": scored["breakdown"]},
+    )
+
+    with metrics.stage("cache"):
+        result = await analysis_cache.get(text)
+    if result is None:
+        result = await routes_resume.build_analysis(text, algorithm_score=scored["score"])
+    await _advance(db, job_id, "ai_done", {"result": result}, {"result": result})
+
+    # the job id doubles as the history id, so a retry after a crash past this point doesn't save twice
+    history_id = await routes_resume.save_analysis(db, job["user"], job["filename"], text, result, history_id=job_id)
+    result["history_id"] = history_id
+    await _advance(
+        db, job_id, "saved",
+        {"status": "done", "history_id": history_id, "result": result},
+        {"history_id": history_id},
+        {"pdf": "", "lease_until": ""},
+    )
+    _stats["completed"] += 1
+
+
+async def _idle(seconds: float):
+    _wakeup.clear()
+    try:
+        await asyncio.wait_for(_wakeup.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _worker_loop(get_db):
+    backoff = JOB_POLL_INTERVAL_SECONDS
+    while True:
+        db = get_db()
+        try:
+            job = await _claim(db) if db is not None else None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # a worker that died here would never be restarted (ensure_workers sees it still listed)
+            print(f"[JOBS] claim failed, retrying in {backoff:.0f}s: {type(e).__name__}: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+            continue
+        backoff = JOB_POLL_INTERVAL_SECONDS
+        if job is None:
+            await _idle(JOB_POLL_INTERVAL_SECONDS * 5)
+            continue
+        try:
+            await process(db, job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[JOBS] job {job['_id']} failed: {type(e).__name__}: {e}")
+            try:
+                await _fail(db, job["_id"], f"{type(e).__name__}: {e}")
+            except Exception as e:  # the lease runs out and the job is retried
+                print(f"[JOBS] could not mark job {job['_id']} failed: {type(e).__name__}: {e}")
+
+
+def ensure_workers(count: int = JOB_WORKERS):
+    """Start this process's worker tasks on the running loop (restarted if the loop changed)."""
+    global _workers, _wakeup, _current_loop
+    from backend.database import get_db
+
+    loop = asyncio.get_running_loop()
+    if _current_loop is loop and _workers:
+        return
+    _wakeup = asyncio.Event()
+    _workers = [loop.create_task(_worker_loop(get_db)) for _ in range(count)]
+    _current_loop = loop
+
+
+async def shutdown():
+    global _workers, _current_loop
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers = []
+    _current_loop = None
+
+
+def get_stats() -> dict:
+    return {**_stats, "workers": len(_workers)}
+
+
+async def _main(args):
+    from backend.database import connect_db, close_db
+
+    await connect_db()
+    ensure_workers(args.workers)
+    print(f"[JOBS] {args.workers} workers running as {WORKER_ID}")
+    try:
+        await asyncio.gather(*_workers)
+    finally:
+        await shutdown()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
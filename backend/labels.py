@@ -0,0 +1,238 @@
+"""Canonicalization of AI-generated labels (weaknesses, missing keywords, strengths).
+
+Gemini phrases the same finding many ways ("Lack of quantified metrics",
+"lack of quantifying metrics.", "Code optimisation" / "code optimization"),
+so labels are mapped to a canonical form when results are written:
+
+1. normalize: lowercase, strip punctuation, drop filler words, light stemming
+2. exact hit on the normalized form (in-process cache, then `label_canon`)
+3. otherwise candidates from `label_canon` through a multikey index on
+   MinHash-LSH band hashes plus whole tokens, verified with `similarity`:
+   tokens are matched one-to-one and only spelling variants count as a
+   match, so a different technology ("Python" / "Java") or an extra
+   qualifier ("Kubernetes" / "Kubernetes certification") keeps labels
+   apart. The first label of a cluster becomes its display form
+
+All labels of one analysis are resolved together: one lookup for exact
+hits, one for candidates and one bulk upsert, whatever the label count.
+
+Counting uses Space-Saving, so memory for top-k stays bounded no matter
+how many distinct labels appear.
+"""
+import re
+import zlib
+from pymongo import UpdateOne
+from backend.cache import TTLCache
+from backend.config import LABEL_SIMILARITY_THRESHOLD
+
+LABEL_FIELDS = {"weakness": "weaknesses", "keyword": "missing_keywords", "strength": "strengths"}
+MAX_LABEL_LENGTH = 200
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_FILLER = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "with", "is", "are", "be",
+    "no", "not", "any", "some", "more", "your", "resume", "lack", "lacks", "lacking", "missing",
+}
+_SUFFIXES = [
+    ("ification", "ify"), ("ifiable", "ify"), ("ified", "ify"), ("ifies", "ify"),
+    ("ations", ""), ("ation", ""), ("ments", ""), ("ment", ""), ("ings", ""), ("ing", ""),
+    ("ies", "y"), ("ied", "y"), ("able", ""), ("ed", ""), ("es", ""), ("s", ""), ("ly", ""),
+]
+
+_NUM_PERM = 32
+_ROWS_PER_BAND = 2  # 16 bands: candidates down to ~0.25 shingle Jaccard, then verified exactly
+_PRIME = (1 << 61) - 1
+_PERMS = [((i * 0x9E3779B1 + 1) % _PRIME, (i * 0x85EBCA77 + 7) % _PRIME) for i in range(1, _NUM_PERM + 1)]
+
+_TOKEN_VARIANT = 0.5  # trigram Jaccard at which two differing tokens are spellings of one word
+_CANDIDATES_PER_LABEL = 100
+
+_cache = TTLCache(max_entries=4096, ttl=3600)  # (kind, normalized) -> display label
+
+
+def iter_labels(result: dict):
+    """Yield (kind, label) pairs from an analysis result."""
+    for kind, field in LABEL_FIELDS.items():
+        values = result.get(field)
+        if not isinstance(values, list):
+            continue
+        for label in values:
+            if not isinstance(label, str):
+                continue
+            label = label.strip()[:MAX_LABEL_LENGTH]
+            if label:
+                yield kind, label
+
+
+def stem(token: str) -> str:
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)] + replacement
+    return token
+
+
+def normalize(label: str) -> list:
+    """Sorted, de-duplicated stemmed tokens with filler words removed."""
+    return sorted({stem(t) for t in _TOKEN_RE.findall(label.lower()) if t not in _FILLER})
+
+
+def _trigrams(tokens: list) -> set:
+    s = f" {' '.join(tokens)} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    union = a | b
+    return len(a & b) / len(union) if union else 1.0
+
+
+def similarity(tokens_a: list, tokens_b: list) -> float:
+    """Share of tokens matched one-to-one between two normalized labels.
+
+    Equal tokens count 1; a differing token counts its trigram Jaccard with
+    its closest unmatched counterpart if that reaches _TOKEN_VARIANT
+    (spelling variants, typos), else 0. Divided by the longer label's length,
+    so a token with no counterpart at all pulls the score down.
+    """
+    a, b = set(tokens_a), set(tokens_b)
+    if not a and not b:
+        return 1.0
+    score = len(a & b)
+    rest = [(t, _trigrams([t])) for t in sorted(b - a)]
+    for token in sorted(a - b):
+        grams = _trigrams([token])
+        best, best_sim = None, 0.0
+        for i, (_, other) in enumerate(rest):
+            sim = _jaccard(grams, other)
+            if sim > best_sim:
+                best, best_sim = i, sim
+        if best is not None and best_sim >= _TOKEN_VARIANT:
+            score += best_sim
+            rest.pop(best)
+    return score / max(len(a), len(b))
+
+
+def index_keys(tokens: list) -> list:
+    """MinHash band keys over trigrams + whole tokens, plus one key per token.
+
+    crc32 rather than hash() so keys are stable across processes.
+    """
+    shingles = _trigrams(tokens) | {f"w:{t}" for t in tokens}
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+    bands = [
+        f"b{i}:{zlib.crc32(repr(signature[i:i + _ROWS_PER_BAND]).encode())}"
+        for i in range(0, _NUM_PERM, _ROWS_PER_BAND)
+    ]
+    return bands + [f"t:{t}" for t in tokens]
+
+
+def _display(label: str) -> str:
+    label = label.strip(" .;:,-")
+    return label[:1].upper() + label[1:]
+
+
+def _best_match(tokens: list, candidates: list):
+    """Display label of the most similar candidate at/above the threshold, or None."""
+    best, best_sim = None, 0.0
+    for cand in candidates:
+        sim = similarity(tokens, cand["tokens"])
+        if sim > best_sim:
+            best, best_sim = cand, sim
+    return best["label"] if best is not None and best_sim >= LABEL_SIMILARITY_THRESHOLD else None
+
+
+async def canonicalize_many(db, pairs: list) -> list:
+    """Canonical display label for each (kind, label) pair, None for labels without content."""
+    out = [None] * len(pairs)
+    pending = {}  # doc id -> (kind, tokens, label, [positions])
+    for pos, (kind, label) in enumerate(pairs):
+        tokens = normalize(label)
+        if not tokens:
+            continue
+        cached = _cache.get((kind, " ".join(tokens)))
+        if cached is not None:
+            out[pos] = cached
+            continue
+        entry = pending.setdefault(f"{kind}:{' '.join(tokens)}", (kind, tokens, label, []))
+        entry[3].append(pos)
+    if not pending:
+        return out
+
+    resolved = {}  # doc id -> display label
+    async for doc in db.label_canon.find({"_id": {"$in": list(pending)}}, {"label": 1}):
+        resolved[doc["_id"]] = doc["label"]
+
+    missing = [doc_id for doc_id in pending if doc_id not in resolved]
+    if missing:
+        keys = {doc_id: index_keys(pending[doc_id][1]) for doc_id in missing}
+        by_kind = {}
+        for doc_id in missing:
+            by_kind.setdefault(pending[doc_id][0], set()).update(keys[doc_id])
+        candidates = {kind: [] for kind in by_kind}
+        query = {"$or": [{"kind": kind, "keys": {"$in": sorted(k)}} for kind, k in by_kind.items()]}
+        projection = {"kind": 1, "tokens": 1, "label": 1}
+        async for cand in db.label_canon.find(query, projection).limit(_CANDIDATES_PER_LABEL * len(missing)):
+            candidates[cand["kind"]].append(cand)
+
+        ops = []
+        for doc_id in missing:
+            kind, tokens, label, _ = pending[doc_id]
+            display = _best_match(tokens, candidates[kind]) or _display(label)
+            resolved[doc_id] = display
+            # later labels of this analysis can match this one, as they would across analyses
+            candidates[kind].append({"tokens": tokens, "label": display})
+            # the alias is indexed too, so later variants can match through it
+            ops.append(UpdateOne(
+                {"_id": doc_id},
+                {"$setOnInsert": {"kind": kind, "tokens": tokens, "keys": keys[doc_id], "label": display}},
+                upsert=True,
+            ))
+        await db.label_canon.bulk_write(ops, ordered=False)
+
+    for doc_id, (kind, tokens, _, positions) in pending.items():
+        _cache.set((kind, " ".join(tokens)), resolved[doc_id])
+        for pos in positions:
+            out[pos] = resolved[doc_id]
+    return out
+
+
+async def canonicalize(db, kind: str, label: str):
+    """Return the canonical display label for `label`, or None if it has no content."""
+    return (await canonicalize_many(db, [(kind, label)]))[0]
+
+
+async def canonicalize_result(db, result: dict) -> dict:
+    """{kind: [canonical labels]} for an analysis result, de-duplicated per kind."""
+    pairs = list(iter_labels(result))
+    out = {kind: [] for kind in LABEL_FIELDS}
+    for (kind, _), canonical in zip(pairs, await canonicalize_many(db, pairs)):
+        if canonical and canonical not in out[kind]:
+            out[kind].append(canonical)
+    return out
+
+
+class SpaceSaving:
+    """Metwally et al. Space-Saving top-k: at most `capacity` counters.
+
+    A counter's `count` overestimates the true frequency by at most its `error`.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters = {}  # item -> [count, error]
+
+    def add(self, item, count: int = 1):
+        entry = self.counters.get(item)
+        if entry is not None:
+            entry[0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            victim = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[item] = [floor + count, floor]
+
+    def top(self, n: int) -> list:
+        ranked = sorted(self.counters.items(), key=lambda kv: -kv[1][0])[:n]
+        return [{"label": item, "count": c, "error": e} for item, (c, e) in ranked]
@@ -0,0 +1,140 @@
+"""Materialized leaderboard: one `leaderboard` document per user.
+
+Fields: best_score, analyses, last_analyzed and the denormalized name/email.
+`record_analysis` updates a row atomically with a single upsert, deletes
+recompute only the affected user's row, and reads go through the
+(best_score, analyses, last_analyzed) index, so /leaderboard never touches
+the resumes collection.
+
+Backfill / repair:  python -m backend.leaderboard --rebuild
+"""
+import argparse
+import asyncio
+from backend.database import connect_db, close_db, get_db
+
+SORT = [("best_score", -1), ("analyses", -1), ("last_analyzed", -1)]
+
+
+def _display_name(row: dict) -> str:
+    email = row.get("email", "")
+    return row.get("name") or (email.split("@")[0].title() if email else "User")
+
+
+def to_entry(row: dict, rank: int) -> dict:
+    return {
+        "rank": rank,
+        "user_id": row["_id"],
+        "name": _display_name(row),
+        "email": row.get("email", ""),
+        "best_score": int(row.get("best_score", 0)),
+        "analyses": int(row.get("analyses", 0)),
+    }
+
+
+async def record_analysis(db, user: dict, score: int, created_at, count: int = 1):
+    """Fold new analyses into the user's row (`count` > 1 for a batch with best `score`)."""
+    await db.leaderboard.update_one(
+        {"_id": user["id"]},
+        {
+            "$max": {"best_score": score, "last_analyzed": created_at},
+            "$inc": {"analyses": count},
+            "$set": {"name": user.get("name", ""), "email": user.get("email", "")},
+        },
+        upsert=True,
+    )
+
+
+async def refresh_user(db, user_id: str):
+    """Recompute one user's row from their resumes (after a delete)."""
+    rows = await db.resumes.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {
+            "_id": "$user_id",
+            "best_score": {"$max": "$score"},
+            "analyses": {"$sum": 1},
+            "last_analyzed": {"$max": "$created_at"},
+        }},
+    ]).to_list(1)
+    if not rows:
+        await db.leaderboard.delete_one({"_id": user_id})
+        return
+    row = rows[0]
+    await db.leaderboard.update_one(
+        {"_id": user_id},
+        {"$set": {
+            "best_score": row["best_score"],
+            "analyses": row["analyses"],
+            "last_analyzed": row["last_analyzed"],
+        }},
+    )
+
+
+async def top(db, limit: int = 10) -> list:
+    rows = await db.leaderboard.find().sort(SORT).limit(limit).to_list(limit)
+    return [to_entry(row, idx) for idx, row in enumerate(rows, start=1)]
+
+
+async def rank_of(db, user_id: str):
+    """Return the user's leaderboard entry, or None if they have no analyses.
+
+    Rank = 1 + number of rows strictly ahead in sort order; each $or branch is
+    an index range count, so no user documents are fetched.
+    """
+    row = await db.leaderboard.find_one({"_id": user_id})
+    if row is None:
+        return None
+    best, analyses, last = row.get("best_score", 0), row.get("analyses", 0), row.get("last_analyzed")
+    ahead = await db.leaderboard.count_documents({"$or": [
+        {"best_score": {"$gt": best}},
+        {"best_score": best, "analyses": {"$gt": analyses}},
+        {"best_score": best, "analyses": analyses, "last_analyzed": {"$gt": last}},
+    ]})
+    return to_entry(row, ahead + 1)
+
+
+async def rebuild(db):
+    """Regenerate the whole collection from resumes + users ($out keeps indexes)."""
+    await db.resumes.aggregate([
+        {"$group": {
+            "_id": "$user_id",
+            "best_score": {"$max": "$score"},
+            "analyses": {"$sum": 1},
+            "last_analyzed": {"$max": "$created_at"},
+        }},
+        {"$lookup": {
+            "from": "users",
+            "let": {"uid": {"$convert": {"input": "$_id", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$uid"]}}},
+                {"$project": {"name": 1, "email": 1}},
+            ],
+            "as": "user",
+        }},
+        {"$set": {
+            "name": {"$ifNull": [{"$first": "$user.name"}, ""]},
+            "email": {"$ifNull": [{"$first": "$user.email"}, ""]},
+        }},
+        {"$unset": "user"},
+        {"$out": "leaderboard"},
+    ]).to_list(None)
+    return await db.leaderboard.count_documents({})
+
+
+async def _main(args):
+    await connect_db()
+    try:
+        if args.rebuild:
+            count = await rebuild(get_db())
+            print(f"[LEADERBOARD] rebuilt {count} rows")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the leaderboard from resumes")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+    else:
+        asyncio.run(_main(args))
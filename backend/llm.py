@@ -0,0 +1,164 @@
+"""Async gateway for Gemini calls.
+
+All model calls go through `generate()` (or `generate_stream()` for callers
+that show output as it arrives), which uses the SDK's async client so the
+event loop is never blocked, caps the number of in-flight requests per
+worker and applies a per-call timeout.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from backend import metrics, prompts
+from backend.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_BASE_URL,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SECONDS,
+)
+
+_client = None  # google.genai.Client, built on the first call (the SDK takes ~0.3s to import)
+_semaphore: asyncio.Semaphore = None
+_current_loop = None  # same Vercel caveat as database.py: a new loop needs new primitives
+
+_stats = {
+    "in_flight": 0,
+    "queued": 0,
+    "max_queued": 0,
+    "completed": 0,
+    "streamed": 0,
+    "timeouts": 0,
+    "errors": 0,
+}
+_tokens_in = {}  # endpoint -> {"calls", "tokens"} (estimated)
+
+
+class LLMTimeoutError(Exception):
+    """Raised when a Gemini call exceeds LLM_TIMEOUT_SECONDS."""
+
+
+def _build_client():
+    from google import genai
+    from google.genai import types
+
+    http_options = types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None
+    return genai.Client(api_key=GEMINI_API_KEY, http_options=http_options)
+
+
+def preload():
+    """Import the SDK ahead of the first call. For long-running servers only:
+    on Vercel the lifespan never runs, so cold starts keep the import lazy."""
+    from google import genai  # noqa: F401
+
+
+def _ensure_loop_state():
+    """(Re)create the client and semaphore if the running event loop changed."""
+    global _client, _semaphore, _current_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _current_loop is not loop:
+        _client = _build_client()
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _current_loop = loop
+
+
+def _record_tokens(endpoint: str, prompt: str):
+    entry = _tokens_in.setdefault(endpoint, {"calls": 0, "tokens": 0})
+    entry["calls"] += 1
+    entry["tokens"] += prompts.estimate_tokens(prompt)
+
+
+@asynccontextmanager
+async def _slot():
+    """Hold one of the LLM_MAX_CONCURRENCY slots, waiting for it if needed."""
+    _stats["queued"] += 1
+    _stats["max_queued"] = max(_stats["max_queued"], _stats["queued"])
+    try:
+        with metrics.stage("llm_queue"):
+            await _semaphore.acquire()
+    finally:
+        _stats["queued"] -= 1
+
+    _stats["in_flight"] += 1
+    try:
+        yield
+    finally:
+        _stats["in_flight"] -= 1
+        _semaphore.release()
+
+
+async def generate(
+    prompt: str, model: str = GEMINI_MODEL, timeout: float = LLM_TIMEOUT_SECONDS, endpoint: str = "other",
+) -> str:
+    """Send `prompt` to Gemini and return the response text ("" if empty).
+
+    Waits for a free slot when LLM_MAX_CONCURRENCY calls are already running.
+    The timeout covers only the model call, not the time spent queued.
+    Estimated prompt tokens are counted under `endpoint`.
+    """
+    _ensure_loop_state()
+    _record_tokens(endpoint, prompt)
+    async with _slot():
+        try:
+            with metrics.stage("llm"):
+                response = await asyncio.wait_for(
+                    _client.aio.models.generate_content(model=model, contents=prompt),
+                    timeout=timeout,
+                )
+            _stats["completed"] += 1
+            return response.text or ""
+        except asyncio.TimeoutError:
+            _stats["timeouts"] += 1
+            raise LLMTimeoutError(f"Gemini call exceeded {timeout}s")
+        except Exception:
+            _stats["errors"] += 1
+            raise
+
+
+async def _next_chunk(stream, deadline: float):
+    try:
+        return await asyncio.wait_for(stream.__anext__(), max(0.0, deadline - asyncio.get_running_loop().time()))
+    except StopAsyncIteration:
+        return None
+
+
+async def generate_stream(
+    prompt: str, model: str = GEMINI_MODEL, timeout: float = LLM_TIMEOUT_SECONDS, endpoint: str = "other",
+):
+    """Like generate(), but yields the response text in chunks as Gemini produces it.
+
+    The timeout covers the whole stream. Closing the generator early (the
+    client went away) releases the slot.
+    """
+    _ensure_loop_state()
+    _record_tokens(endpoint, prompt)
+    async with _slot():
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            with metrics.stage("llm"):
+                with metrics.stage("llm_first_chunk"):
+                    stream = await asyncio.wait_for(
+                        _client.aio.models.generate_content_stream(model=model, contents=prompt),
+                        timeout=timeout,
+                    )
+                    chunk = await _next_chunk(stream, deadline)
+                while chunk is not None:
+                    if chunk.text:
+                        yield chunk.text
+                    chunk = await _next_chunk(stream, deadline)
+            _stats["completed"] += 1
+            _stats["streamed"] += 1
+        except asyncio.TimeoutError:
+            _stats["timeouts"] += 1
+            raise LLMTimeoutError(f"Gemini stream exceeded {timeout}s")
+        except Exception:
+            _stats["errors"] += 1
+            raise
+
+
+def get_stats() -> dict:
+    """Snapshot of gateway counters (queue depth, in-flight calls, outcomes)."""
+    return {
+        **_stats,
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "timeout_seconds": LLM_TIMEOUT_SECONDS,
+        "tokens_in": {endpoint: dict(entry) for endpoint, entry in _tokens_in.items()},
+    }
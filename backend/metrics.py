@@ -0,0 +1,203 @@
+"""Latency histograms for request stages, routes and MongoDB commands.
+
+Three histogram families, exported in Prometheus text format at /metrics:
+
+    resume_analyzer_stage_seconds{stage}                 extract, score, cache, llm_queue, llm, db_write
+    resume_analyzer_request_seconds{method,route,status}  until the response headers are sent
+    resume_analyzer_mongo_command_seconds{command,collection,outcome}
+
+Stages are timed with `with metrics.stage("extract"): ...` wherever the
+work happens (request handlers and job workers alike). Mongo commands are
+timed by a pymongo command listener; Motor runs commands in a thread with
+the caller's context copied, so they are attributed to the right request.
+Each HTTP response carries a Server-Timing header with that request's
+stages, its Mongo time and the total.
+
+With METRICS_ENABLED=0, `stage()` returns a shared no-op context manager,
+the middleware and command listener are not installed and /metrics is 404.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import nullcontext
+from pymongo import monitoring
+from backend.config import METRICS_ENABLED
+
+ENABLED = METRICS_ENABLED
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_FAMILIES = {  # kind -> (metric name, label names, help)
+    "stage": ("resume_analyzer_stage_seconds", ("stage",), "Time spent in one stage of a request or job."),
+    "route": ("resume_analyzer_request_seconds", ("method", "route", "status"),
+              "HTTP request latency until the response headers are sent."),
+    "mongo": ("resume_analyzer_mongo_command_seconds", ("command", "collection", "outcome"),
+              "MongoDB command latency as seen by the driver."),
+}
+
+# (kind, label values) -> per-bucket counts (last one is +Inf), then the sum
+_series = {}
+_lock = threading.Lock()  # Mongo commands are observed from Motor's executor threads
+_timings = contextvars.ContextVar("server_timing", default=None)  # list of (name, seconds) per request
+_NOOP = nullcontext()
+
+
+def observe(kind: str, labels: tuple, seconds: float):
+    i = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        row = _series.get((kind, labels))
+        if row is None:
+            row = _series[(kind, labels)] = [0] * (len(BUCKETS) + 1) + [0.0]
+        row[i] += 1
+        row[-1] += seconds
+
+
+def _note(name: str, seconds: float):
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        observe("stage", (self.name,), elapsed)
+        _note(self.name, elapsed)
+        return False
+
+
+def stage(name: str):
+    """Context manager timing one stage (failures included)."""
+    return _Stage(name) if ENABLED else _NOOP
+
+
+# ----- HTTP -----
+
+def server_timing(timings: list, total: float) -> str:
+    merged = {}  # name -> [seconds, count], in first-seen order
+    for name, seconds in timings:
+        entry = merged.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = []
+    for name, (seconds, count) in merged.items():
+        part = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="{count}x"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+async def http_middleware(request, call_next):
+    """Route histogram + Server-Timing header (installed only when enabled)."""
+    timings = []
+    token = _timings.set(timings)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - t0
+        _timings.reset(token)
+        route = request.scope.get("route")
+        # the route template, never the raw path, keeps label cardinality bounded
+        observe("route", (request.method, getattr(route, "path", "unmatched"), str(status)), elapsed)
+    response.headers["Server-Timing"] = server_timing(timings, elapsed)
+    return response
+
+
+# ----- MongoDB -----
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every driver command, labelled with its collection."""
+
+    def __init__(self):
+        self._pending = {}  # (connection id, request id) -> collection
+
+    def started(self, event):
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        self._done(event, "ok")
+
+    def failed(self, event):
+        self._done(event, "error")
+
+    def _done(self, event, outcome: str):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        observe("mongo", (event.command_name, collection, outcome), seconds)
+        _note("mongo", seconds)
+
+
+def mongo_listeners() -> list:
+    return [CommandTimer()] if ENABLED else []
+
+
+# ----- exposition -----
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _gauges() -> list:
+    from backend import database, llm  # database imports this module for its listeners
+
+    pool = database.get_stats()["connections"]
+    gateway = llm.get_stats()
+    return [
+        ("resume_analyzer_llm_in_flight", "Gemini calls running now.", [((), gateway["in_flight"])]),
+        ("resume_analyzer_llm_queued", "Gemini calls waiting for a slot.", [((), gateway["queued"])]),
+        ("resume_analyzer_mongo_connections", "MongoDB pool connections by state.",
+         [((("state", state),), pool[state]) for state in ("open", "checked_out", "waiting")]),
+    ]
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        snapshot = {key: list(row) for key, row in _series.items()}
+    lines = []
+    for kind, (name, label_names, help_text) in _FAMILIES.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (k, values), row in sorted(snapshot.items()):
+            if k != kind:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), row[:-1]):
+                cumulative += count
+                le = bound if isinstance(bound, str) else repr(bound)
+                bucket = _labels(label_names, values, f'le="{le}"')
+                lines.append(f"{name}_bucket{bucket} {cumulative}")
+            lines.append(f"{name}_sum{_labels(label_names, values)} {row[-1]:.6f}")
+            lines.append(f"{name}_count{_labels(label_names, values)} {cumulative}")
+    for name, help_text, samples in _gauges():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for pairs, value in samples:
+            names, values = tuple(p[0] for p in pairs), tuple(p[1] for p in pairs)
+            lines.append(f"{name}{_labels(names, values)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def get_stats() -> dict:
+    with _lock:
+        return {"enabled": ENABLED, "series": len(_series)}
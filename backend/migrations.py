@@ -0,0 +1,126 @@
+"""Versioned schema migrations (indexes and data moves) with a marker document.
+
+The applied version lives in `schema_migrations` ({"_id": "schema"}). On
+the first connection in a process, connect_db reads that one document and
+only runs the steps above it, so warm starts don't pay for create_index
+round trips. Add new indexes as a new step at the end of MIGRATIONS; never
+edit a step that has shipped. Steps run inside a request on serverless and
+may race across workers, so they are limited to (idempotent) index
+creation; data moves are CLI commands, e.g. `python -m backend.blobs
+--migrate`.
+
+    python -m backend.migrations            # apply pending steps
+    python -m backend.migrations --status
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+MARKER_ID = "schema"
+
+
+async def _v1_base_indexes(db):
+    await db.users.create_index("email", unique=True)
+    await db.resumes.create_index("user_id")
+    await db.resumes.create_index("created_at")
+
+
+async def _v2_admin_listing_indexes(db):
+    await db.users.create_index([("created_at", -1), ("_id", -1)])
+    await db.users.create_index([("name", 1), ("_id", 1)])
+    await db.resumes.create_index([("score", -1), ("_id", -1)])
+
+
+async def _v3_analytics_indexes(db):
+    await db.analysis_cache.create_index("expires_at", expireAfterSeconds=0)
+    await db.leaderboard.create_index([("best_score", -1), ("analyses", -1), ("last_analyzed", -1)])
+    await db.label_canon.create_index([("kind", 1), ("keys", 1)])
+
+
+async def _v4_job_queue_indexes(db):
+    await db.analysis_jobs.create_index([("status", 1), ("created_at", 1)])
+    await db.analysis_jobs.create_index("expires_at", expireAfterSeconds=0)
+
+
+async def _v5_search_index(db):
+    await db.search_postings.create_index([("term", 1), ("lo", 1)])
+    await db.search_postings.create_index([("count", 1), ("term", 1)])
+    await db.resumes.create_index("search_no", unique=True, sparse=True)
+
+
+async def _v6_history_keyset_index(db):
+    await db.resumes.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+
+
+async def _v7_resume_blobs(db):
+    # Used to move inline resume_text/result into resume_blobs on connect, which
+    # ran inside the first request and wasn't safe to race. Now CLI-only:
+    # `python -m backend.blobs --migrate`. Readers handle both layouts meanwhile.
+    pass
+
+
+async def _v8_prompt_cache_ttl(db):
+    await db.prompt_cache.create_index("expires_at", expireAfterSeconds=0)
+
+
+async def _v9_singleflight_ttl(db):
+    await db.singleflight.create_index("expires_at", expireAfterSeconds=0)
+
+
+MIGRATIONS = [
+    (1, _v1_base_indexes),
+    (2, _v2_admin_listing_indexes),
+    (3, _v3_analytics_indexes),
+    (4, _v4_job_queue_indexes),
+    (5, _v5_search_index),
+    (6, _v6_history_keyset_index),
+    (7, _v7_resume_blobs),
+    (8, _v8_prompt_cache_ttl),
+    (9, _v9_singleflight_ttl),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def current_version(db) -> int:
+    doc = await db.schema_migrations.find_one({"_id": MARKER_ID})
+    return doc["version"] if doc else 0
+
+
+async def migrate(db) -> list:
+    """Apply every step above the stored version; returns the versions applied.
+
+    Steps are idempotent, so two workers racing here is harmless.
+    """
+    version = await current_version(db)
+    applied = []
+    for step_version, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        await step(db)
+        await db.schema_migrations.update_one(
+            {"_id": MARKER_ID},
+            {"$max": {"version": step_version}, "$set": {"applied_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        applied.append(step_version)
+    return applied
+
+
+async def _main(args):
+    from backend.database import connect_db, close_db, get_db
+
+    await connect_db(migrate=False)
+    try:
+        db = get_db()
+        if args.status:
+            print(f"[MIGRATIONS] schema version {await current_version(db)} (latest {SCHEMA_VERSION})")
+        else:
+            print(f"[MIGRATIONS] applied: {await migrate(db) or 'nothing pending'}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="print the stored and latest schema versions")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row returned, (value, _id), encoded as
+URL-safe base64 of Extended JSON so datetimes and ObjectIds round-trip.
+The next page is then an index range scan instead of a growing skip().
+"""
+import base64
+import json
+from bson import json_util
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(value, _id) -> str:
+    raw = json_util.dumps({"v": value, "id": _id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Return (value, _id); raises 400 on a malformed cursor."""
+    try:
+        data = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return data["v"], data["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(field: str, direction: int, cursor: str) -> dict:
+    """Filter selecting rows after `cursor` in (field, _id) order."""
+    value, _id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    if field == "_id":
+        return {"_id": {op: _id}}
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: _id}}]}
+
+
+def page(rows: list, limit: int, field: str) -> tuple:
+    """Trim a limit+1 fetch to `limit` rows; return (rows, next_cursor or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.get(field), last["_id"])
+
+
+async def peek_next_cursor(collection, query: dict, field: str, direction: int, limit: int):
+    """Cursor after the `limit`-th row, or None if nothing follows it.
+
+    Reads only (field, _id) of two rows, so with a matching index it is a
+    covered index scan and the header can be sent before the body streams.
+    """
+    rows = await collection.find(query, {field: 1}).sort(
+        [(field, direction), ("_id", direction)]
+    ).skip(limit - 1).limit(2).to_list(2)
+    if len(rows) < 2:
+        return None
+    return encode_cursor(rows[0].get(field), rows[0]["_id"])
+
+
+async def stream_json_array(cursor, to_row, chunk_bytes: int = 32 * 1024):
+    """Serialize a Motor cursor as a JSON array, `chunk_bytes` at a time."""
+    buf = ["["]
+    size = 1
+    first = True
+    async for doc in cursor:
+        item = ("" if first else ",") + json.dumps(to_row(doc), default=str)
+        first = False
+        buf.append(item)
+        size += len(item)
+        if size >= chunk_bytes:
+            yield "".join(buf)
+            buf, size = [], 0
+    buf.append("]")
+    yield "".join(buf)
@@ -0,0 +1,139 @@
+"""PDF text extraction off the event loop, with page/byte/time budgets.
+
+pypdf is pure Python and CPU-bound, so extraction runs in a process pool
+(PDF_WORKERS > 0) or, where processes aren't available (e.g. serverless
+sandboxes without /dev/shm), in a thread. Pages are streamed from a
+generator and joined once; extraction stops early once PDF_TEXT_TARGET_CHARS
+have been collected, which is more than scoring and storage ever look at.
+
+A PDF that crashes a worker, or runs past the time budget (it is only
+checked between pages, so one bad page can parse forever), fails its
+request and whatever else was on that pool: the workers are terminated and
+the next call starts a fresh pool. It is never re-parsed in the server
+process.
+"""
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from backend import metrics
+from backend.config import (
+    PDF_WORKERS,
+    PDF_MAX_BYTES,
+    PDF_MAX_PAGES,
+    PDF_TIME_BUDGET_SECONDS,
+    PDF_TEXT_TARGET_CHARS,
+)
+
+_pool: ProcessPoolExecutor = None
+_pool_broken = False
+
+
+class PDFExtractionError(Exception):
+    """Upload rejected or unreadable; `status_code` is the HTTP status to return."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def iter_page_texts(data: bytes, max_pages: int = PDF_MAX_PAGES, time_budget: float = PDF_TIME_BUDGET_SECONDS):
+    """Yield the text of each page, stopping at `max_pages` or when the time budget runs out."""
+    deadline = time.monotonic() + time_budget
+    from pypdf import PdfReader  # imported on first use; most cold starts never parse a PDF
+
+    reader = PdfReader(io.BytesIO(data))
+    for idx, page in enumerate(reader.pages):
+        if idx >= max_pages or time.monotonic() > deadline:
+            return
+        yield page.extract_text() or ""
+
+
+def extract_text(
+    data: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    time_budget: float = PDF_TIME_BUDGET_SECONDS,
+    target_chars: int = PDF_TEXT_TARGET_CHARS,
+) -> str:
+    """Extract text from PDF bytes synchronously (runs inside the worker)."""
+    parts = []
+    collected = 0
+    for text in iter_page_texts(data, max_pages, time_budget):
+        parts.append(text)
+        collected += len(text)
+        if collected >= target_chars:
+            break
+    return "".join(parts)
+
+
+def read_upload(file, max_bytes: int = PDF_MAX_BYTES) -> bytes:
+    """Read an uploaded file object, rejecting anything over `max_bytes`."""
+    data = file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise PDFExtractionError(f"PDF exceeds the {max_bytes // (1024 * 1024)} MB upload limit", status_code=413)
+    return data
+
+
+def _get_pool():
+    global _pool, _pool_broken
+    if _pool is None and PDF_WORKERS > 0 and not _pool_broken:
+        try:
+            # spawn, not fork: the parent has Motor/executor threads running
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            _pool_broken = True
+            print(f"[PDF] process pool unavailable, using threads: {type(e).__name__}: {e}")
+    return _pool
+
+
+def _recycle(pool: ProcessPoolExecutor, reason: str):
+    """Drop `pool` and kill its workers; the next call starts a new one."""
+    global _pool
+    if _pool is not pool:  # concurrent requests on the same pool all land here
+        return
+    _pool = None
+    processes = list((pool._processes or {}).values())  # no public API for this before 3.14
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    print(f"[PDF] {reason}; starting a new pool on the next call")
+
+
+async def extract_text_async(data: bytes, fn=extract_text):
+    """Extract text without blocking the event loop.
+
+    `fn` lets callers run extra CPU work in the same worker (e.g. extract
+    then score); it must be a module-level function taking the PDF bytes.
+    """
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    with metrics.stage("extract"):
+        try:
+            if pool is not None:
+                future = loop.run_in_executor(pool, fn, data)
+            else:
+                future = asyncio.to_thread(fn, data)
+            # generous margin: the budget is checked between pages, not mid-page
+            return await asyncio.wait_for(future, timeout=PDF_TIME_BUDGET_SECONDS * 2)
+        except BrokenProcessPool:
+            _recycle(pool, "a worker process died")
+            raise PDFExtractionError("Could not read PDF: the extractor crashed", status_code=422)
+        except asyncio.TimeoutError:
+            if pool is not None:  # the worker is still parsing; a thread can't be stopped
+                _recycle(pool, "a worker ran past the time budget")
+            raise PDFExtractionError("PDF took too long to process", status_code=422)
+        except PDFExtractionError:
+            raise
+        except Exception as e:
+            raise PDFExtractionError(f"Could not read PDF: {type(e).__name__}")
+
+
+def shutdown(wait: bool = False):
+    """Stop the worker processes (app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=wait, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,243 @@
+"""Semantic cache for the /job-match and /career-plan Gemini calls.
+
+Popular target roles and copy-pasted job descriptions make many of these
+prompts near-identical. An entry is scoped to (endpoint, model, hash of the
+resume text) and keyed on a fingerprint of the role/JD: its tokens
+(backend.terms, so case, punctuation and stopwords don't matter), hashed.
+
+- exact fingerprint: in-process LRU, then the `prompt_cache` collection
+  (shared across workers and serverless invocations, expired by a TTL index)
+- otherwise similar role/JD text: a local MinHash-LSH index over word
+  3-shingles (character trigrams for short roles) finds candidates in the
+  same scope; the estimated Jaccard must reach PROMPT_CACHE_SIMILARITY
+
+Only parsed model output is cached; callers still blend in their own
+deterministic parts. Savings (calls avoided, estimated tokens) are counted
+per process and, with $inc, in `prompt_cache_savings` for the admin dashboard.
+"""
+import copy
+import hashlib
+import random
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from backend import terms
+from backend.analysis_cache import normalize_text
+from backend.config import (
+    GEMINI_MODEL,
+    PROMPT_CACHE_ENABLED,
+    PROMPT_CACHE_MAX_ENTRIES,
+    PROMPT_CACHE_TTL_SECONDS,
+    PROMPT_CACHE_SIMILARITY,
+)
+from backend.database import get_db
+
+_NUM_PERM = 64
+_ROWS_PER_BAND = 4  # 16 bands: candidates from ~0.5 Jaccard, then checked against the threshold
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed seed: signatures must match across processes
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(_NUM_PERM)]
+_SHORT_QUERY_TOKENS = 6
+
+_entries = OrderedDict()  # key -> entry dict, LRU order
+_bands = {}  # (scope, band) -> {key}
+_stats = {"exact_hits": 0, "similar_hits": 0, "mongo_hits": 0, "misses": 0, "stores": 0,
+          "evictions": 0, "expirations": 0, "tokens_saved": 0, "mongo_errors": 0}
+
+
+def _shingles(tokens: list) -> set:
+    if len(tokens) >= _SHORT_QUERY_TOKENS:
+        return {" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+    s = f" {' '.join(tokens)} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _signature(shingles: set) -> tuple:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles] or [0]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+
+def _band_keys(scope: str, signature: tuple) -> list:
+    return [
+        (scope, i, zlib.crc32(repr(signature[i:i + _ROWS_PER_BAND]).encode()))
+        for i in range(0, _NUM_PERM, _ROWS_PER_BAND)
+    ]
+
+
+def _similarity(a: tuple, b: tuple) -> float:
+    return sum(x == y for x, y in zip(a, b)) / _NUM_PERM
+
+
+def probe(endpoint: str, resume_text: str, query_text: str) -> dict:
+    """Everything needed to look up and later store one prompt's answer."""
+    resume_hash = hashlib.sha256(normalize_text(resume_text).encode("utf-8")).hexdigest()
+    tokens = terms.tokens(query_text)
+    fingerprint = hashlib.sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+    scope = f"{endpoint}:{GEMINI_MODEL}:{resume_hash}"
+    return {
+        "endpoint": endpoint,
+        "scope": scope,
+        "key": f"{scope}:{fingerprint}",
+        "signature": _signature(_shingles(tokens)),
+    }
+
+
+def _drop(key: str):
+    entry = _entries.pop(key, None)
+    if entry is None:
+        return
+    for band in _band_keys(entry["scope"], entry["signature"]):
+        keys = _bands.get(band)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _bands[band]
+
+
+def _remember(p: dict, payload: dict, tokens: int, expires_at: float):
+    _drop(p["key"])
+    _entries[p["key"]] = {
+        "scope": p["scope"], "signature": p["signature"], "payload": payload,
+        "tokens": tokens, "expires_at": expires_at,
+    }
+    for band in _band_keys(p["scope"], p["signature"]):
+        _bands.setdefault(band, set()).add(p["key"])
+    while len(_entries) > PROMPT_CACHE_MAX_ENTRIES:
+        _drop(next(iter(_entries)))
+        _stats["evictions"] += 1
+
+
+def _live(key: str):
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry["expires_at"] <= time.monotonic():
+        _drop(key)
+        _stats["expirations"] += 1
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+def _nearest(p: dict):
+    best, best_sim = None, 0.0
+    candidates = set()
+    for band in _band_keys(p["scope"], p["signature"]):
+        candidates |= _bands.get(band, set())
+    for key in candidates:
+        entry = _live(key)
+        if entry is None:
+            continue
+        sim = _similarity(p["signature"], entry["signature"])
+        if sim > best_sim:
+            best, best_sim = entry, sim
+    return best if best_sim >= PROMPT_CACHE_SIMILARITY else None
+
+
+async def _record_saving(endpoint: str, kind: str, tokens: int):
+    _stats[f"{kind}_hits"] += 1
+    _stats["tokens_saved"] += tokens
+    db = get_db()
+    if db is None:
+        return
+    try:
+        await db.prompt_cache_savings.update_one(
+            {"_id": endpoint},
+            {"$inc": {"calls_avoided": 1, f"{kind}_hits": 1, "tokens_saved": tokens}},
+            upsert=True,
+        )
+    except Exception as e:
+        _stats["mongo_errors"] += 1
+        print(f"[PROMPT CACHE] savings update failed: {type(e).__name__}: {e}")
+
+
+async def get(p: dict):
+    """(payload copy, "exact" | "similar") for a cached answer, or (None, None)."""
+    if not PROMPT_CACHE_ENABLED:
+        return None, None
+    entry = _live(p["key"])
+    kind = "exact"
+    if entry is None:
+        entry = await _get_shared(p)
+        kind = "mongo"
+    if entry is None:
+        entry = _nearest(p)
+        kind = "similar"
+    if entry is None:
+        _stats["misses"] += 1
+        return None, None
+    await _record_saving(p["endpoint"], kind, entry["tokens"])
+    return copy.deepcopy(entry["payload"]), "similar" if kind == "similar" else "exact"
+
+
+async def _get_shared(p: dict):
+    db = get_db()
+    if db is None:
+        return None
+    try:
+        doc = await db.prompt_cache.find_one({"_id": p["key"]})
+    except Exception as e:
+        _stats["mongo_errors"] += 1
+        print(f"[PROMPT CACHE] lookup failed: {type(e).__name__}: {e}")
+        return None
+    if doc is None:
+        return None
+    remaining = (doc["expires_at"].replace(tzinfo=timezone.utc) - datetime.now(timezone.utc)).total_seconds()
+    if remaining <= 0:  # the TTL monitor runs about once a minute
+        return None
+    _remember(p, doc["payload"], doc["tokens"], time.monotonic() + remaining)
+    return _entries[p["key"]]
+
+
+async def put(p: dict, payload: dict, tokens: int):
+    """Cache a parsed model answer that cost about `tokens` tokens (prompt + reply)."""
+    if not PROMPT_CACHE_ENABLED:
+        return
+    payload = copy.deepcopy(payload)
+    _remember(p, payload, tokens, time.monotonic() + PROMPT_CACHE_TTL_SECONDS)
+    _stats["stores"] += 1
+
+    db = get_db()
+    if db is None:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        await db.prompt_cache.replace_one(
+            {"_id": p["key"]},
+            {
+                "_id": p["key"],
+                "endpoint": p["endpoint"],
+                "payload": payload,
+                "tokens": tokens,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=PROMPT_CACHE_TTL_SECONDS),
+            },
+            upsert=True,
+        )
+        await db.prompt_cache_savings.update_one({"_id": p["endpoint"]}, {"$inc": {"calls": 1}}, upsert=True)
+    except Exception as e:
+        _stats["mongo_errors"] += 1
+        print(f"[PROMPT CACHE] store failed: {type(e).__name__}: {e}")
+
+
+async def savings(db) -> dict:
+    """All-time savings per endpoint, across workers."""
+    out = {}
+    async for doc in db.prompt_cache_savings.find({}):
+        endpoint = doc.pop("_id")
+        answered = doc.get("calls", 0) + doc.get("calls_avoided", 0)
+        doc["hit_rate"] = round(doc.get("calls_avoided", 0) / answered, 3) if answered else 0.0
+        out[endpoint] = doc
+    return out
+
+
+def get_stats() -> dict:
+    lookups = _stats["exact_hits"] + _stats["similar_hits"] + _stats["mongo_hits"] + _stats["misses"]
+    hits = lookups - _stats["misses"]
+    return {
+        "size": len(_entries),
+        "max_entries": PROMPT_CACHE_MAX_ENTRIES,
+        **_stats,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,365 @@
+"""Prompt building with local token estimates and a per-input token budget.
+
+Extracted resume text carries a lot that costs tokens without helping the
+model: page headers/footers repeated on every page, page numbers, runs of
+whitespace, bullet glyphs, contact blocks, "references available upon
+request". Before a resume (or JD) goes into a prompt it is:
+
+1. cleaned: whitespace collapsed, boilerplate lines dropped, lines repeated
+   on every page kept once, the contact block replaced by one short line
+   saying which contact details exist (the model still sees whether a
+   LinkedIn/GitHub is present)
+2. split into sections on common headings
+3. fitted to its budget by keeping whole sections in signal order
+   (experience, skills, projects, summary, education, ...), cutting the
+   first one that doesn't fit at a line boundary, and restoring the
+   original section order. Text with no recognised headings is kept line
+   by line against the whole budget (the last line cut at a word)
+
+Token counts are estimated locally (no API call); `_stats` records the
+estimated tokens before and after compaction per endpoint, and
+llm.generate records the tokens actually sent.
+"""
+import re
+from backend.config import (
+    PROMPT_COMPACTION_ENABLED,
+    PROMPT_RESUME_TOKENS,
+    PROMPT_JD_TOKENS,
+    PROMPT_CONTEXT_TOKENS,
+)
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d|[^\sA-Za-z\d]")
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\(?\d[\d\s().-]{8,}\d")
+_URL_RE = re.compile(r"(https?://\S+|www\.\S+|\b[\w.-]+\.(com|io|dev|me|org|net|in)/\S*)", re.I)
+_CONTACT_LABEL_RE = re.compile(r"\b(e-?mail|phone|mobile|tel|contact|address|linkedin|github|portfolio|website)\b\s*:?", re.I)
+_PAGE_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-\s*\d+\s*-|\d{1,2})$", re.I)
+_PAGE_OF_RE = re.compile(r"^(?:page\s*)?\d+\s*(?:of|/)\s*(\d+)$", re.I)
+_BULLET_RE = re.compile(r"^[•●▪■◦‣⁃∙·*>–—-]+\s*")
+_TITLE_LINES = {"curriculum vitae", "resume", "résumé", "cv"}
+_BOILERPLATE = (
+    "available upon request", "available on request", "i hereby declare", "equal opportunity employer",
+    "without regard to race", "reasonable accommodation", "affirmative action",
+)
+
+RESUME_SECTIONS = {
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "internships", "internship", "relevant experience"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "skills and tools", "technologies",
+               "tech stack", "core competencies", "competencies", "tools"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects"),
+    "summary": ("summary", "professional summary", "profile", "about me", "objective", "career objective"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+    "achievements": ("achievements", "awards", "honors", "accomplishments", "publications"),
+    "extras": ("interests", "hobbies", "languages", "volunteer", "volunteering", "activities",
+               "extracurricular activities", "personal details", "declaration"),
+    "references": ("references",),
+}
+RESUME_PRIORITY = ["header", "experience", "skills", "projects", "summary", "education",
+                   "certifications", "achievements", "other", "extras"]
+
+JD_SECTIONS = {
+    "requirements": ("requirements", "qualifications", "minimum qualifications", "preferred qualifications",
+                     "what you bring", "what we're looking for", "what we are looking for", "you have",
+                     "skills", "must have", "nice to have"),
+    "responsibilities": ("responsibilities", "what you'll do", "what you will do", "the role", "role",
+                         "key responsibilities", "duties", "job description"),
+    "company": ("about us", "about the company", "who we are", "our mission", "company overview"),
+    "benefits": ("benefits", "perks", "what we offer", "compensation", "why join us", "perks and benefits"),
+}
+JD_PRIORITY = ["header", "requirements", "responsibilities", "other", "company"]  # benefits are dropped
+
+HEADER_TOKENS = 80  # name/title lines above the first recognised heading
+
+_stats = {}  # endpoint -> {"prompts", "tokens_before", "tokens_after"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate of Gemini tokens: ~1 per short word, digits and symbols separately."""
+    n = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        n += 1 + (len(piece) - 1) // 7 if len(piece) > 1 else 1
+    return n
+
+
+def _heading_key(line: str):
+    words = re.sub(r"[^a-z' ]", " ", line.lower())
+    return " ".join(words.split())
+
+
+def _build_heading_index(aliases: dict) -> dict:
+    return {alias: name for name, names in aliases.items() for alias in names}
+
+
+_RESUME_HEADINGS = _build_heading_index(RESUME_SECTIONS)
+_JD_HEADINGS = _build_heading_index(JD_SECTIONS)
+
+
+def _phones(line: str) -> list:
+    """Phone-like runs with 10-15 digits (date ranges like 2018 - 2021 have fewer)."""
+    return [m.group() for m in _PHONE_RE.finditer(line) if 10 <= sum(c.isdigit() for c in m.group()) <= 15]
+
+
+def _contact_kinds(line: str, lower: str) -> list:
+    if "@" not in line and "/" not in line and "www." not in lower and sum(map(str.isdigit, line)) < 10:
+        return []  # cheap pre-check: most lines have nothing contact-like
+    kinds = []
+    if _EMAIL_RE.search(line):
+        kinds.append("email")
+    if _phones(line):
+        kinds.append("phone")
+    for site in ("linkedin", "github"):
+        if site in lower:
+            kinds.append(site)
+    if _URL_RE.search(line) and not any(k in kinds for k in ("linkedin", "github")):
+        kinds.append("website")
+    return kinds
+
+
+def _is_contact_line(line: str) -> bool:
+    rest = _EMAIL_RE.sub("", line)
+    rest = _URL_RE.sub("", rest)
+    for phone in _phones(rest):
+        rest = rest.replace(phone, "")
+    rest = _CONTACT_LABEL_RE.sub("", rest)
+    return len(re.sub(r"[\W_]+", "", rest)) <= max(3, len(line) // 5)
+
+
+def clean_lines(text: str) -> tuple:
+    """(cleaned lines, contact kinds found) with boilerplate and page furniture removed."""
+    raw = [" ".join(line.split()) for line in (text or "").splitlines()]
+    raw = [line for line in raw if line]
+    counts = {}
+    pages = 0
+    for line in raw:
+        if len(line) <= 60:
+            counts[line.lower()] = counts.get(line.lower(), 0) + 1
+        marker = _PAGE_OF_RE.match(line)
+        if marker:
+            pages = max(pages, int(marker.group(1)))
+    repeated = max(2, pages) if pages else 3  # a footer shows up once per page
+
+    lines, contacts, seen_repeated = [], [], set()
+    for line in raw:
+        key = line.lower()
+        if key in _TITLE_LINES or any(phrase in key for phrase in _BOILERPLATE) or _PAGE_RE.match(line):
+            continue
+        if counts.get(key, 0) >= repeated:  # running header/footer
+            if key in seen_repeated:
+                continue
+            seen_repeated.add(key)
+        kinds = _contact_kinds(line, key)
+        if kinds and _is_contact_line(line):
+            contacts.extend(k for k in kinds if k not in contacts)
+            continue
+        lines.append(_BULLET_RE.sub("- ", line))
+    return lines, contacts
+
+
+def split_sections(lines: list, headings: dict) -> list:
+    """[(section name, [lines])] in document order; text above the first heading is "header"."""
+    sections = [["header", []]]
+    for line in lines:
+        name = headings.get(_heading_key(line)) if len(line) <= 40 else None
+        if name is not None:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def _cut_line(line: str, budget: int) -> str:
+    """The leading words of `line` that fit in `budget` tokens."""
+    words, used = [], 1
+    for word in line.split(" "):
+        cost = estimate_tokens(word)
+        if used + cost > budget:
+            break
+        words.append(word)
+        used += cost
+    return " ".join(words)
+
+
+def _fit(text: str, budget: int, headings: dict, priority: list, dropped: set, contact_line: bool) -> str:
+    lines, contacts = clean_lines(text)
+    sections = [
+        (name, [(line, estimate_tokens(line) + 1) for line in body])
+        for name, body in split_sections(lines, headings)
+        if name not in dropped and (name == "header" or len(body) > 1)  # skip bare headings
+    ]
+    if contact_line and contacts:
+        line = f"Contact: {', '.join(contacts)}"
+        sections.insert(0, ("header", [(line, estimate_tokens(line) + 1)]))
+
+    # no recognised headings: the "header" is the whole document, not a name/title block
+    sectioned = any(name != "header" for name, _ in sections)
+    rank = {name: i for i, name in enumerate(priority)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], rank["other"]), i))
+    kept = {}
+    remaining = budget
+    for i in order:
+        name, body = sections[i]
+        cap = min(remaining, HEADER_TOKENS) if name == "header" and sectioned else remaining
+        partial, used = [], 0
+        for line, cost in body:
+            if used + cost > cap:
+                if not sectioned:  # one long line (or few) must not come back empty
+                    head = _cut_line(line, cap - used)
+                    if head:
+                        partial.append(head)
+                        used += estimate_tokens(head) + 1
+                break
+            partial.append(line)
+            used += cost
+        if len(partial) > (name != "header"):  # more than a bare heading
+            kept[i] = partial
+            remaining -= used
+        if len(partial) < len(body) and name != "header":
+            break  # lower-priority sections would only fill the cut-off gap with noise
+    return "\n".join(line for i in sorted(kept) for line in kept[i])
+
+
+def fit_resume(text: str, budget: int = PROMPT_RESUME_TOKENS) -> str:
+    """Resume text cleaned of boilerplate and cut to ~`budget` tokens, best sections first."""
+    if not PROMPT_COMPACTION_ENABLED:
+        return text or ""
+    return _fit(text, budget, _RESUME_HEADINGS, RESUME_PRIORITY, {"references"}, contact_line=True)
+
+
+def fit_job_description(text: str, budget: int = PROMPT_JD_TOKENS) -> str:
+    """JD text without EEO/benefits boilerplate, requirements and responsibilities first."""
+    if not PROMPT_COMPACTION_ENABLED:
+        return text or ""
+    return _fit(text, budget, _JD_HEADINGS, JD_PRIORITY, {"benefits"}, contact_line=False)
+
+
+def _record(endpoint: str, raw_inputs: list, prompt: str, template_inputs: list):
+    before = estimate_tokens(prompt) - sum(estimate_tokens(t) for t in template_inputs) + sum(
+        estimate_tokens(t) for t in raw_inputs
+    )
+    entry = _stats.setdefault(endpoint, {"prompts": 0, "tokens_before": 0, "tokens_after": 0})
+    entry["prompts"] += 1
+    entry["tokens_before"] += before
+    entry["tokens_after"] += estimate_tokens(prompt)
+
+
+# ----- prompts -----
+
+def analysis(text: str) -> str:
+    resume = fit_resume(text)
+    prompt = f"""
+You are a professional ATS resume evaluator.
+
+Analyze the resume below and return your analysis as valid JSON with these exact keys:
+- "strengths": array of strings listing resume strengths
+- "weaknesses": array of strings listing resume weaknesses
+- "missing_keywords": array of strings listing important missing keywords
+- "suggestions": array of strings with improvement suggestions
+- "hr_questions": array of 5 tailored interview questions for this candidate
+- "tips": array of actionable do's and don'ts
+
+Return ONLY the JSON object, no markdown code fences, no extra text.
+
+Resume:
+{resume}
+"""
+    _record("analyze", [text], prompt, [resume])
+    return prompt
+
+
+def job_match(resume_text: str, job_description: str) -> str:
+    resume = fit_resume(resume_text)
+    jd = fit_job_description(job_description)
+    prompt = f"""
+You are a senior recruiting mentor and ATS expert.
+Compare the candidate resume against the target job description.
+
+Return valid JSON with exact keys:
+- \"match_score\": integer (0-100)
+- \"top_matches\": array of strings
+- \"gaps\": array of strings
+- \"priority_keywords\": array of strings
+- \"rewrite_summary\": string (2-3 lines)
+- \"bullet_rewrites\": array of 4 improved resume bullets aligned to job expectations
+
+Resume:
+{resume}
+
+Job Description:
+{jd}
+"""
+    _record("job_match", [resume_text, job_description], prompt, [resume, jd])
+    return prompt
+
+
+def career_plan(target_role: str, resume_summary: str) -> str:
+    context = fit_resume(resume_summary, PROMPT_CONTEXT_TOKENS)
+    role = " ".join(target_role.split())[:200]
+    prompt = f"""
+You are a strict but supportive career mentor + HR interviewer.
+Create a realistic 30-day plan for a candidate targeting: {role}.
+
+Return valid JSON with exact keys:
+- \"mentor_rules\": array of 6 short non-negotiable rules
+- \"hr_expectations\": array of 6 short expectations recruiters have
+- \"weekly_focus\": array of 4 objects with keys week, goal, deliverables (array)
+- \"daily_micro_tasks\": array of 10 concise actions
+
+Candidate context:
+{context}
+"""
+    _record("career_plan", [target_role, resume_summary], prompt, [role, context])
+    return prompt
+
+
+def hr_questions(resume_text: str) -> str:
+    resume = fit_resume(resume_text)
+    prompt = f"""
+You are an expert interviewer. Read this resume and generate 10 unique interview questions
+(mix of technical and behavioral) with brief expected answers. Format as:
+1. Question: ...
+   Expected Answer: ...
+Resume:
+{resume}
+"""
+    _record("hr_questions", [resume_text], prompt, [resume])
+    return prompt
+
+
+def group_analysis(texts: list, per_resume_tokens: int) -> str:
+    """One prompt analyzing several resumes, each fitted to `per_resume_tokens`."""
+    fitted = [fit_resume(text, per_resume_tokens) for text in texts]
+    sections = "\n\n".join(f"=== Resume {i} ===\n{text}" for i, text in enumerate(fitted))
+    prompt = f"""
+You are a professional ATS resume evaluator.
+
+Analyze each of the {len(texts)} resumes below independently. Return ONLY a JSON array
+with one object per resume, each with these exact keys:
+- "index": the resume number shown in its header
+- "strengths": array of strings listing resume strengths
+- "weaknesses": array of strings listing resume weaknesses
+- "missing_keywords": array of strings listing important missing keywords
+- "suggestions": array of strings with improvement suggestions
+- "hr_questions": array of 5 tailored interview questions for this candidate
+- "tips": array of actionable do's and don'ts
+
+No markdown code fences, no extra text.
+
+{sections}
+"""
+    _record("analyze_batch", texts, prompt, fitted)
+    return prompt
+
+
+def get_stats() -> dict:
+    out = {}
+    for endpoint, entry in _stats.items():
+        before = entry["tokens_before"]
+        out[endpoint] = {**entry, "reduction_pct": round((1 - entry["tokens_after"] / before) * 100, 1) if before else 0.0}
+    return {
+        "compaction": PROMPT_COMPACTION_ENABLED,
+        "budgets": {"resume": PROMPT_RESUME_TOKENS, "job_description": PROMPT_JD_TOKENS, "context": PROMPT_CONTEXT_TOKENS},
+        "endpoints": out,
+    }
@@ -0,0 +1,208 @@
+"""Rank stored resumes against one job description with BM25.
+
+The stored resume texts are tokenized once (same tokenizer as
+keyword_overlap_score) into a sparse term -> (rows, tfs) index, cached per
+scope until the scope's resumes change or RANK_INDEX_TTL_SECONDS passes.
+Only term frequencies are kept, in typed arrays (6 bytes per posting);
+texts are read and tokenized RANK_BUILD_BATCH resumes at a time and
+dropped. Scoring a JD is the sparse product of its term vector with that
+matrix, computed term-at-a-time: only the postings of the JD's own terms
+are touched, so a 2,000-resume ranking is a few thousand multiply-adds.
+
+A cached index is reused while the scope's (count, newest _id) and the
+ranking generation are unchanged; backend.rescore bumps the generation
+when it rewrites scores, which neither of the other two would show.
+"""
+import asyncio
+import bisect
+import heapq
+import math
+import time
+from array import array
+from bson import ObjectId
+from backend import blobs, prompts, terms
+from backend.cache import TTLCache
+from backend.config import RANK_MAX_DOCS, RANK_INDEX_TTL_SECONDS, RANK_SHORTLIST
+
+K1 = 1.2
+B = 0.75
+RANK_BUILD_BATCH = 500  # resumes whose text is held at once while building
+_MAX_TF = 0xFFFF  # tfs are stored as unsigned shorts
+
+_indexes = TTLCache(max_entries=32, ttl=RANK_INDEX_TTL_SECONDS)  # scope -> (signature, BM25Index)
+
+
+class BM25Index:
+    """Sparse BM25 index over a fixed set of documents, filled with `add`."""
+
+    def __init__(self):
+        self.docs = []  # per-row metadata, aligned with the postings' row numbers
+        self.postings = {}  # term -> (array rows, array tfs), rows ascending
+        self.lengths = array("I")
+        self.avg_length = 0.0
+
+    def add(self, docs: list, texts: list):
+        """Append rows for `docs`; texts[i] is docs[i]'s text and is not kept."""
+        for doc, text in zip(docs, texts):
+            row = len(self.docs)
+            self.docs.append(doc)
+            counts = {}
+            for token in terms.tokens(text):
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                entry = self.postings.get(token)
+                if entry is None:
+                    entry = self.postings[token] = (array("I"), array("H"))
+                entry[0].append(row)
+                entry[1].append(min(tf, _MAX_TF))
+            self.lengths.append(sum(counts.values()))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def df(self, term: str) -> int:
+        entry = self.postings.get(term)
+        return len(entry[0]) if entry else 0
+
+    def idf(self, term: str) -> float:
+        df = self.df(term)
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def contains(self, term: str, row: int) -> bool:
+        entry = self.postings.get(term)
+        if not entry:
+            return False
+        rows = entry[0]
+        i = bisect.bisect_left(rows, row)
+        return i < len(rows) and rows[i] == row
+
+    def score(self, query_terms: set) -> dict:
+        """{row: BM25 score} for every row containing at least one query term."""
+        scores = {}
+        avg = self.avg_length or 1.0
+        lengths = self.lengths
+        for term in query_terms:
+            entry = self.postings.get(term)
+            if not entry:
+                continue
+            idf = self.idf(term)
+            for row, tf in zip(*entry):
+                norm = tf + K1 * (1 - B + B * lengths[row] / avg)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (K1 + 1) / norm
+        return scores
+
+    def top(self, query_terms: set, k: int) -> list:
+        """[(row, score, matched terms, missing terms)] for the k best rows."""
+        scores = self.score(query_terms)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        # rarer terms first: they say more about the match than common ones
+        ordered = sorted(query_terms, key=lambda t: (-self.idf(t), t))
+        out = []
+        for row, score in best:
+            matched = [t for t in ordered if self.contains(t, row)]
+            missing = [t for t in ordered if not self.contains(t, row)]
+            out.append((row, score, matched, missing))
+        return out
+
+
+async def bump_generation(db):
+    """Mark every cached index stale (e.g. after stored scores were rewritten)."""
+    await db.ranking_meta.update_one({"_id": "generation"}, {"$inc": {"value": 1}}, upsert=True)
+
+
+async def _signature(db, query: dict) -> tuple:
+    latest, count, generation = await asyncio.gather(
+        db.resumes.find_one(query, {"_id": 1}, sort=[("_id", -1)]),
+        db.resumes.count_documents(query),
+        db.ranking_meta.find_one({"_id": "generation"}),
+    )
+    return count, latest["_id"] if latest else None, (generation or {}).get("value", 0)
+
+
+async def get_index(db, user_id: str = None) -> tuple:
+    """(BM25Index, built_now) over one user's resumes, or all of them if user_id is None."""
+    query = {"user_id": user_id} if user_id else {}
+    scope = user_id or "*"
+    signature = await _signature(db, query)
+    cached = _indexes.get(scope)
+    if cached is not None and cached[0] == signature:
+        return cached[1], False
+
+    index = BM25Index()
+    cursor = db.resumes.find(
+        query,
+        {"resume_text": 1, "text_hash": 1, "filename": 1, "user_id": 1, "score": 1, "created_at": 1},
+    ).sort("_id", -1).limit(RANK_MAX_DOCS).batch_size(RANK_BUILD_BATCH)
+    batch = []
+
+    async def flush():
+        texts = [text or "" for text in await blobs.load_texts(db, batch)]
+        for doc in batch:
+            doc.pop("resume_text", None)
+            doc.pop("text_hash", None)
+        await asyncio.to_thread(index.add, batch, texts)
+
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= RANK_BUILD_BATCH:
+            await flush()
+            batch = []
+    if batch:
+        await flush()
+    _indexes.set(scope, (signature, index))
+    return index, True
+
+
+async def rank(db, job_description: str, top_k: int, user_id: str = None) -> dict:
+    """Top-k stored resumes for `job_description` with matched/missing JD terms."""
+    started = time.perf_counter()
+    index, built = await get_index(db, user_id)
+    query_terms = terms.term_set(job_description)
+    results = []
+    for position, (row, score, matched, missing) in enumerate(index.top(query_terms, top_k), start=1):
+        doc = index.docs[row]
+        results.append({
+            "rank": position,
+            "history_id": str(doc["_id"]),
+            "user_id": doc.get("user_id"),
+            "filename": doc.get("filename", ""),
+            "resume_score": doc.get("score", 0),
+            "relevance": round(score, 3),
+            "match_pct": int(round(len(matched) / max(len(query_terms), 1) * 100)),
+            "matched_terms": matched[:30],
+            "missing_terms": missing[:20],
+        })
+    return {
+        "results": results,
+        "searched": len(index.docs),
+        "jd_terms": len(query_terms),
+        "index_rebuilt": built,
+        "index_terms": len(index.postings),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def review_shortlist(db, job_description: str, results: list, shortlist: int = RANK_SHORTLIST):
+    """Attach a Gemini job-match review (`ai`) to the first `shortlist` results, concurrently."""
+    from backend import routes_resume  # cached_generate lives with the endpoints
+
+    picked = results[:shortlist]
+    if not picked:
+        return
+    docs = await db.resumes.find(
+        {"_id": {"$in": [ObjectId(r["history_id"]) for r in picked]}}, {"resume_text": 1, "text_hash": 1},
+    ).to_list(None)
+    texts = {str(doc["_id"]): text or "" for doc, text in zip(docs, await blobs.load_texts(db, docs))}
+
+    async def review(result):
+        text = texts.get(result["history_id"], "")
+        payload, _ = await routes_resume.cached_generate(
+            "job_match", text, job_description, lambda: prompts.job_match(text, job_description),
+            {"error": "Unable to parse AI response"},
+        )
+        return payload
+
+    reviews = await asyncio.gather(*[review(r) for r in picked], return_exceptions=True)
+    for result, review_payload in zip(picked, reviews):
+        if isinstance(review_payload, Exception):
+            review_payload = {"error": f"{type(review_payload).__name__}"}
+        result["ai"] = review_payload
@@ -0,0 +1,147 @@
+"""Bulk rescoring of the resumes collection after a rubric change.
+
+Streams resume text (from resume_blobs) in `_id` order, scores batches in a process pool and
+writes changed scores back with unordered bulk_write. Progress is
+checkpointed in `job_checkpoints` after every batch, so a crashed run picks
+up where it stopped; a checkpoint from an older RUBRIC_VERSION is ignored.
+Throughput is capped with --max-docs-per-sec to leave room for live traffic.
+
+    python -m backend.rescore --batch-size 500 --workers 2 --max-docs-per-sec 1000
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from backend import blobs, scoring, leaderboard, rollups, ranking
+from backend.database import connect_db, close_db, get_db
+
+JOB_ID = "rescore"
+
+
+def _score_texts(texts: list) -> list:
+    return [r["score"] for r in scoring.score_batch(texts)]
+
+
+async def _process_batch(db, pool, workers: int, batch: list, dry_run: bool) -> int:
+    """Score one batch and write back changed scores. Returns the number changed.
+
+    Only `score` is written: readers lay it over the stored result's algorithm_score.
+    """
+    loop = asyncio.get_running_loop()
+    texts = [text or "" for text in await blobs.load_texts(db, batch)]
+    step = max(1, -(-len(texts) // workers))
+    chunks = await asyncio.gather(*[
+        loop.run_in_executor(pool, _score_texts, texts[i:i + step]) for i in range(0, len(texts), step)
+    ])
+    scores = [s for chunk in chunks for s in chunk]
+
+    ops = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"score": score}})
+        for doc, text, score in zip(batch, texts, scores)
+        if text and doc.get("score") != score
+    ]
+    if ops and not dry_run:
+        await db.resumes.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def rescore(
+    batch_size: int = 500,
+    workers: int = 2,
+    max_docs_per_sec: float = 1000,
+    restart: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    db = get_db()
+    checkpoint = None if restart else await db.job_checkpoints.find_one({"_id": JOB_ID})
+    query = {}
+    processed = changed = 0
+    if checkpoint and checkpoint.get("rubric_version") == scoring.RUBRIC_VERSION:
+        query = {"_id": {"$gt": checkpoint["last_id"]}}
+        processed, changed = checkpoint.get("processed", 0), checkpoint.get("changed", 0)
+        print(f"[RESCORE] resuming after {checkpoint['last_id']} ({processed} docs already done)")
+
+    cursor = db.resumes.find(query, {"resume_text": 1, "text_hash": 1, "score": 1}).sort("_id", 1).batch_size(batch_size)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    started = time.monotonic()
+    run_docs = 0
+
+    async def flush(batch):
+        nonlocal processed, changed, run_docs
+        changed += await _process_batch(db, pool, workers, batch, dry_run)
+        processed += len(batch)
+        run_docs += len(batch)
+        if not dry_run:
+            await db.job_checkpoints.update_one(
+                {"_id": JOB_ID},
+                {"$set": {
+                    "last_id": batch[-1]["_id"],
+                    "rubric_version": scoring.RUBRIC_VERSION,
+                    "processed": processed,
+                    "changed": changed,
+                    "updated_at": datetime.now(timezone.utc),
+                }},
+                upsert=True,
+            )
+        elapsed = time.monotonic() - started
+        print(f"[RESCORE] {processed} docs, {changed} changed, {run_docs / max(elapsed, 1e-9):.0f} docs/s")
+        # throttle: never run ahead of max_docs_per_sec
+        ahead = run_docs / max_docs_per_sec - elapsed
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+    try:
+        pending = None
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                # overlap reading the next batch with scoring/writing this one
+                if pending is not None:
+                    await pending
+                pending = asyncio.create_task(flush(batch))
+                batch = []
+        if pending is not None:
+            await pending
+        if batch:
+            await flush(batch)
+    finally:
+        pool.shutdown()
+
+    if changed and not dry_run:
+        # best scores and histograms may have moved; derived collections must follow
+        await leaderboard.rebuild(db)
+        await rollups.rebuild(db)
+        await ranking.bump_generation(db)  # cached /rank indexes carry the old scores
+
+    elapsed = time.monotonic() - started
+    return {
+        "processed": processed,
+        "changed": changed,
+        "seconds": round(elapsed, 1),
+        "docs_per_sec": round(run_docs / max(elapsed, 1e-9), 1),
+        "rubric_version": scoring.RUBRIC_VERSION,
+        "dry_run": dry_run,
+    }
+
+
+async def _main(args):
+    await connect_db()
+    try:
+        summary = await rescore(args.batch_size, args.workers, args.max_docs_per_sec, args.restart, args.dry_run)
+        print(f"[RESCORE] done: {summary}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-docs-per-sec", type=float, default=1000)
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start from the beginning")
+    parser.add_argument("--dry-run", action="store_true", help="score but don't write scores or checkpoints")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,232 @@
+"""Pre-aggregated admin analytics, maintained with $inc upserts at write time.
+
+Collections:
+- analytics_totals: one "global" doc — count, score_sum, score_min/max, hist
+- analytics_daily:  one doc per UTC day ("YYYY-MM-DD") with the same fields
+- analytics_topk:   one doc per label kind (weakness / keyword / strength)
+  holding Space-Saving counters over canonical labels (see labels.py)
+
+The /admin dashboard reads only these, so its cost doesn't grow with the
+resumes collection. Deletes decrement counts and sums; min/max can't be
+un-applied, so they may be stale until the next reconciliation:
+
+    python -m backend.rollups --rebuild
+"""
+import argparse
+import asyncio
+from collections import Counter
+from pymongo import UpdateOne
+from backend import blobs, labels
+from backend.config import LABEL_TOPK_CAPACITY
+from backend.database import connect_db, close_db, get_db
+
+HIST_LABELS = ["0-19", "20-39", "40-59", "60-79", "80-100"]
+TOTALS_ID = "global"
+_MAX_TOPK_STAGES = 100  # labels folded per update; aggregation pipelines are capped at 1000 stages
+
+
+def hist_bucket(score) -> str:
+    return HIST_LABELS[max(0, min(int(score) // 20, 4))]
+
+
+def day_key(created_at) -> str:
+    return created_at.strftime("%Y-%m-%d")
+
+
+def _fold(scores: list) -> dict:
+    hist = {}
+    for score in scores:
+        bucket = f"hist.{hist_bucket(score)}"
+        hist[bucket] = hist.get(bucket, 0) + 1
+    return {
+        "$inc": {"count": len(scores), "score_sum": sum(scores), **hist},
+        "$min": {"score_min": min(scores)},
+        "$max": {"score_max": max(scores)},
+    }
+
+
+def _topk_stage(label: str, delta: int) -> dict:
+    """One Space-Saving step on `items` as an atomic update-pipeline stage.
+
+    +delta: bump the label, or add it while there is room, or replace the
+    minimum counter (count = min + delta, error = min).
+    -delta: decrement the label if tracked; zeroed counters are dropped.
+    """
+    label = {"$literal": label}
+    bump = {"$map": {"input": "$$items", "as": "i", "in": {"$cond": [
+        {"$eq": ["$$i.label", label]},
+        {"label": "$$i.label", "count": {"$max": [0, {"$add": ["$$i.count", delta]}]}, "error": "$$i.error"},
+        "$$i",
+    ]}}}
+    if delta < 0:
+        updated = {"$filter": {"input": bump, "as": "i", "cond": {"$gt": ["$$i.count", 0]}}}
+    else:
+        insert = {"$cond": [
+            {"$lt": [{"$size": "$$items"}, LABEL_TOPK_CAPACITY]},
+            {"$concatArrays": ["$$items", [{"label": label, "count": delta, "error": 0}]]},
+            {"$let": {"vars": {"floor": {"$min": "$$items.count"}}, "in": {"$let": {
+                "vars": {"victim": {"$indexOfArray": ["$$items.count", "$$floor"]}},
+                "in": {"$map": {"input": {"$range": [0, {"$size": "$$items"}]}, "as": "n", "in": {"$cond": [
+                    {"$eq": ["$$n", "$$victim"]},
+                    {"label": label, "count": {"$add": ["$$floor", delta]}, "error": "$$floor"},
+                    {"$arrayElemAt": ["$$items", "$$n"]},
+                ]}}},
+            }}}},
+        ]}
+        updated = {"$cond": [{"$in": [label, "$$items.label"]}, bump, insert]}
+    return {"$set": {"items": {"$let": {"vars": {"items": {"$ifNull": ["$items", []]}}, "in": updated}}}}
+
+
+async def _apply_topk(db, kind: str, deltas: dict, upsert: bool):
+    """Apply {label: delta} to one kind's counters, in pipelines of bounded length."""
+    stages = [_topk_stage(label, delta) for label, delta in deltas.items()]
+    for i in range(0, len(stages), _MAX_TOPK_STAGES):
+        await db.analytics_topk.update_one({"_id": kind}, stages[i:i + _MAX_TOPK_STAGES], upsert=upsert)
+
+
+async def _update_topk(db, canonical: dict, delta: int):
+    for kind, values in canonical.items():
+        if values:
+            await _apply_topk(db, kind, {label: delta for label in values}, upsert=delta > 0)
+
+
+async def record_analysis(db, score: int, created_at, canonical_labels: dict):
+    """Fold one new analysis into the totals, its day and its top-k labels."""
+    update = _fold([score])
+    await db.analytics_totals.update_one({"_id": TOTALS_ID}, update, upsert=True)
+    await db.analytics_daily.update_one({"_id": day_key(created_at)}, update, upsert=True)
+    await _update_topk(db, canonical_labels, 1)
+
+
+async def record_analyses(db, docs: list):
+    """Batch form of record_analysis: one update for the totals, per day and per label kind."""
+    if not docs:
+        return
+    await db.analytics_totals.update_one({"_id": TOTALS_ID}, _fold([d["score"] for d in docs]), upsert=True)
+    by_day = {}
+    for doc in docs:
+        by_day.setdefault(day_key(doc["created_at"]), []).append(doc["score"])
+    await db.analytics_daily.bulk_write(
+        [UpdateOne({"_id": day}, _fold(scores), upsert=True) for day, scores in by_day.items()],
+        ordered=False,
+    )
+    for kind in labels.LABEL_FIELDS:
+        counts = Counter(label for doc in docs for label in doc["labels"].get(kind, []))
+        if counts:
+            await _apply_topk(db, kind, counts, upsert=True)
+
+
+async def record_deletion(db, doc: dict):
+    """Undo record_analysis for a deleted resume document."""
+    score = doc.get("score", 0)
+    update = {"$inc": {"count": -1, "score_sum": -score, f"hist.{hist_bucket(score)}": -1}}
+    await db.analytics_totals.update_one({"_id": TOTALS_ID}, update)
+    await db.analytics_daily.update_one({"_id": day_key(doc["created_at"])}, update)
+    canonical = doc.get("labels") or await labels.canonicalize_result(db, doc.get("result") or {})
+    await _update_topk(db, canonical, -1)
+
+
+async def totals(db) -> dict:
+    return await db.analytics_totals.find_one({"_id": TOTALS_ID}) or {}
+
+
+async def daily(db, since_day: str) -> list:
+    return await db.analytics_daily.find({"_id": {"$gte": since_day}}).sort("_id", 1).to_list(None)
+
+
+async def top_labels(db, kind: str, n: int = 10) -> list:
+    doc = await db.analytics_topk.find_one({"_id": kind}) or {}
+    items = sorted(doc.get("items", []), key=lambda i: -i["count"])[:n]
+    return [{"label": i["label"], "count": i["count"]} for i in items]
+
+
+def _hist_fields() -> dict:
+    bounds = [0, 20, 40, 60, 80]
+    fields = {}
+    for idx, label in enumerate(HIST_LABELS):
+        cond = {"$gte": ["$score", bounds[idx]]}
+        if idx < len(HIST_LABELS) - 1:
+            cond = {"$and": [cond, {"$lt": ["$score", bounds[idx + 1]]}]}
+        fields[label] = {"$sum": {"$cond": [cond, 1, 0]}}
+    return fields
+
+
+def _group_stage(group_id) -> dict:
+    return {"$group": {
+        "_id": group_id,
+        "count": {"$sum": 1},
+        "score_sum": {"$sum": "$score"},
+        "score_min": {"$min": "$score"},
+        "score_max": {"$max": "$score"},
+        **{f"hist_{label}": expr for label, expr in _hist_fields().items()},
+    }}
+
+
+def _nest_hist_stage() -> dict:
+    return {"$project": {
+        "count": 1, "score_sum": 1, "score_min": 1, "score_max": 1,
+        "hist": {label: f"$hist_{label}" for label in HIST_LABELS},
+    }}
+
+
+async def rebuild(db) -> dict:
+    """Recompute every rollup from the resumes collection.
+
+    Increments that land while this runs can be lost; run it off-peak.
+    """
+    await db.resumes.aggregate([
+        _group_stage({"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}),
+        _nest_hist_stage(),
+        {"$out": "analytics_daily"},
+    ]).to_list(None)
+
+    rows = await db.resumes.aggregate([_group_stage(None), _nest_hist_stage()]).to_list(1)
+    if rows:
+        await db.analytics_totals.replace_one({"_id": TOTALS_ID}, {**rows[0], "_id": TOTALS_ID}, upsert=True)
+    else:
+        await db.analytics_totals.delete_one({"_id": TOTALS_ID})
+
+    # labels: canonicalize in Python (bounded cache) into bounded Space-Saving
+    # summaries, backfilling `labels` on documents written before it existed
+    summaries = {kind: labels.SpaceSaving(LABEL_TOPK_CAPACITY) for kind in labels.LABEL_FIELDS}
+    backfill = []
+    async for doc in db.resumes.find({}, {"result": 1, "result_hash": 1, "labels": 1}).batch_size(1000):
+        canonical = doc.get("labels")
+        if canonical is None:
+            canonical = await labels.canonicalize_result(db, await blobs.load_result(db, doc))
+            backfill.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"labels": canonical}}))
+            if len(backfill) >= 1000:
+                await db.resumes.bulk_write(backfill, ordered=False)
+                backfill = []
+        for kind, values in canonical.items():
+            for label in values:
+                summaries[kind].add(label)
+    if backfill:
+        await db.resumes.bulk_write(backfill, ordered=False)
+    for kind, summary in summaries.items():
+        await db.analytics_topk.replace_one({"_id": kind}, {"items": summary.top(LABEL_TOPK_CAPACITY)}, upsert=True)
+
+    return {
+        "days": await db.analytics_daily.count_documents({}),
+        "labels_tracked": {kind: len(summary.counters) for kind, summary in summaries.items()},
+        "resumes": rows[0]["count"] if rows else 0,
+    }
+
+
+async def _main(args):
+    await connect_db()
+    try:
+        if args.rebuild:
+            print(f"[ROLLUPS] rebuilt: {await rebuild(get_db())}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="reconcile all rollups with the resumes collection")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+    else:
+        asyncio.run(_main(args))
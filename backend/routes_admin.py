@@ -1,8 +1,12 @@
 """Admin-only analytics endpoints. Read-only queries — no existing logic changed."""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from backend.auth import get_current_user
+import re
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from backend.auth import get_current_user, get_cache_stats as auth_cache_stats
 from backend.database import get_db
-from bson import ObjectId
+from backend import analysis_cache, prompt_cache, pagination, ranking, rollups, search_index, singleflight
+from backend.routes_resume import HISTORY_PROJECTION, history_row, parse_rank_request, stream_history
 from datetime import datetime, timezone, timedelta
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -19,82 +23,142 @@ async def require_admin(user: dict = Depends(get_current_user)):
 @router.get("/stats")
 async def admin_stats(user: dict = Depends(require_admin)):
     db = get_db()
-    total_users = await db.users.count_documents({})
-    total_resumes = await db.resumes.count_documents({})
-
-    pipeline_scores = [
-        {"$group": {
-            "_id": None,
-            "avg": {"$avg": "$score"},
-            "max": {"$max": "$score"},
-            "min": {"$min": "$score"},
-        }}
-    ]
-    scores = await db.resumes.aggregate(pipeline_scores).to_list(1)
-    s = scores[0] if scores else {}
-
+    t = await rollups.totals(db)
+    count = t.get("count", 0)
     return {
-        "total_users": total_users,
-        "total_resumes": total_resumes,
-        "avg_score": round(s.get("avg", 0), 1),
-        "max_score": s.get("max", 0),
-        "min_score": s.get("min", 0),
+        "total_users": await db.users.estimated_document_count(),
+        "total_resumes": count,
+        "avg_score": round(t.get("score_sum", 0) / count, 1) if count else 0,
+        "max_score": t.get("score_max", 0),
+        "min_score": t.get("score_min", 0),
     }
 
 
 @router.get("/users")
-async def admin_users(user: dict = Depends(require_admin)):
+async def admin_users(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    role: Optional[str] = None,
+    sort: str = Query("created_at", pattern="^(created_at|name|email)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    user: dict = Depends(require_admin),
+):
+    """Users with resume count and last activity: one $lookup pipeline per page.
+
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
     db = get_db()
+    direction = -1 if order == "desc" else 1
+    match = {}
+    if q:
+        pattern = {"$regex": re.escape(q), "$options": "i"}
+        match["$or"] = [{"name": pattern}, {"email": pattern}]
+    if role:
+        match["role"] = {"$in": ["user", None]} if role == "user" else role
+    if cursor:
+        match = {"$and": [match, pagination.keyset_filter(sort, direction, cursor)]}
+
+    rows = await db.users.aggregate([
+        {"$match": match},
+        {"$sort": {sort: direction, "_id": direction}},
+        {"$limit": limit + 1},
+        {"$project": {"name": 1, "email": 1, "role": 1, "created_at": 1, "uid": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": "resumes",
+            "localField": "uid",
+            "foreignField": "user_id",
+            "pipeline": [
+                {"$project": {"created_at": 1}},
+                {"$group": {"_id": None, "count": {"$sum": 1}, "last": {"$max": "$created_at"}}},
+            ],
+            "as": "activity",
+        }},
+    ]).to_list(limit + 1)
+    rows, next_cursor = pagination.page(rows, limit, sort)
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+
     users = []
-    async for u in db.users.find().sort("created_at", -1):
-        resume_count = await db.resumes.count_documents({"user_id": str(u["_id"])})
-        last_resume = await db.resumes.find_one(
-            {"user_id": str(u["_id"])},
-            sort=[("created_at", -1)],
-        )
+    for u in rows:
+        activity = u["activity"][0] if u["activity"] else {}
+        created_at = u.get("created_at", datetime.now(timezone.utc))
         users.append({
-            "id": str(u["_id"]),
+            "id": u["uid"],
             "name": u.get("name", ""),
             "email": u.get("email", ""),
             "role": u.get("role", "user"),
-            "resume_count": resume_count,
-            "last_active": last_resume["created_at"].isoformat() if last_resume else u.get("created_at", datetime.now(timezone.utc)).isoformat(),
-            "created_at": u.get("created_at", datetime.now(timezone.utc)).isoformat(),
+            "resume_count": activity.get("count", 0),
+            "last_active": (activity.get("last") or created_at).isoformat(),
+            "created_at": created_at.isoformat(),
         })
     return users
 
 
+def _legacy_resume_row(doc: dict) -> dict:
+    return {**history_row(doc), "result": doc.get("result", {})}
+
+
 @router.get("/users/{user_id}/resumes")
-async def admin_user_resumes(user_id: str, admin: dict = Depends(require_admin)):
+async def admin_user_resumes(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    all_items: bool = Query(False, alias="all", description="legacy: every resume with its full result"),
+    admin: dict = Depends(require_admin),
+):
+    """A user's analyses, newest first, one keyset page at a time (X-Next-Cursor).
+
+    `?all=1` restores the old unpaginated listing including each `result`.
+    """
     db = get_db()
-    results = []
-    async for doc in db.resumes.find({"user_id": user_id}).sort("created_at", -1):
-        results.append({
-            "id": str(doc["_id"]),
-            "filename": doc.get("filename", ""),
-            "score": doc.get("score", 0),
-            "result": doc.get("result", {}),
-            "created_at": doc["created_at"].isoformat(),
-        })
-    return results
+    if all_items:
+        return await stream_history(
+            db.resumes, {"user_id": user_id}, {"resume_text": 0}, _legacy_resume_row, limit, None, True, with_results=True,
+        )
+    return await stream_history(db.resumes, {"user_id": user_id}, HISTORY_PROJECTION, history_row, limit, cursor, False)
 
 
 @router.get("/top-resumes")
-async def admin_top_resumes(limit: int = Query(5, le=20), user: dict = Depends(require_admin)):
+async def admin_top_resumes(
+    response: Response,
+    limit: int = Query(5, ge=1, le=20),
+    cursor: Optional[str] = None,
+    user: dict = Depends(require_admin),
+):
+    """Highest-scoring resumes with the owner's name joined in the same pipeline."""
     db = get_db()
-    results = []
-    async for doc in db.resumes.find().sort("score", -1).limit(limit):
-        # look up user name
-        uid = doc.get("user_id")
-        u = await db.users.find_one({"_id": ObjectId(uid)}) if uid else None
-        results.append({
-            "id": str(doc["_id"]),
-            "filename": doc.get("filename", ""),
-            "score": doc.get("score", 0),
-            "user_name": u["name"] if u else "Unknown",
-            "created_at": doc["created_at"].isoformat(),
-        })
-    return results
+    match = pagination.keyset_filter("score", -1, cursor) if cursor else {}
+    rows = await db.resumes.aggregate([
+        {"$match": match},
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "filename": 1,
+            "score": 1,
+            "created_at": 1,
+            "uid": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None, "onNull": None}},
+        }},
+        {"$lookup": {
+            "from": "users",
+            "localField": "uid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"name": 1}}],
+            "as": "owner",
+        }},
+    ]).to_list(limit + 1)
+    rows, next_cursor = pagination.page(rows, limit, "score")
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+
+    return [{
+        "id": str(doc["_id"]),
+        "filename": doc.get("filename", ""),
+        "score": doc.get("score", 0),
+        "user_name": doc["owner"][0].get("name", "Unknown") if doc["owner"] else "Unknown",
+        "created_at": doc["created_at"].isoformat(),
+    } for doc in rows]
 
 
 @router.get("/activity")
@@ -102,63 +166,65 @@ async def admin_activity(days: int = Query(30, le=365), user: dict = Depends(req
     """Resumes analyzed per day for the last N days."""
     db = get_db()
     since = datetime.now(timezone.utc) - timedelta(days=days)
-    pipeline = [
-        {"$match": {"created_at": {"$gte": since}}},
-        {"$group": {
-            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
-            "count": {"$sum": 1},
-            "avg_score": {"$avg": "$score"},
-        }},
-        {"$sort": {"_id": 1}},
+    data = await rollups.daily(db, rollups.day_key(since))
+    return [
+        {"date": d["_id"], "count": d["count"], "avg_score": round(d["score_sum"] / d["count"], 1)}
+        for d in data if d.get("count", 0) > 0
     ]
-    data = await db.resumes.aggregate(pipeline).to_list(365)
-    return [{"date": d["_id"], "count": d["count"], "avg_score": round(d["avg_score"], 1)} for d in data]
 
 
 @router.get("/analytics")
 async def admin_analytics(user: dict = Depends(require_admin)):
-    """Aggregate weaknesses, missing keywords, strengths across all resumes."""
+    """Most common weaknesses, missing keywords and strengths across all resumes."""
     db = get_db()
-
-    weakness_freq = {}
-    keyword_freq = {}
-    strength_freq = {}
-
-    async for doc in db.resumes.find({}, {"result": 1}):
-        r = doc.get("result", {})
-        for w in r.get("weaknesses", []):
-            weakness_freq[w] = weakness_freq.get(w, 0) + 1
-        for k in r.get("missing_keywords", []):
-            keyword_freq[k] = keyword_freq.get(k, 0) + 1
-        for s in r.get("strengths", []):
-            strength_freq[s] = strength_freq.get(s, 0) + 1
-
-    def top(d, n=10):
-        return sorted(d.items(), key=lambda x: -x[1])[:n]
-
     return {
-        "common_weaknesses": [{"label": k, "count": v} for k, v in top(weakness_freq)],
-        "missing_keywords": [{"label": k, "count": v} for k, v in top(keyword_freq)],
-        "top_strengths": [{"label": k, "count": v} for k, v in top(strength_freq)],
+        "common_weaknesses": await rollups.top_labels(db, "weakness"),
+        "missing_keywords": await rollups.top_labels(db, "keyword"),
+        "top_strengths": await rollups.top_labels(db, "strength"),
     }
 
 
 @router.get("/score-distribution")
 async def score_distribution(user: dict = Depends(require_admin)):
     db = get_db()
-    pipeline = [
-        {"$bucket": {
-            "groupBy": "$score",
-            "boundaries": [0, 20, 40, 60, 80, 101],
-            "default": "other",
-            "output": {"count": {"$sum": 1}},
-        }}
-    ]
-    data = await db.resumes.aggregate(pipeline).to_list(10)
-    labels = ["0-19", "20-39", "40-59", "60-79", "80-100"]
-    result = []
-    for i, d in enumerate(data):
-        if isinstance(d["_id"], (int, float)):
-            idx = min(int(d["_id"]) // 20, 4)
-            result.append({"range": labels[idx], "count": d["count"]})
-    return result
+    hist = (await rollups.totals(db)).get("hist", {})
+    return [{"range": label, "count": hist[label]} for label in rollups.HIST_LABELS if hist.get(label, 0) > 0]
+
+
+@router.post("/rank")
+async def admin_rank(request: Request, user: dict = Depends(require_admin)):
+    """Rank every stored resume against a job description; same body as /rank."""
+    parsed = parse_rank_request(await request.json())
+    if isinstance(parsed, JSONResponse):
+        return parsed
+    job_description, top_k, shortlist = parsed
+    db = get_db()
+    ranked = await ranking.rank(db, job_description, top_k)
+    await ranking.review_shortlist(db, job_description, ranked["results"], shortlist)
+    return ranked
+
+
+@router.get("/search")
+async def admin_search(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    user: dict = Depends(require_admin),
+):
+    """Keyword search over every stored resume; same syntax as /search."""
+    try:
+        return await search_index.search(get_db(), q, limit=limit)
+    except search_index.QueryError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+
+
+@router.get("/cache-stats")
+async def cache_stats(user: dict = Depends(require_admin)):
+    """Hit/miss/eviction counters for this worker's caches and coalesced duplicate
+    requests, plus all-time prompt cache savings."""
+    return {
+        "analysis": analysis_cache.get_stats(),
+        "auth": auth_cache_stats(),
+        "prompts": prompt_cache.get_stats(),
+        "singleflight": singleflight.get_stats(),
+        "prompt_savings": await prompt_cache.savings(get_db()),
+    }
@@ -3,7 +3,14 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, EmailStr
 from backend.database import get_db
-from backend.auth import hash_password, verify_password, create_access_token, get_current_user
+from backend.auth import (
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
+    create_access_token,
+    get_current_user,
+    invalidate_user,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -47,7 +54,7 @@ async def register(req: RegisterRequest):
         user_doc = {
             "name": req.name,
             "email": req.email,
-            "password": hash_password(req.password),
+            "password": await hash_password_async(req.password),
             "role": role,
             "created_at": datetime.now(timezone.utc),
         }
@@ -75,9 +82,18 @@ async def login(req: LoginRequest):
         if db is None:
             raise HTTPException(status_code=503, detail="Database not connected. Check MONGO_URI env var.")
         user = await db.users.find_one({"email": req.email})
-        if not user or not verify_password(req.password, user["password"]):
+        if not user or not await verify_password_async(req.password, user["password"]):
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
+        if needs_rehash(user["password"]):
+            # cost factor changed: upgrade the stored hash while we have the plaintext
+            try:
+                new_hash = await hash_password_async(req.password)
+                await db.users.update_one({"_id": user["_id"], "password": user["password"]}, {"$set": {"password": new_hash}})
+                invalidate_user(str(user["_id"]))
+            except Exception as e:
+                print(f"[LOGIN] rehash failed for {user['_id']}: {type(e).__name__}: {e}")
+
         token = create_access_token({"sub": str(user["_id"])})
 
         return {
@@ -1,79 +1,43 @@
 import re
 import json
+import asyncio
+from contextlib import aclosing
 from datetime import datetime, timezone
-from fastapi import APIRouter, UploadFile, File, Depends, Request
-from fastapi.responses import JSONResponse
-from google import genai
-from pypdf import PdfReader
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Depends, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from bson import ObjectId
-from backend.config import GEMINI_API_KEY, GEMINI_MODEL
+from pymongo.errors import DuplicateKeyError
+from backend import llm, analysis_cache, pdf_extract, scoring, leaderboard, rollups, labels, jobs, batch, terms, ranking, search_index, pagination, blobs, prompt_cache, prompts, metrics, stream_parse, singleflight
 from backend.auth import get_current_user
 from backend.database import get_db
 
 router = APIRouter(tags=["resume"])
 
-# Gemini client
-_client = genai.Client(api_key=GEMINI_API_KEY)
+PROMPT_CACHE_HEADER = "X-Prompt-Cache"  # exact | similar | miss
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 
 # ----- helpers (unchanged from original) -----
 
 def extract_text_from_pdf(file):
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+    """Synchronous extraction for scripts; endpoints use pdf_extract.extract_text_async."""
+    return pdf_extract.extract_text(file.read())
 
 
 def calculate_resume_score(text: str):
-    score = 0
-    skills = ["python", "java", "c++", "machine learning", "sql", "aws", "react"]
-    skill_count = sum(1 for skill in skills if skill.lower() in text.lower())
-    score += min(skill_count * 3, 20)
+    return scoring.score_resume(text)["score"]
 
-    numbers = re.findall(r"\d+%|\d+\+", text)
-    score += min(len(numbers) * 4, 20)
 
-    years = re.findall(r"\d+\s+years", text.lower())
-    score += min(len(years) * 5, 20)
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-    verbs = ["developed", "built", "designed", "implemented", "optimized"]
-    verb_count = sum(1 for v in verbs if v in text.lower())
-    score += min(verb_count * 2, 10)
 
-    word_count = len(text.split())
-    if word_count > 300:
-        score += 15
-    elif word_count > 200:
-        score += 10
+async def analyze_with_gemini(text: str):
+    return parse_analysis(await llm.generate(prompts.analysis(text), endpoint="analyze"))
 
-    if "experience" in text.lower() and "education" in text.lower():
-        score += 15
-
-    return min(score, 100)
-
-
-def analyze_with_gemini(text: str):
-    prompt = f"""
-You are a professional ATS resume evaluator.
-
-Analyze the resume below and return your analysis as valid JSON with these exact keys:
-- "strengths": array of strings listing resume strengths
-- "weaknesses": array of strings listing resume weaknesses
-- "missing_keywords": array of strings listing important missing keywords
-- "suggestions": array of strings with improvement suggestions
-- "hr_questions": array of 5 tailored interview questions for this candidate
-- "tips": array of actionable do's and don'ts
-
-Return ONLY the JSON object, no markdown code fences, no extra text.
-
-Resume:
-{text}
-"""
-    response = _client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    raw_text = response.text or ""
 
+def parse_analysis(raw_text: str) -> dict:
     try:
         cleaned = raw_text.strip()
         if cleaned.startswith("```"):
@@ -86,14 +50,8 @@ Resume:
 
 def keyword_overlap_score(resume_text: str, job_description: str):
     """Simple ATS-style overlap score for quick deterministic feedback."""
-    stop = {
-        "the", "and", "for", "with", "from", "that", "this", "are", "you", "your",
-        "have", "has", "will", "our", "job", "role", "work", "team", "years", "year",
-        "experience", "skills", "required", "preferred", "ability", "using", "within",
-    }
-    token_re = re.compile(r"[a-zA-Z][a-zA-Z0-9+#.-]{1,}")
-    resume_tokens = {t.lower() for t in token_re.findall(resume_text) if t.lower() not in stop}
-    job_tokens = {t.lower() for t in token_re.findall(job_description) if t.lower() not in stop}
+    resume_tokens = terms.term_set(resume_text)
+    job_tokens = terms.term_set(job_description)
     if not job_tokens:
         return 0, []
 
@@ -114,19 +72,44 @@ def extract_json_response(raw_text: str, fallback: dict):
         return fallback
 
 
-# ----- API Endpoints -----
+async def cached_generate(endpoint: str, resume_text: str, query_text: str, build_prompt, fallback):
+    """(parsed Gemini JSON for `build_prompt()`, "exact" | "similar" | "miss").
 
-@router.post("/analyze")
-async def analyze_resume(
-    file: UploadFile = File(...),
-    user: dict = Depends(get_current_user),
-):
-    """Analyze a resume PDF. Requires auth. Saves result to history."""
-    text = extract_text_from_pdf(file.file)
-    algorithm_score = calculate_resume_score(text)
-    gemini_result = analyze_with_gemini(text)
+    Answers are reused for the same resume and an identical or lightly edited
+    role/JD (`query_text`); unparseable replies are not cached.
+    """
+    with metrics.stage("cache"):
+        probe = prompt_cache.probe(endpoint, resume_text, query_text)
+        cached, kind = await prompt_cache.get(probe)
+    if cached is not None:
+        return cached, kind
+    prompt = build_prompt()  # compaction only runs on a cache miss
+    raw = await llm.generate(prompt, endpoint=endpoint)
+    payload = extract_json_response(raw, fallback)
+    if payload is not fallback and isinstance(payload, dict):
+        tokens = prompts.estimate_tokens(prompt) + prompts.estimate_tokens(raw)
+        await prompt_cache.put(probe, payload, tokens)
+    return payload, "miss"
 
-    result = {
+
+async def build_analysis(text: str, algorithm_score: int = None) -> dict:
+    """Score + Gemini analysis for `text`; successful results are cached."""
+    if algorithm_score is None:
+        with metrics.stage("score"):
+            algorithm_score = calculate_resume_score(text)
+    return await finish_analysis(text, algorithm_score, await analyze_with_gemini(text))
+
+
+async def finish_analysis(text: str, algorithm_score: int, gemini_result: dict) -> dict:
+    result = make_result(algorithm_score, gemini_result)
+    if "raw" not in gemini_result:  # don't pin unparseable model output
+        await analysis_cache.put(text, result)
+    return result
+
+
+def make_result(algorithm_score: int, gemini_result: dict) -> dict:
+    """The /analyze response shape, with defaults for anything Gemini left out."""
+    return {
         "algorithm_score": algorithm_score,
         "ai_analysis": gemini_result.get("raw", ""),
         "strengths": gemini_result.get("strengths", []),
@@ -149,22 +132,212 @@ async def analyze_resume(
         ]),
     }
 
-    # Save to history
-    db = get_db()
-    history_doc = {
+
+async def build_history_doc(db, user: dict, filename: str, text: str, result: dict) -> dict:
+    return {
         "user_id": user["id"],
-        "filename": file.filename,
-        "score": algorithm_score,
+        "filename": filename,
+        "score": result["algorithm_score"],
         "result": result,
+        "labels": await labels.canonicalize_result(db, result),
         "resume_text": text[:20000],
         "created_at": datetime.now(timezone.utc),
     }
-    inserted = await db.resumes.insert_one(history_doc)
-    result["history_id"] = str(inserted.inserted_id)
 
+
+async def save_analysis(db, user: dict, filename: str, text: str, result: dict, history_id: ObjectId = None) -> str:
+    """Write a history document and fold it into the rollups; returns its id.
+
+    With `history_id` the save happens at most once: if that document already
+    exists (a retried job), nothing is written or counted again.
+    """
+    with metrics.stage("db_write"):
+        if history_id is not None and await db.resumes.find_one({"_id": history_id}, {"_id": 1}):
+            return str(history_id)
+        history_doc = await build_history_doc(db, user, filename, text, result)
+        if history_id is not None:
+            history_doc["_id"] = history_id
+        texts = await blobs.externalize(db, [history_doc])
+        await search_index.assign_numbers(db, [history_doc])
+        try:
+            inserted = await db.resumes.insert_one(history_doc)
+        except DuplicateKeyError:
+            if history_id is None or await db.resumes.find_one({"_id": history_id}, {"_id": 1}) is None:
+                raise
+            await blobs.release(db, [history_doc])  # a concurrent retry saved it first
+            return str(history_id)
+        await search_index.add(db, [history_doc], texts)
+        await leaderboard.record_analysis(db, user, history_doc["score"], history_doc["created_at"])
+        await rollups.record_analysis(db, history_doc["score"], history_doc["created_at"], history_doc["labels"])
+        return str(inserted.inserted_id)
+
+
+async def save_analyses(db, user: dict, history_docs: list) -> list:
+    """Batch form of save_analysis: one insert_many and one rollup pass; returns ids in order."""
+    if not history_docs:
+        return []
+    with metrics.stage("db_write"):
+        texts = await blobs.externalize(db, history_docs)
+        await search_index.assign_numbers(db, history_docs)
+        inserted = await db.resumes.insert_many(history_docs, ordered=True)
+        await search_index.add(db, history_docs, texts)
+        scores = [doc["score"] for doc in history_docs]
+        latest = max(doc["created_at"] for doc in history_docs)
+        await leaderboard.record_analysis(db, user, max(scores), latest, count=len(history_docs))
+        await rollups.record_analyses(db, history_docs)
+        return [str(_id) for _id in inserted.inserted_ids]
+
+
+# ----- API Endpoints -----
+
+@router.post("/analyze")
+async def analyze_resume(
+    file: UploadFile = File(...),
+    async_mode: bool = Query(False, alias="async"),
+    user: dict = Depends(get_current_user),
+):
+    """Analyze a resume PDF. Requires auth. Saves result to history.
+
+    With ?async=1 the upload is queued and a job id is returned right away;
+    follow it at /jobs/{id} or /jobs/{id}/events.
+    """
+    try:
+        data = pdf_extract.read_upload(file.file)
+    except pdf_extract.PDFExtractionError as e:
+        return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+
+    if async_mode:
+        job_id = await jobs.enqueue(get_db(), user, file.filename, data)
+        return JSONResponse({
+            "job_id": job_id,
+            "status": "queued",
+            "poll_url": f"/jobs/{job_id}",
+            "events_url": f"/jobs/{job_id}/events",
+        }, status_code=202)
+
+    try:
+        text = await pdf_extract.extract_text_async(data)
+    except pdf_extract.PDFExtractionError as e:
+        return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+
+    async def analyze_and_save():
+        with metrics.stage("cache"):
+            result = await analysis_cache.get(text)
+        if result is None:
+            result = await build_analysis(text)
+        result["history_id"] = await save_analysis(get_db(), user, file.filename, text, result)
+        return result
+
+    # a double-submit of the same file waits for the first and gets the same history entry
+    result = await singleflight.run(singleflight.key("analyze", user["id"], file.filename, text), analyze_and_save)
     return JSONResponse(result)
 
 
+async def stream_analysis(user: dict, filename: str, text: str, emit) -> dict:
+    """Analyze and save like /analyze, passing score/item/field frames to `emit` as they come."""
+    with metrics.stage("cache"):
+        result = await analysis_cache.get(text)
+    if result is None:
+        with metrics.stage("score"):
+            algorithm_score = calculate_resume_score(text)
+        emit(sse("score", {"algorithm_score": algorithm_score}))
+
+        parser, chunks = stream_parse.JSONFields(), []
+        async with aclosing(llm.generate_stream(prompts.analysis(text), endpoint="analyze")) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                for kind, field, value in parser.feed(chunk):
+                    if kind == "item":
+                        emit(sse("item", {"field": field, "value": value}))
+                    elif not isinstance(value, list):  # lists already went out item by item
+                        emit(sse("field", {"field": field, "value": value}))
+        result = await finish_analysis(text, algorithm_score, parse_analysis("".join(chunks)))
+
+    result["history_id"] = await save_analysis(get_db(), user, filename, text, result)
+    return result
+
+
+async def analysis_events(user: dict, filename: str, text: str):
+    """SSE frames for /analyze/stream (see there).
+
+    Shares the /analyze single-flight key: the first request streams, a
+    duplicate (double-click, retry, or a plain /analyze of the same file)
+    waits for that call and gets its saved result as one result frame.
+    """
+    frames = asyncio.Queue()
+    shared = asyncio.ensure_future(singleflight.run(
+        singleflight.key("analyze", user["id"], filename, text),
+        lambda: stream_analysis(user, filename, text, frames.put_nowait),
+    ))
+    shared.add_done_callback(lambda _: frames.put_nowait(None))
+    try:
+        while (frame := await frames.get()) is not None:
+            yield frame
+        try:
+            result = shared.result()
+        except Exception as e:
+            yield sse("error", {"detail": f"Analysis failed: {type(e).__name__}"})
+            return
+        yield sse("result", result)
+    finally:
+        shared.cancel()  # a disconnect stops our wait, not the shared call
+
+
+@router.post("/analyze/stream")
+async def analyze_resume_stream(file: UploadFile = File(...), user: dict = Depends(get_current_user)):
+    """/analyze as server-sent events, so the page fills in while Gemini writes:
+
+    score (right after extraction) -> item {field, value} for each strength,
+    weakness, suggestion... as soon as it is complete -> result (the /analyze
+    response, saved to history), or error. A cached analysis, or a duplicate
+    of an upload that is still being analyzed, goes straight to result.
+    """
+    try:
+        data = pdf_extract.read_upload(file.file)
+        text = await pdf_extract.extract_text_async(data)
+    except pdf_extract.PDFExtractionError as e:
+        return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+    return StreamingResponse(
+        analysis_events(user, file.filename, text), media_type="text/event-stream", headers=SSE_HEADERS,
+    )
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    user: dict = Depends(get_current_user),
+):
+    """Analyze many PDFs (or zips of PDFs). Streams NDJSON: one line per file as it
+    completes, then a summary line with the saved history ids."""
+    try:
+        items = await batch.collect_uploads_async(files)
+    except pdf_extract.PDFExtractionError as e:
+        return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+    return StreamingResponse(batch.stream_ndjson(get_db(), user, items), media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, user: dict = Depends(get_current_user)):
+    """Current state of an async analysis job. `score` is set once scoring is done."""
+    job = await jobs.get_job(get_db(), job_id, user["id"])
+    if job is None:
+        return JSONResponse({"detail": "Not found"}, status_code=404)
+    return jobs.public_view(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, user: dict = Depends(get_current_user)):
+    """Server-sent events, one per stage: extracted, scored, ai_done, saved (or failed)."""
+    db = get_db()
+    if await jobs.get_job(db, job_id, user["id"]) is None:
+        return JSONResponse({"detail": "Not found"}, status_code=404)
+    return StreamingResponse(
+        jobs.stream_events(db, job_id, user["id"]),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.post("/job-match")
 async def job_match(request: Request, user: dict = Depends(get_current_user)):
     """Analyze resume against a target job description and return fit + rewrite guidance."""
@@ -179,34 +352,15 @@ async def job_match(request: Request, user: dict = Depends(get_current_user)):
         db = get_db()
         latest = await db.resumes.find_one({"user_id": user["id"]}, sort=[("created_at", -1)])
         if latest:
-            resume_text = latest.get("resume_text") or ""
+            resume_text = await blobs.load_text(db, latest)
             if not resume_text:
-                resume_text = (latest.get("result", {}).get("ai_analysis") or "")[:5000]
+                resume_text = ((await blobs.load_result(db, latest)).get("ai_analysis") or "")[:5000]
 
     if not resume_text:
         return JSONResponse({"detail": "No resume data found. Upload and analyze a resume first."}, status_code=400)
 
     overlap_score, missing_keywords = keyword_overlap_score(resume_text, job_description)
 
-    prompt = f"""
-You are a senior recruiting mentor and ATS expert.
-Compare the candidate resume against the target job description.
-
-Return valid JSON with exact keys:
-- \"match_score\": integer (0-100)
-- \"top_matches\": array of strings
-- \"gaps\": array of strings
-- \"priority_keywords\": array of strings
-- \"rewrite_summary\": string (2-3 lines)
-- \"bullet_rewrites\": array of 4 improved resume bullets aligned to job expectations
-
-Resume:
-{resume_text[:12000]}
-
-Job Description:
-{job_description[:9000]}
-"""
-
     ai_payload = {
         "match_score": overlap_score,
         "top_matches": [],
@@ -216,9 +370,15 @@ Job Description:
         "bullet_rewrites": [],
     }
 
+    cache_status = "miss"
     try:
-        response = _client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-        ai_payload = extract_json_response(response.text or "", ai_payload)
+        ai_payload, cache_status = await singleflight.run(
+            singleflight.key("job_match", user["id"], resume_text, job_description),
+            lambda: cached_generate(
+                "job_match", resume_text, job_description,
+                lambda: prompts.job_match(resume_text, job_description), ai_payload,
+            ),
+        )
     except Exception:
         pass
 
@@ -227,7 +387,34 @@ Job Description:
     if not ai_payload.get("priority_keywords"):
         ai_payload["priority_keywords"] = missing_keywords[:8]
 
-    return JSONResponse(ai_payload)
+    return JSONResponse(ai_payload, headers={PROMPT_CACHE_HEADER: cache_status})
+
+
+def parse_rank_request(data: dict):
+    """(job_description, top_k, shortlist) from a /rank body, or a 400 JSONResponse."""
+    job_description = (data.get("job_description") or "").strip()
+    if not job_description:
+        return JSONResponse({"detail": "job_description is required"}, status_code=400)
+    try:
+        top_k = max(1, min(int(data.get("top_k", 10)), 100))
+        shortlist = max(0, min(int(data.get("shortlist", ranking.RANK_SHORTLIST)), top_k, 10))
+    except (TypeError, ValueError):
+        return JSONResponse({"detail": "top_k and shortlist must be integers"}, status_code=400)
+    return job_description, top_k, shortlist
+
+
+@router.post("/rank")
+async def rank_resumes(request: Request, user: dict = Depends(get_current_user)):
+    """Rank your stored resumes against a job description (BM25), with matched and
+    missing terms; Gemini reviews only the `shortlist` best matches."""
+    parsed = parse_rank_request(await request.json())
+    if isinstance(parsed, JSONResponse):
+        return parsed
+    job_description, top_k, shortlist = parsed
+    db = get_db()
+    ranked = await ranking.rank(db, job_description, top_k, user_id=user["id"])
+    await ranking.review_shortlist(db, job_description, ranked["results"], shortlist)
+    return ranked
 
 
 @router.post("/career-plan")
@@ -243,21 +430,8 @@ async def career_plan(request: Request, user: dict = Depends(get_current_user)):
         db = get_db()
         latest = await db.resumes.find_one({"user_id": user["id"]}, sort=[("created_at", -1)])
         if latest:
-            resume_summary = (latest.get("result", {}).get("ai_analysis") or latest.get("resume_text", ""))[:8000]
-
-    prompt = f"""
-You are a strict but supportive career mentor + HR interviewer.
-Create a realistic 30-day plan for a candidate targeting: {target_role}.
-
-Return valid JSON with exact keys:
-- \"mentor_rules\": array of 6 short non-negotiable rules
-- \"hr_expectations\": array of 6 short expectations recruiters have
-- \"weekly_focus\": array of 4 objects with keys week, goal, deliverables (array)
-- \"daily_micro_tasks\": array of 10 concise actions
-
-Candidate context:
-{resume_summary[:10000]}
-"""
+            result = await blobs.load_result(db, latest)
+            resume_summary = (result.get("ai_analysis") or await blobs.load_text(db, latest))[:8000]
 
     fallback = {
         "mentor_rules": [
@@ -297,90 +471,90 @@ Candidate context:
     }
 
     try:
-        response = _client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-        payload = extract_json_response(response.text or "", fallback)
-        return JSONResponse(payload)
+        payload, cache_status = await singleflight.run(
+            singleflight.key("career_plan", user["id"], resume_summary, target_role),
+            lambda: cached_generate(
+                "career_plan", resume_summary, target_role,
+                lambda: prompts.career_plan(target_role, resume_summary), fallback,
+            ),
+        )
+        return JSONResponse(payload, headers={PROMPT_CACHE_HEADER: cache_status})
     except Exception:
         return JSONResponse(fallback)
 
 
+HISTORY_PROJECTION = {"filename": 1, "score": 1, "created_at": 1}
+
+
+def history_row(doc: dict) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "filename": doc.get("filename", ""),
+        "score": doc.get("score", 0),
+        "created_at": doc["created_at"].isoformat(),
+    }
+
+
+async def stream_history(
+    collection, query: dict, projection: dict, to_row, limit: int, cursor: Optional[str], all_items: bool,
+    with_results: bool = False,
+):
+    """Newest-first listing streamed as a JSON array; one keyset page unless `all_items`.
+
+    `with_results` fills each row's `result` from resume_blobs.
+    """
+    headers = {}
+    if not all_items:
+        if cursor:
+            query = {"$and": [query, pagination.keyset_filter("created_at", -1, cursor)]}
+        next_cursor = await pagination.peek_next_cursor(collection, query, "created_at", -1, limit)
+        if next_cursor:
+            headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    docs = collection.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+    if not all_items:
+        docs = docs.limit(limit)
+    if with_results:
+        docs = blobs.with_results(collection.database, docs)
+    return StreamingResponse(pagination.stream_json_array(docs, to_row), media_type="application/json", headers=headers)
+
+
 @router.get("/history")
-async def get_history(user: dict = Depends(get_current_user)):
-    """Get all past resume analyses for the current user."""
+async def get_history(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    all_items: bool = Query(False, alias="all", description="legacy: every analysis in one response"),
+    user: dict = Depends(get_current_user),
+):
+    """Past resume analyses for the current user, newest first.
+
+    Keyset-paginated: pass the X-Next-Cursor response header back as `cursor`.
+    """
     db = get_db()
-    cursor = db.resumes.find(
-        {"user_id": user["id"]},
-        {"resume_text": 0},  # exclude large text from listing
-    ).sort("created_at", -1)
-
-    results = []
-    async for doc in cursor:
-        results.append({
-            "id": str(doc["_id"]),
-            "filename": doc.get("filename", ""),
-            "score": doc.get("score", 0),
-            "created_at": doc["created_at"].isoformat(),
-        })
-    return results
+    return await stream_history(db.resumes, {"user_id": user["id"]}, HISTORY_PROJECTION, history_row, limit, cursor, all_items)
+
+
+@router.get("/search")
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    user: dict = Depends(get_current_user),
+):
+    """Keyword search over your analyzed resumes: words are ANDed, "quoted phrases",
+    -word to exclude, OR between alternatives."""
+    try:
+        return await search_index.search(get_db(), q, user_id=user["id"], limit=limit)
+    except search_index.QueryError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
 
 
 @router.get("/leaderboard")
 async def get_leaderboard(user: dict = Depends(get_current_user)):
     """Return leaderboard using each user's best score."""
     db = get_db()
-
-    pipeline = [
-        {
-            "$group": {
-                "_id": "$user_id",
-                "best_score": {"$max": "$score"},
-                "analyses": {"$sum": 1},
-                "last_analyzed": {"$max": "$created_at"},
-            }
-        },
-        {"$sort": {"best_score": -1, "analyses": -1, "last_analyzed": -1}},
-    ]
-
-    grouped = await db.resumes.aggregate(pipeline).to_list(length=500)
-    if not grouped:
-        return {"top": [], "current_user_rank": None}
-
-    object_ids = []
-    user_id_map = {}
-    for row in grouped:
-        uid = row.get("_id")
-        try:
-            oid = ObjectId(uid)
-            object_ids.append(oid)
-            user_id_map[str(oid)] = uid
-        except Exception:
-            continue
-
-    users_by_id = {}
-    if object_ids:
-        cursor = db.users.find({"_id": {"$in": object_ids}}, {"name": 1, "email": 1})
-        async for doc in cursor:
-            users_by_id[str(doc["_id"])] = doc
-
-    ranked = []
-    for idx, row in enumerate(grouped, start=1):
-        uid = row.get("_id")
-        user_doc = users_by_id.get(uid, {})
-        email = user_doc.get("email", "")
-        fallback_name = email.split("@")[0].title() if email else "User"
-        ranked.append(
-            {
-                "rank": idx,
-                "user_id": uid,
-                "name": user_doc.get("name") or fallback_name,
-                "email": email,
-                "best_score": int(row.get("best_score", 0)),
-                "analyses": int(row.get("analyses", 0)),
-            }
-        )
-
-    current = next((r for r in ranked if r["user_id"] == user["id"]), None)
-    return {"top": ranked[:10], "current_user_rank": current}
+    return {
+        "top": await leaderboard.top(db, 10),
+        "current_user_rank": await leaderboard.rank_of(db, user["id"]),
+    }
 
 
 @router.get("/history/{history_id}")
@@ -398,7 +572,7 @@ async def get_history_detail(history_id: str, user: dict = Depends(get_current_u
         "id": str(doc["_id"]),
         "filename": doc.get("filename", ""),
         "score": doc.get("score", 0),
-        "result": doc.get("result", {}),
+        "result": await blobs.load_result(db, doc),
         "created_at": doc["created_at"].isoformat(),
     }
 
@@ -407,12 +581,18 @@ async def get_history_detail(history_id: str, user: dict = Depends(get_current_u
 async def delete_history(history_id: str, user: dict = Depends(get_current_user)):
     """Delete a past resume analysis."""
     db = get_db()
-    result = await db.resumes.delete_one({
-        "_id": ObjectId(history_id),
-        "user_id": user["id"],
-    })
-    if result.deleted_count == 0:
+    deleted = await db.resumes.find_one_and_delete(
+        {"_id": ObjectId(history_id), "user_id": user["id"]},
+        projection={"score": 1, "created_at": 1, "result": 1, "labels": 1, "search_no": 1, "text_hash": 1, "result_hash": 1},
+    )
+    if deleted is None:
         return JSONResponse({"detail": "Not found"}, status_code=404)
+    if deleted.get("labels") is None:  # rollups fall back to the result's raw labels
+        deleted["result"] = await blobs.load_result(db, deleted)
+    await leaderboard.refresh_user(db, user["id"])
+    await rollups.record_deletion(db, deleted)
+    await search_index.remove(db, deleted)
+    await blobs.release(db, [deleted])
     return {"detail": "Deleted"}
 
 
@@ -421,32 +601,38 @@ async def generate_hr_questions(request: Request, user: dict = Depends(get_curre
     """Generate custom interview questions from resume text."""
     data = await request.json()
     resume_text = data.get("resume_text", "")
-    if not resume_text:
+    if not resume_text or not isinstance(resume_text, str):
         return JSONResponse({"questions": []})
 
-    prompt = f"""
-You are an expert interviewer. Read this resume and generate 10 unique interview questions
-(mix of technical and behavioral) with brief expected answers. Format as:
-1. Question: ...
-   Expected Answer: ...
-Resume:
-{resume_text}
-"""
-    response = _client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    qa_pairs = []
-    if response and response.text:
-        lines = response.text.splitlines()
-        current_q, current_a = None, None
-        for line in lines:
-            q_match = re.match(r"\d+\.\s*Question:\s*(.+)", line)
-            a_match = re.match(r"Expected Answer:\s*(.+)", line)
-            if q_match:
-                if current_q and current_a:
-                    qa_pairs.append({"question": current_q, "expected_answer": current_a})
-                current_q = q_match.group(1).strip()
-                current_a = None
-            elif a_match and current_q:
-                current_a = a_match.group(1).strip()
-        if current_q and current_a:
-            qa_pairs.append({"question": current_q, "expected_answer": current_a})
-    return JSONResponse({"questions": qa_pairs})
+    response_text = await llm.generate(prompts.hr_questions(resume_text), endpoint="hr_questions")
+    parser = stream_parse.QAPairs()
+    parser.feed(response_text or "")
+    parser.close()
+    return JSONResponse({"questions": parser.pairs})
+
+
+async def hr_question_events(resume_text: str):
+    parser = stream_parse.QAPairs()
+    try:
+        async with aclosing(llm.generate_stream(prompts.hr_questions(resume_text), endpoint="hr_questions")) as stream:
+            async for chunk in stream:
+                for pair in parser.feed(chunk):
+                    yield sse("question", pair)
+        for pair in parser.close():
+            yield sse("question", pair)
+    except Exception as e:
+        yield sse("error", {"detail": f"Question generation failed: {type(e).__name__}"})
+    yield sse("done", {"questions": parser.pairs})
+
+
+@router.post("/generate-hr-questions/stream")
+async def generate_hr_questions_stream(request: Request, user: dict = Depends(get_current_user)):
+    """Server-sent events: one `question` {question, expected_answer} per pair as
+    Gemini finishes it, then `done` with all of them."""
+    data = await request.json()
+    resume_text = data.get("resume_text", "")
+    if not resume_text or not isinstance(resume_text, str):
+        events = iter([sse("done", {"questions": []})])
+    else:
+        events = hr_question_events(resume_text)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,73 @@
+"""Deterministic resume scoring (the algorithm_score shown next to the AI analysis).
+
+Same rubric and results as the original calculate_resume_score, but the text
+is lowercased and split once, and no regex scans the whole text: in CPython a
+regex walks every character, while `str.find`/`in` jump between candidates in
+C. Returns the per-component breakdown as well.
+"""
+
+RUBRIC_VERSION = 1  # bump when SKILLS/weights change, then run `python -m backend.rescore`
+
+SKILLS = ["python", "java", "c++", "machine learning", "sql", "aws", "react"]
+ACTION_VERBS = ["developed", "built", "designed", "implemented", "optimized"]
+SECTIONS = ["experience", "education"]
+
+_SKILLS = tuple(SKILLS)
+_VERBS = tuple(ACTION_VERBS)
+
+
+def _count_metrics(lower: str) -> int:
+    """Matches of r"\\d+%|\\d+\\+": every '%' or '+' directly after a digit."""
+    count = 0
+    for mark in ("%", "+"):
+        i = lower.find(mark, 1)
+        while i != -1:
+            if lower[i - 1].isdecimal():
+                count += 1
+            i = lower.find(mark, i + 1)
+    return count
+
+
+def _count_years(lower: str) -> int:
+    """Matches of r"\\d+\\s+years": a digit, whitespace, then "years"."""
+    count = 0
+    i = lower.find("years")
+    while i != -1:
+        j = i
+        while j > 0 and lower[j - 1].isspace():
+            j -= 1
+        if 0 < j < i and lower[j - 1].isdecimal():
+            count += 1
+        i = lower.find("years", i + 5)
+    return count
+
+
+def score_resume(text: str) -> dict:
+    """Return {"score": 0-100, "breakdown": {component: points}}."""
+    lower = text.lower()
+
+    skill_count = sum(1 for s in _SKILLS if s in lower)
+    verb_count = sum(1 for v in _VERBS if v in lower)
+
+    word_count = len(lower.split())
+    if word_count > 300:
+        length_points = 15
+    elif word_count > 200:
+        length_points = 10
+    else:
+        length_points = 0
+
+    breakdown = {
+        "skills": min(skill_count * 3, 20),
+        "metrics": min(_count_metrics(lower) * 4, 20),
+        "years": min(_count_years(lower) * 5, 20),
+        "action_verbs": min(verb_count * 2, 10),
+        "length": length_points,
+        "sections": 15 if all(s in lower for s in SECTIONS) else 0,
+    }
+    return {"score": min(sum(breakdown.values()), 100), "breakdown": breakdown}
+
+
+def score_batch(texts) -> list:
+    """Score many texts in one call (used by bulk rescoring)."""
+    return [score_resume(t or "") for t in texts]
@@ -0,0 +1,442 @@
+"""Inverted index over resume text for /search, stored in MongoDB.
+
+Tokens come from backend.terms (the keyword_overlap_score tokenizer).
+Each indexed resume gets a sequential `search_no`; postings are keyed by
+it so they can be delta-encoded:
+
+    search_postings  {term, lo, hi, count, data}
+        data = per doc: varint(search_no - previous), varint(#positions),
+               varint position deltas
+    search_terms       {_id: term, df} live documents containing the term
+    search_tombstones  {_id: search_no} for deleted resumes
+    search_meta        {_id: "seq", value} the search_no counter
+
+Writes are log-structured: a new resume appends one small segment per
+term (a single insert_many), and a delete only writes a tombstone.
+Compaction merges each term's segments into blocks of up to
+SEARCH_BLOCK_POSTINGS docs and drops tombstoned docs; queries skip blocks
+whose [lo, hi] range misses the current candidates, so run it regularly:
+
+    python -m backend.search_index --compact
+    python -m backend.search_index --rebuild     # index existing resumes
+    python -m backend.search_index --recount     # fill search_terms from postings
+
+Queries intersect the rarest phrase first, by search_terms df. A user's own
+history is scattered across every block's range, so a search scoped to a
+user with at most SEARCH_LOCAL_DOCS resumes matches their texts directly
+instead of decoding the global postings.
+
+Query syntax: words are ANDed, "quoted text" is a phrase, -word or NOT
+word excludes, OR separates alternatives: python "machine learning" -java OR rust
+"""
+import argparse
+import asyncio
+import time
+from bson import Binary
+from pymongo import ReturnDocument, UpdateOne
+from backend import blobs, terms
+from backend.config import SEARCH_BLOCK_POSTINGS, SEARCH_LOCAL_DOCS, SEARCH_MAX_CLAUSES
+from backend.database import connect_db, close_db, get_db
+
+_stats = {"queries": 0, "local_queries": 0, "indexed": 0, "deleted": 0}
+
+
+class QueryError(ValueError):
+    """Malformed /search query."""
+
+
+# ----- encoding -----
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> tuple:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(entries: list, base: int = 0) -> bytes:
+    """entries: [(search_no, [positions])] sorted by search_no, all > base - 1."""
+    out = bytearray()
+    prev = base
+    for no, positions in entries:
+        _put_varint(out, no - prev)
+        prev = no
+        _put_varint(out, len(positions))
+        last = 0
+        for p in positions:
+            _put_varint(out, p - last)
+            last = p
+    return bytes(out)
+
+
+def decode_postings(data: bytes, base: int = 0):
+    """Yield (search_no, [positions]) from encode_postings output."""
+    pos = 0
+    prev = base
+    end = len(data)
+    while pos < end:
+        delta, pos = _get_varint(data, pos)
+        prev += delta
+        count, pos = _get_varint(data, pos)
+        positions = []
+        last = 0
+        for _ in range(count):
+            step, pos = _get_varint(data, pos)
+            last += step
+            positions.append(last)
+        yield prev, positions
+
+
+def _term_positions(text: str) -> dict:
+    positions = {}
+    for i, token in enumerate(terms.tokens(text)):
+        positions.setdefault(token, []).append(i)
+    return positions
+
+
+# ----- maintenance -----
+
+async def _tombstones(db) -> set:
+    return {d["_id"] async for d in db.search_tombstones.find({}, {"_id": 1})}
+
+
+async def assign_numbers(db, docs: list):
+    """Reserve consecutive search_no values and set them on the (not yet inserted) docs."""
+    if not docs:
+        return
+    counter = await db.search_meta.find_one_and_update(
+        {"_id": "seq"}, {"$inc": {"value": len(docs)}}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    first = counter["value"] - len(docs) + 1
+    for offset, doc in enumerate(docs):
+        doc["search_no"] = first + offset
+
+
+async def add(db, docs: list, texts: list):
+    """Append postings for resume docs that already carry search_no; texts[i] is docs[i]'s text."""
+    segments = []
+    df = {}
+    for doc, text in zip(docs, texts):
+        no = doc["search_no"]
+        for term, positions in _term_positions(text or "").items():
+            segments.append({
+                "term": term, "lo": no, "hi": no, "count": 1,
+                "data": Binary(encode_postings([(no, positions)], base=no)),
+            })
+            df[term] = df.get(term, 0) + 1
+    if segments:
+        await db.search_postings.insert_many(segments, ordered=False)
+        await _add_df(db, df)
+    _stats["indexed"] += len(docs)
+
+
+async def remove(db, doc: dict):
+    """Tombstone a deleted resume; compaction drops its postings."""
+    if doc.get("search_no") is None:
+        return
+    await db.search_tombstones.update_one({"_id": doc["search_no"]}, {"$setOnInsert": {"at": time.time()}}, upsert=True)
+    _stats["deleted"] += 1
+
+
+async def _add_df(db, df: dict):
+    await db.search_terms.bulk_write(
+        [UpdateOne({"_id": term}, {"$inc": {"df": n}}, upsert=True)
+         for term, n in df.items()],
+        ordered=False,
+    )
+
+
+async def compact(db) -> dict:
+    """Merge every term's segments into range blocks without tombstoned docs."""
+    dead = await _tombstones(db)
+    # without deletes to purge, full blocks are final; only partial ones need merging
+    partial = {} if dead else {"count": {"$lt": SEARCH_BLOCK_POSTINGS}}
+    merged_terms = 0
+    blocks_before = 0
+    blocks_after = 0
+    purged_df = {}
+    for term in await db.search_postings.distinct("term", partial):
+        old_ids, entries, purged = [], [], 0
+        async for block in db.search_postings.find({"term": term, **partial}).sort("lo", 1):
+            old_ids.append(block["_id"])
+            for e in decode_postings(block["data"], block["lo"]):
+                if e[0] in dead:
+                    purged += 1
+                else:
+                    entries.append(e)
+        if purged:
+            purged_df[term] = -purged
+        if len(old_ids) <= 1 and not dead:
+            continue
+        entries.sort(key=lambda e: e[0])
+        new_blocks = []
+        for i in range(0, len(entries), SEARCH_BLOCK_POSTINGS):
+            chunk = entries[i:i + SEARCH_BLOCK_POSTINGS]
+            lo = chunk[0][0]
+            new_blocks.append({
+                "term": term, "lo": lo, "hi": chunk[-1][0], "count": len(chunk),
+                "data": Binary(encode_postings(chunk, base=lo)),
+            })
+        # insert first, then drop only the blocks we read: concurrent appends survive
+        if new_blocks:
+            await db.search_postings.insert_many(new_blocks)
+        await db.search_postings.delete_many({"_id": {"$in": old_ids}})
+        merged_terms += 1
+        blocks_before += len(old_ids)
+        blocks_after += len(new_blocks)
+    if purged_df:
+        await _add_df(db, purged_df)
+        await db.search_terms.delete_many({"df": {"$lte": 0}})
+    if dead:
+        await db.search_tombstones.delete_many({"_id": {"$in": list(dead)}})
+    return {"terms_merged": merged_terms, "blocks_before": blocks_before, "blocks_after": blocks_after, "purged": len(dead)}
+
+
+async def rebuild(db, batch: int = 500) -> dict:
+    """Drop the index and re-index every resume."""
+    await db.search_postings.delete_many({})
+    await db.search_terms.delete_many({})
+    await db.search_tombstones.delete_many({})
+    await db.search_meta.delete_one({"_id": "seq"})
+    await db.resumes.update_many({"search_no": {"$exists": True}}, {"$unset": {"search_no": ""}})  # unique index
+    indexed = 0
+    pending = []
+
+    async def flush():
+        await assign_numbers(db, pending)
+        await db.resumes.bulk_write(
+            [UpdateOne({"_id": d["_id"]}, {"$set": {"search_no": d["search_no"]}}) for d in pending], ordered=False,
+        )
+        await add(db, pending, await blobs.load_texts(db, pending))
+
+    async for doc in db.resumes.find({}, {"resume_text": 1, "text_hash": 1}).sort("_id", 1).batch_size(batch):
+        pending.append(doc)
+        if len(pending) >= batch:
+            await flush()
+            indexed += len(pending)
+            pending = []
+    if pending:
+        await flush()
+        indexed += len(pending)
+    return {"indexed": indexed, **await compact(db)}
+
+
+async def recount(db) -> dict:
+    """Rebuild search_terms from the postings (for indexes built before it existed)."""
+    await db.search_postings.aggregate([
+        {"$group": {"_id": "$term", "df": {"$sum": "$count"}}},
+        {"$out": "search_terms"},
+    ]).to_list(None)
+    return {"terms": await db.search_terms.estimated_document_count()}
+
+
+# ----- queries -----
+
+def parse_query(q: str) -> list:
+    """[{"must": [phrase, ...], "not": [phrase, ...]}] with each phrase a tuple of terms."""
+    clauses = [{"must": [], "not": []}]
+    negate = False
+    chars = q.strip()
+    i = 0
+    while i < len(chars):
+        ch = chars[i]
+        if ch.isspace():
+            i += 1
+            continue
+        if ch == "-" and i + 1 < len(chars) and not chars[i + 1].isspace():
+            negate = True
+            i += 1
+            continue
+        if ch == '"':
+            end = chars.find('"', i + 1)
+            end = len(chars) if end == -1 else end
+            raw, i = chars[i + 1:end], end + 1
+        else:
+            end = i
+            while end < len(chars) and not chars[end].isspace():
+                end += 1
+            raw, i = chars[i:end], end
+            if raw == "OR":
+                clauses.append({"must": [], "not": []})
+                negate = False
+                continue
+            if raw == "NOT":
+                negate = True
+                continue
+        phrase = tuple(terms.tokens(raw))
+        if phrase:
+            clauses[-1]["not" if negate else "must"].append(phrase)
+        negate = False
+
+    clauses = [c for c in clauses if c["must"] or c["not"]]
+    if not clauses:
+        raise QueryError("Query has no searchable terms")
+    if len(clauses) > SEARCH_MAX_CLAUSES:
+        raise QueryError(f"At most {SEARCH_MAX_CLAUSES} OR alternatives")
+    if any(not c["must"] for c in clauses):
+        raise QueryError("Each alternative needs at least one term that must match")
+    return clauses
+
+
+async def _load_term(db, term: str, within: set = None) -> dict:
+    """{search_no: positions} for `term`, limited to `within` (skipping blocks outside its range)."""
+    query = {"term": term}
+    if within is not None:
+        if not within:
+            return {}
+        query["lo"] = {"$lte": max(within)}
+        query["hi"] = {"$gte": min(within)}
+    out = {}
+    async for block in db.search_postings.find(query, {"lo": 1, "data": 1}):
+        for no, positions in decode_postings(block["data"], block["lo"]):
+            if within is None or no in within:
+                out[no] = positions
+    return out
+
+
+async def _match_phrase(db, phrase: tuple, within: set = None) -> set:
+    postings = []
+    candidates = within
+    for term in phrase:
+        loaded = await _load_term(db, term, candidates)
+        postings.append(loaded)
+        candidates = set(loaded)
+        if not candidates:
+            return set()
+    if len(phrase) == 1:
+        return candidates
+    return {no for no in candidates if _has_phrase({t: postings[i][no] for i, t in enumerate(phrase)}, phrase)}
+
+
+def _has_phrase(positions: dict, phrase: tuple) -> bool:
+    """Whether `phrase` occurs in a doc given {term: positions} for it."""
+    starts = set(positions.get(phrase[0], ()))
+    for offset, term in enumerate(phrase[1:], start=1):
+        starts &= {p - offset for p in positions.get(term, ())}
+        if not starts:
+            break
+    return bool(starts)
+
+
+async def _rarest_first(db, phrases: list) -> list:
+    """Phrases ordered by the document frequency of their rarest term."""
+    wanted = {t for p in phrases for t in p}
+    df = {d["_id"]: d["df"] async for d in db.search_terms.find({"_id": {"$in": list(wanted)}})}
+    return sorted(phrases, key=lambda p: min(df.get(t, 0) for t in p))
+
+
+async def match(db, clauses: list, within: set = None) -> set:
+    """search_no values matching the parsed query, optionally limited to `within`."""
+    found = set()
+    for clause in clauses:
+        candidates = within
+        for phrase in await _rarest_first(db, clause["must"]):
+            candidates = await _match_phrase(db, phrase, candidates)
+            if not candidates:
+                break
+        for phrase in clause["not"]:
+            if not candidates:
+                break
+            candidates = candidates - await _match_phrase(db, phrase, candidates)
+        found |= candidates or set()
+    if found:
+        found -= await _tombstones(db)  # kept small by compaction
+    return found
+
+
+def match_texts(clauses: list, texts: dict) -> set:
+    """`match` evaluated directly on {search_no: text}, without the postings."""
+    found = set()
+    for no, text in texts.items():
+        positions = _term_positions(text or "")
+        if any(
+            all(_has_phrase(positions, p) for p in c["must"]) and not any(_has_phrase(positions, p) for p in c["not"])
+            for c in clauses
+        ):
+            found.add(no)
+    return found
+
+
+async def _match_user(db, clauses: list, user_id: str) -> set:
+    scope = {"user_id": user_id, "search_no": {"$exists": True}}
+    within = {d["search_no"] async for d in db.resumes.find(scope, {"search_no": 1})}
+    if len(within) > SEARCH_LOCAL_DOCS:
+        return await match(db, clauses, within)
+    _stats["local_queries"] += 1
+    docs = await db.resumes.find(scope, {"search_no": 1, "resume_text": 1, "text_hash": 1}).to_list(None)
+    texts = await blobs.load_texts(db, docs)
+    return match_texts(clauses, {d["search_no"]: text for d, text in zip(docs, texts)})
+
+
+async def search(db, q: str, user_id: str = None, limit: int = 20) -> dict:
+    """Newest-first resume hits for `q`, within one user's history or globally."""
+    started = time.perf_counter()
+    _stats["queries"] += 1
+    clauses = parse_query(q)
+    query = {"user_id": user_id} if user_id else {}
+    found = await _match_user(db, clauses, user_id) if user_id else await match(db, clauses)
+    page = sorted(found, reverse=True)[:limit]
+    docs = {}
+    if page:
+        async for doc in db.resumes.find(
+            {**query, "search_no": {"$in": page}},
+            {"filename": 1, "score": 1, "created_at": 1, "user_id": 1, "search_no": 1},
+        ):
+            docs[doc["search_no"]] = doc
+    results = [
+        {
+            "history_id": str(doc["_id"]),
+            "user_id": doc.get("user_id"),
+            "filename": doc.get("filename", ""),
+            "score": doc.get("score", 0),
+            "created_at": doc["created_at"].isoformat(),
+        }
+        for doc in (docs.get(no) for no in page) if doc is not None
+    ]
+    return {
+        "query": q,
+        "total": len(found),
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def get_stats() -> dict:
+    return dict(_stats)
+
+
+async def _main(args):
+    await connect_db()
+    try:
+        db = get_db()
+        if args.rebuild:
+            print(f"[SEARCH] rebuilt: {await rebuild(db)}")
+        elif args.compact:
+            print(f"[SEARCH] compacted: {await compact(db)}")
+        elif args.recount:
+            print(f"[SEARCH] recounted: {await recount(db)}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and re-index every resume")
+    parser.add_argument("--compact", action="store_true", help="merge posting segments and purge deleted resumes")
+    parser.add_argument("--recount", action="store_true", help="recompute per-term document frequencies")
+    args = parser.parse_args()
+    if not (args.rebuild or args.compact or args.recount):
+        parser.print_help()
+    else:
+        asyncio.run(_main(args))
@@ -0,0 +1,143 @@
+"""Single-flight for identical concurrent requests.
+
+A double-click or a dashboard retry sends the same /analyze, /job-match or
+/career-plan request while the first one is still waiting on Gemini.
+`run(key, compute)` lets the first caller for a key (request content plus
+user, see `key`) compute, and every caller with the same key that arrives
+before it finishes awaits that result instead of starting its own. Each
+caller gets its own deep copy. Nothing is kept afterwards; reuse over time
+is analysis_cache / prompt_cache's job.
+
+The shared call runs as its own task, so a caller that disconnects doesn't
+cancel it for the others. A failure is raised to every waiter.
+
+With SINGLEFLIGHT_MONGO=1 the leader also takes a lease in the
+`singleflight` collection (insert with _id = key), so duplicates landing on
+other workers or serverless instances poll for its result there instead of
+calling Gemini. A lease that expires without a result (its process died)
+is taken over; if MongoDB is unavailable the call just runs locally.
+"""
+import asyncio
+import copy
+import hashlib
+from datetime import datetime, timezone, timedelta
+from pymongo.errors import DuplicateKeyError
+from backend.config import (
+    SINGLEFLIGHT_ENABLED,
+    SINGLEFLIGHT_MONGO,
+    SINGLEFLIGHT_LEASE_SECONDS,
+    SINGLEFLIGHT_POLL_SECONDS,
+    WORKER_ID,
+)
+from backend.database import get_db
+
+_RESULT_GRACE_SECONDS = 5  # how long a finished call's result stays readable for pollers
+
+_inflight = {}  # key -> asyncio.Task
+_stats = {"leaders": 0, "coalesced": 0, "remote_coalesced": 0, "lease_takeovers": 0, "lease_errors": 0}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def key(kind: str, user_id: str, *parts: str) -> str:
+    """Key for one request: its kind, the user and the inputs that determine the answer."""
+    digest = hashlib.sha256()
+    for part in (user_id, *parts):
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return f"{kind}:{digest.hexdigest()}"
+
+
+def _forget(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # retrieved: every waiter may have gone away
+
+
+async def run(key: str, compute):
+    """`await compute()`, shared with every concurrent caller passing the same key."""
+    if not SINGLEFLIGHT_ENABLED:
+        return await compute()
+    task = _inflight.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_lead(key, compute))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget(key, t))
+        _stats["leaders"] += 1
+    else:
+        _stats["coalesced"] += 1
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+# ----- MongoDB lease (SINGLEFLIGHT_MONGO=1) -----
+
+async def _lead(key: str, compute):
+    db = get_db() if SINGLEFLIGHT_MONGO else None
+    if db is None:
+        return await compute()
+    try:
+        finished, value = await _lease_or_wait(db, key)
+    except Exception as e:
+        _stats["lease_errors"] += 1
+        print(f"[SINGLEFLIGHT] lease failed: {type(e).__name__}: {e}")
+        return await compute()
+    if finished:
+        _stats["remote_coalesced"] += 1
+        return value
+    try:
+        value = await compute()
+    except BaseException:
+        await _settle(db, key, None)  # waiters elsewhere take over and compute for themselves
+        raise
+    await _settle(db, key, value)
+    return value
+
+
+async def _lease_or_wait(db, key: str) -> tuple:
+    """(True, result) if another process finished this call, (False, None) once we hold the lease."""
+    while True:
+        now = _now()
+        lease = {"owner": WORKER_ID, "expires_at": now + timedelta(seconds=SINGLEFLIGHT_LEASE_SECONDS)}
+        try:
+            await db.singleflight.insert_one({"_id": key, **lease})
+            return False, None
+        except DuplicateKeyError:
+            pass
+        doc = await db.singleflight.find_one({"_id": key})
+        if doc is None:  # released in between
+            continue
+        if doc["expires_at"].replace(tzinfo=timezone.utc) <= now:
+            # TTL monitor runs about once a minute, so check expiry ourselves
+            taken = await db.singleflight.find_one_and_update(
+                {"_id": key, "expires_at": doc["expires_at"]},
+                {"$set": lease, "$unset": {"result": ""}},
+            )
+            if taken is not None:
+                _stats["lease_takeovers"] += 1
+                return False, None
+            continue
+        if "result" in doc:
+            return True, doc["result"]
+        await asyncio.sleep(SINGLEFLIGHT_POLL_SECONDS)
+
+
+async def _settle(db, key: str, value):
+    """Publish the result for pollers (briefly), or drop the lease if there is none."""
+    try:
+        if value is None:
+            await db.singleflight.delete_one({"_id": key, "owner": WORKER_ID})
+        else:
+            await db.singleflight.update_one(
+                {"_id": key, "owner": WORKER_ID},
+                {"$set": {"result": value, "expires_at": _now() + timedelta(seconds=_RESULT_GRACE_SECONDS)}},
+            )
+    except Exception as e:
+        _stats["lease_errors"] += 1
+        print(f"[SINGLEFLIGHT] settle failed: {type(e).__name__}: {e}")
+
+
+def get_stats() -> dict:
+    return {**_stats, "in_flight": len(_inflight), "enabled": SINGLEFLIGHT_ENABLED, "mongo": SINGLEFLIGHT_MONGO}
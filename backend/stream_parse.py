@@ -0,0 +1,152 @@
+"""Incremental parsers for streamed Gemini output.
+
+Both take text in arbitrary chunks (`feed`) and return whatever became
+complete, so items can be sent to the browser while the model is still
+writing. `close()` flushes the end of the stream. The final, authoritative
+result is still parsed from the full text by the endpoint.
+"""
+import json
+import re
+
+_QUESTION_RE = re.compile(r"\d+\.\s*Question:\s*(.+)")
+_ANSWER_RE = re.compile(r"Expected Answer:\s*(.+)")
+
+
+class QAPairs:
+    """`N. Question: ...` / `Expected Answer: ...` pairs (the HR-questions format).
+
+    A pair is complete once its answer line ends; only the first answer
+    line after a question is kept.
+    """
+
+    def __init__(self):
+        self._tail = ""
+        self._question = None
+        self.pairs = []
+
+    def _line(self, line: str):
+        q_match = _QUESTION_RE.match(line.strip())
+        a_match = _ANSWER_RE.match(line.strip())
+        if q_match:
+            self._question = q_match.group(1).strip()
+        elif a_match and self._question:
+            pair = {"question": self._question, "expected_answer": a_match.group(1).strip()}
+            self._question = None
+            self.pairs.append(pair)
+            return pair
+        return None
+
+    def feed(self, chunk: str) -> list:
+        lines = (self._tail + chunk).split("\n")
+        self._tail = lines.pop()  # possibly incomplete
+        return [pair for pair in map(self._line, lines) if pair]
+
+    def close(self) -> list:
+        tail, self._tail = self._tail, ""
+        pair = self._line(tail)
+        return [pair] if pair else []
+
+
+class JSONFields:
+    """Top-level fields of one JSON object, as they complete.
+
+    Emits ("item", key, value) for each element of a top-level array once
+    it is closed, and ("field", key, value) once a top-level value (array
+    or not) is complete. Text before the first "{" (a ```json fence) is
+    skipped; malformed pieces are dropped rather than raising.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        self._key = None
+        self._token_start = None  # start of the key string or value at depth 1
+        self._value_start = None
+        self._array = False  # current value is an array
+        self._item_start = None
+
+    @staticmethod
+    def _load(text: str):
+        try:
+            return True, json.loads(text)
+        except ValueError:
+            return False, None
+
+    def _end_item(self, end: int, out: list):
+        if self._item_start is not None:
+            ok, value = self._load(self._text[self._item_start:end])
+            if ok:
+                out.append(("item", self._key, value))
+            self._item_start = None
+
+    def _end_value(self, end: int, out: list):
+        if self._key is not None and self._value_start is not None:
+            ok, value = self._load(self._text[self._value_start:end])
+            if ok:
+                out.append(("field", self._key, value))
+        self._key = self._value_start = None
+        self._array = False
+
+    def feed(self, chunk: str) -> list:
+        out = []
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self._done:
+            i, ch = self._pos, text[self._pos]
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None and self._value_start is None:
+                        ok, key = self._load(text[self._token_start:i + 1])
+                        self._key = key if ok else ""
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+            if ch.isspace():
+                continue
+            if self._depth == 1:
+                if ch in ",}":
+                    self._end_value(i, out)
+                    if ch == "}":
+                        self._depth = 0
+                        self._done = True
+                    continue
+                if ch == ":":
+                    continue
+                if self._key is None:  # a key is starting
+                    if ch == '"':
+                        self._in_string, self._token_start = True, i
+                    continue
+                if self._value_start is None:
+                    self._value_start = i
+                    self._array = ch == "["
+            elif self._depth == 2 and self._array:
+                if ch in ",]":
+                    self._end_item(i, out)
+                elif self._item_start is None:
+                    self._item_start = i
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+        return out
+
+    def close(self) -> list:
+        """A last scalar field of an object whose closing brace never came."""
+        out = []
+        if self._depth == 1 and not self._in_string:
+            self._end_value(len(self._text), out)
+        return out
@@ -0,0 +1,29 @@
+"""Tokenizer shared by keyword_overlap_score, resume ranking and search.
+
+Tokens are lowercased words of 2+ characters that may contain digits and
++#.- (so "c++", "node.js" and "ci-cd" survive), minus a small stop list of
+words that appear in nearly every resume or job description. Trailing "."
+and "-" are dropped, so "Kafka." at the end of a sentence is "kafka".
+"""
+import re
+
+TOKEN_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9+#.-]{1,}")
+STOPWORDS = frozenset({
+    "the", "and", "for", "with", "from", "that", "this", "are", "you", "your",
+    "have", "has", "will", "our", "job", "role", "work", "team", "years", "year",
+    "experience", "skills", "required", "preferred", "ability", "using", "within",
+})
+
+
+def tokens(text: str) -> list:
+    """Every non-stopword token in order, repeats included."""
+    out = []
+    for raw in TOKEN_RE.findall(text or ""):
+        token = raw.lower().rstrip(".-")
+        if token and token not in STOPWORDS:
+            out.append(token)
+    return out
+
+
+def term_set(text: str) -> set:
+    return set(tokens(text))
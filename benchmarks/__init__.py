@@ -0,0 +1 @@
+# benchmark / load-test scripts — run with `python -m benchmarks.<name>`
@@ -0,0 +1,133 @@
+"""Admin endpoint query count and latency, before and after the $lookup rewrite.
+
+Seeds a local MongoDB (default 50k users / 500k resumes, reused across runs),
+then runs the original N+1 implementations of /admin/users and
+/admin/top-resumes (kept verbatim below) and the current route handlers,
+counting the MongoDB commands each one issues.
+
+    python -m benchmarks.bench_admin_queries --users 50000 --resumes 500000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from bson import ObjectId
+from fastapi import Response
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from backend import database, migrations, routes_admin
+from backend.config import MONGODB_URL
+from benchmarks.seed import seed
+
+ADMIN = {"id": "bench", "role": "admin"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in ("endSessions", "ping", "hello", "isMaster"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_admin_users(db):
+    users = []
+    async for u in db.users.find().sort("created_at", -1):
+        resume_count = await db.resumes.count_documents({"user_id": str(u["_id"])})
+        last_resume = await db.resumes.find_one(
+            {"user_id": str(u["_id"])},
+            sort=[("created_at", -1)],
+        )
+        users.append({
+            "id": str(u["_id"]),
+            "name": u.get("name", ""),
+            "email": u.get("email", ""),
+            "role": u.get("role", "user"),
+            "resume_count": resume_count,
+            "last_active": last_resume["created_at"].isoformat() if last_resume else u.get("created_at", datetime.now(timezone.utc)).isoformat(),
+            "created_at": u.get("created_at", datetime.now(timezone.utc)).isoformat(),
+        })
+    return users
+
+
+async def legacy_admin_top_resumes(db, limit=5):
+    results = []
+    async for doc in db.resumes.find().sort("score", -1).limit(limit):
+        uid = doc.get("user_id")
+        u = await db.users.find_one({"_id": ObjectId(uid)}) if uid else None
+        results.append({
+            "id": str(doc["_id"]),
+            "filename": doc.get("filename", ""),
+            "score": doc.get("score", 0),
+            "user_name": u["name"] if u else "Unknown",
+            "created_at": doc["created_at"].isoformat(),
+        })
+    return results
+
+
+async def measure(counter: CommandCounter, label: str, coro_factory, repeat: int) -> dict:
+    latencies = []
+    commands = 0
+    rows = 0
+    for _ in range(repeat):
+        counter.count = 0
+        t0 = time.perf_counter()
+        result = await coro_factory()
+        latencies.append(time.perf_counter() - t0)
+        commands = counter.count
+        rows = len(result)
+    return {
+        "case": label,
+        "rows": rows,
+        "mongo_commands": commands,
+        "best_ms": round(min(latencies) * 1000, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+    }
+
+
+async def run(args) -> list:
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[counter])
+    db = client[args.db]
+    print(await seed(db, args.users, args.resumes))
+    await migrations.migrate(db)
+    database.db = db  # route handlers read the module-level handle
+
+    cases = [
+        ("admin_users legacy (all users, N+1)", lambda: legacy_admin_users(db), args.legacy_repeat),
+        ("admin_users pipeline (page of 100)", lambda: routes_admin.admin_users(
+            Response(), limit=100, cursor=None, q=None, role=None, sort="created_at", order="desc", user=ADMIN), args.repeat),
+        ("admin_users pipeline (page of 500)", lambda: routes_admin.admin_users(
+            Response(), limit=500, cursor=None, q=None, role=None, sort="created_at", order="desc", user=ADMIN), args.repeat),
+        ("admin_top_resumes legacy", lambda: legacy_admin_top_resumes(db, 20), args.repeat),
+        ("admin_top_resumes pipeline", lambda: routes_admin.admin_top_resumes(Response(), limit=20, cursor=None, user=ADMIN), args.repeat),
+    ]
+    results = []
+    for label, factory, repeat in cases:
+        results.append(await measure(counter, label, factory, repeat))
+        print(json.dumps(results[-1]))
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--resumes", type=int, default=500000)
+    parser.add_argument("--db", default="resume_analyzer_bench")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-repeat", type=int, default=1, help="the N+1 listing is slow at 50k users")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""/history throughput with the per-process auth caches on and off.
+
+Starts the app twice (AUTH_CACHE_ENABLED=1 and 0), registers a user, and
+has `--concurrency` clients call /history back to back for `--duration`
+seconds. With the caches on, repeat requests skip JWT verification and
+the users lookup; hit rates are reported at /admin/cache-stats.
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+
+    python -m benchmarks.bench_auth_cache --duration 15 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+import httpx
+from benchmarks.common import register_user, start_app, summarize
+
+
+async def worker(client: httpx.AsyncClient, headers: dict, deadline: float, latencies: list, counts: dict):
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        resp = await client.get("/history", headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        counts["ok" if resp.status_code == 200 else "failed"] += 1
+
+
+async def drive(base_url: str, token: str, args) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await client.get("/history", headers=headers)  # warm up connections and caches
+        latencies, counts = [], {"ok": 0, "failed": 0}
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*[worker(client, headers, deadline, latencies, counts) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+    return {"requests_per_sec": round(counts["ok"] / elapsed, 1), "responses": counts, "latency": summarize(latencies)}
+
+
+def run_case(enabled: bool, args) -> dict:
+    proc, base_url = start_app({"GEMINI_API_KEY": "fake", "AUTH_CACHE_ENABLED": "1" if enabled else "0"})
+    try:
+        token = register_user(base_url, "authcache")
+        return {"auth_cache": enabled, **asyncio.run(drive(base_url, token, args))}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    results = [run_case(False, args), run_case(True, args)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
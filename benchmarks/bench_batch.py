@@ -0,0 +1,116 @@
+"""/analyze/batch throughput over synthetic resumes vs one /analyze per file.
+
+Starts a fake Gemini server and the app, then analyzes `--files` unique
+synthetic PDFs twice: as `--concurrency` parallel /analyze requests, and
+as a single /analyze/batch upload (a zip). Content is salted per run so
+the analysis cache never hits. Reports files/sec, Gemini calls and the
+time to the first streamed NDJSON line.
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+
+    python -m benchmarks.bench_batch --files 500 --gemini-latency 1.5
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import uuid
+import zipfile
+import httpx
+from benchmarks.common import make_pdf, register_user, start_app, summarize, SAMPLE_RESUME
+from benchmarks.fake_gemini import FakeGemini
+
+
+def synthetic_pdfs(count: int) -> list:
+    salt = uuid.uuid4().hex[:8]
+    return [
+        (f"resume_{i}.pdf", make_pdf([f"{SAMPLE_RESUME}\nCandidate {salt}-{i}: shipped project {i}."]))
+        for i in range(count)
+    ]
+
+
+async def one_by_one(client: httpx.AsyncClient, headers: dict, pdfs: list, concurrency: int) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    latencies, counts = [], {"ok": 0, "failed": 0}
+
+    async def send(name, data):
+        async with slots:
+            t0 = time.perf_counter()
+            resp = await client.post("/analyze", headers=headers, files={"file": (name, data, "application/pdf")})
+            latencies.append(time.perf_counter() - t0)
+            counts["ok" if resp.status_code == 200 else "failed"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[send(name, data) for name, data in pdfs])
+    elapsed = time.perf_counter() - start
+    return {"mode": "analyze x N", "elapsed_s": round(elapsed, 2), "files_per_sec": round(len(pdfs) / elapsed, 2),
+            "responses": counts, "latency": summarize(latencies)}
+
+
+async def batched(client: httpx.AsyncClient, headers: dict, pdfs: list) -> dict:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in pdfs:
+            archive.writestr(name, data)
+    first_line = None
+    statuses = {"ok": 0, "error": 0}
+    summary = {}
+    start = time.perf_counter()
+    async with client.stream("POST", "/analyze/batch", headers=headers,
+                             files={"files": ("resumes.zip", buf.getvalue(), "application/zip")}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line:
+                continue
+            first_line = first_line or time.perf_counter() - start
+            row = json.loads(line)
+            if row.get("status") == "done":
+                summary = row
+            else:
+                statuses[row.get("status", "error")] = statuses.get(row.get("status", "error"), 0) + 1
+    elapsed = time.perf_counter() - start
+    return {"mode": "analyze/batch (zip)", "elapsed_s": round(elapsed, 2), "files_per_sec": round(len(pdfs) / elapsed, 2),
+            "first_result_ms": round((first_line or 0) * 1000, 1), "results": statuses,
+            "saved": summary.get("analyzed")}
+
+
+async def run(base_url: str, token: str, fake: FakeGemini, args) -> list:
+    headers = {"Authorization": f"Bearer {token}"}
+    results = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=httpx.Limits(max_connections=args.concurrency + 2)) as client:
+        calls = fake.calls
+        results.append(await one_by_one(client, headers, synthetic_pdfs(args.files), args.concurrency))
+        results[-1]["gemini_calls"] = fake.calls - calls
+
+        calls = fake.calls
+        results.append(await batched(client, headers, synthetic_pdfs(args.files)))
+        results[-1]["gemini_calls"] = fake.calls - calls
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16, help="parallel /analyze requests in the baseline")
+    parser.add_argument("--gemini-latency", type=float, default=1.5)
+    parser.add_argument("--pdf-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    fake = FakeGemini(latency=args.gemini_latency).start()
+    proc, base_url = start_app({
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": fake.base_url,
+        "PDF_WORKERS": str(args.pdf_workers),
+    })
+    try:
+        token = register_user(base_url, "batch")
+        print(json.dumps(asyncio.run(run(base_url, token, fake, args)), indent=2))
+    finally:
+        proc.terminate()
+        proc.wait()
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
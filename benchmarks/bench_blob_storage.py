@@ -0,0 +1,74 @@
+"""Storage saved by resume_blobs on a seeded dataset.
+
+Seeds resumes in the old inline shape (--duplicates of them re-analyzing an
+earlier resume), records collection sizes, moves text and results into
+resume_blobs with migration v7, then reports sizes again alongside the
+blob-level dedup/compression numbers.
+
+    python -m benchmarks.bench_blob_storage --resumes 100000 --duplicates 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend import blobs, migrations
+from backend.config import MONGODB_URL
+from benchmarks.seed import seed
+
+
+async def _sizes(db) -> dict:
+    out = {}
+    for name in ("resumes", "resume_blobs"):
+        if name not in await db.list_collection_names():
+            out[name] = {"size": 0, "storageSize": 0}
+            continue
+        stats = await db.command("collStats", name)
+        out[name] = {"size": stats["size"], "storageSize": stats["storageSize"]}
+    return out
+
+
+async def run(args) -> dict:
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[args.db]
+    try:
+        for name in ("resumes", "resume_blobs", "schema_migrations"):
+            await db.drop_collection(name)
+        print(await seed(db, args.users, args.resumes, duplicates=args.duplicates))
+        before = await _sizes(db)
+
+        t0 = time.perf_counter()
+        await migrations.migrate(db)
+        elapsed = time.perf_counter() - t0
+        await db.command("compact", "resumes")  # return the freed space so storageSize reflects it
+        after = await _sizes(db)
+
+        report = await blobs.storage_report(db)
+        logical_before = before["resumes"]["size"]
+        logical_after = after["resumes"]["size"] + after["resume_blobs"]["size"]
+        return {
+            "resumes": args.resumes,
+            "duplicates": args.duplicates,
+            "migration_s": round(elapsed, 1),
+            "before": before,
+            "after": after,
+            "data_bytes_saved": logical_before - logical_after,
+            "data_reduction_pct": round((1 - logical_after / logical_before) * 100, 1) if logical_before else None,
+            "blobs": report["kinds"],
+        }
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    parser.add_argument("--db", default="resume_analyzer_bench_blobs")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
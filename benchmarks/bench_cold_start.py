@@ -0,0 +1,119 @@
+"""Cold-start latency of the first /history call, before and after the
+per-loop connection manager.
+
+Each case runs in a fresh child process that imports `main`, then issues
+/history through the ASGI app (no lifespan, as on Vercel) on a brand-new
+event loop `--loops` times. The first loop is a cold process start; the
+rest are warm restarts that reuse the process with a new loop. "legacy"
+swaps in the original ensure_db/connect_db (kept verbatim below), which
+rebuilt the client and re-ran every create_index on each new loop.
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+
+    python -m benchmarks.bench_cold_start --runs 5 --loops 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+import httpx
+from benchmarks.common import ROOT, summarize
+
+
+async def legacy_connect_db():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from backend import database, migrations
+    from backend.config import MONGODB_URL, DATABASE_NAME
+
+    if database.client is not None:
+        try:
+            database.client.close()
+        except Exception:
+            pass
+    database.client = AsyncIOMotorClient(MONGODB_URL)
+    database.db = database.client[DATABASE_NAME]
+    database._current_loop = asyncio.get_running_loop()
+    for _, step in migrations.MIGRATIONS:  # the old create_indexes
+        await step(database.db)
+
+
+async def legacy_ensure_db():
+    from backend import database
+
+    if database.db is None or database._current_loop is not asyncio.get_running_loop():
+        await legacy_connect_db()
+
+
+async def first_history(app, token: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        t0 = time.perf_counter()
+        resp = await client.get("/history", headers={"Authorization": f"Bearer {token}"})
+        resp.raise_for_status()
+        return time.perf_counter() - t0
+
+
+def child(mode: str, token: str, loops: int) -> dict:
+    t0 = time.perf_counter()
+    import main
+
+    import_s = time.perf_counter() - t0
+    if mode == "legacy":
+        main.ensure_db = legacy_ensure_db  # the middleware looks the name up in main
+    timings = [asyncio.run(first_history(main.app, token)) for _ in range(loops)]
+    return {"import_ms": round(import_s * 1000, 1), "cold_ms": round(timings[0] * 1000, 1), "warm_restarts": timings[1:]}
+
+
+async def register() -> str:
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"coldstart-{uuid.uuid4().hex[:10]}@example.com"
+        resp = await client.post("/auth/register", json={"name": "cold", "email": email, "password": "bench-pass-123"})
+        resp.raise_for_status()
+        return resp.json()["token"]
+
+
+def run_mode(mode: str, token: str, args) -> dict:
+    cold, warm, imports = [], [], []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_cold_start", "--child", mode, "--token", token, "--loops", str(args.loops)],
+            cwd=ROOT, env={**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY") or "fake"},
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        imports.append(result["import_ms"])
+        cold.append(result["cold_ms"] / 1000)
+        warm.extend(result["warm_restarts"])
+    return {
+        "mode": mode,
+        "import_ms_mean": round(sum(imports) / len(imports), 1),
+        "first_history_cold_process": summarize(cold),
+        "first_history_new_loop": summarize(warm),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    parser.add_argument("--loops", type=int, default=10, help="event loops per process (first one is the cold start)")
+    parser.add_argument("--child", choices=["legacy", "current"], help=argparse.SUPPRESS)
+    parser.add_argument("--token", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.token, args.loops)))
+        return
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    token = asyncio.run(register())
+    print(json.dumps([run_mode("legacy", token, args), run_mode("current", token, args)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
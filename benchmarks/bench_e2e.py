@@ -0,0 +1,369 @@
+"""End-to-end load benchmark: main:app on a seeded local MongoDB with a fake Gemini.
+
+For each --scales entry (users:resumes) the script seeds a database of its
+own, brings it to the current schema (migrations, leaderboard, rollups,
+/search index), and starts the app against a FakeGemini that replays
+gemini_responses.json with --llm-latency, --llm-jitter and --llm-error-rate.
+A run that wrote to the database (e.g. /analyze) makes the next run reseed,
+so every run starts from the same data. Then:
+
+1. calibration: every route in the mix alone, --calibrate sequential
+   requests; MongoDB commands per request come from the app's /metrics
+2. load: --concurrency clients pick routes by the --mix weights for
+   --duration seconds
+
+Afterwards a single-flight check (skip with --skip-singleflight) starts two
+app processes on the first scale's database with SINGLEFLIGHT_MONGO=1 and
+sends the same /job-match twice at once: to one process, then one to each.
+Both times the fake Gemini must see exactly one call and both callers the
+same answer; the second case goes through the MongoDB lease.
+
+Results (throughput, per-route p50/p95/p99 and status counts, MongoDB
+commands and Gemini calls per request) are written to --out, tagged with
+the git commit, so runs can be compared:
+
+    python -m benchmarks.bench_e2e --scales 500:5000,5000:50000 --out e2e-new.json
+    python -m benchmarks.bench_e2e --compare e2e-old.json e2e-new.json
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend import leaderboard, migrations, rollups, search_index
+from backend.config import MONGODB_URL
+from benchmarks.common import ROOT, SAMPLE_RESUME, resume_pdf, start_app, summarize
+from benchmarks.fake_gemini import FakeGemini
+from benchmarks.seed import seed
+
+RESPONSES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gemini_responses.json")
+PASSWORD = "bench-pass-123"  # seed.PASSWORD_HASH
+
+ROUTES = {  # name -> (method, path)
+    "analyze": ("POST", "/analyze"),
+    "job_match": ("POST", "/job-match"),
+    "history": ("GET", "/history"),
+    "leaderboard": ("GET", "/leaderboard"),
+    "admin_stats": ("GET", "/admin/stats"),
+    "admin_users": ("GET", "/admin/users"),
+    "admin_top_resumes": ("GET", "/admin/top-resumes"),
+    "admin_analytics": ("GET", "/admin/analytics"),
+    "admin_score_distribution": ("GET", "/admin/score-distribution"),
+}
+DEFAULT_MIX = (
+    "history=30,leaderboard=15,job_match=15,analyze=10,admin_stats=6,admin_users=6,"
+    "admin_top_resumes=6,admin_analytics=6,admin_score_distribution=6"
+)
+JOB_DESCRIPTIONS = [
+    "Senior Backend Engineer. Requirements: 5+ years Python, AWS, Kafka, Kubernetes, Terraform. "
+    "You will own payments APIs and on-call for settlement pipelines.",
+    "Data Analyst. Requirements: SQL, Python, dashboards, A/B testing, stakeholder communication. "
+    "You will build reporting for growth and product teams.",
+    "Frontend Developer. Requirements: React, TypeScript, GraphQL, accessibility, design systems. "
+    "You will ship customer-facing features weekly.",
+]
+_MONGO_COUNT = "resume_analyzer_mongo_command_seconds_count"
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ROUTES:
+            raise SystemExit(f"unknown route in --mix: {name!r} (known: {', '.join(ROUTES)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit() -> dict:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+async def prepare(db_name: str, users: int, resumes: int, duplicates: float) -> dict:
+    """Seed `db_name` and build everything the app derives from resumes."""
+    client = AsyncIOMotorClient(MONGODB_URL)
+    try:
+        db = client[db_name]
+        t0 = time.perf_counter()
+        seeded = await seed(db, users, resumes, duplicates=duplicates)
+        if seeded["seeded"]:
+            for name in await db.list_collection_names():
+                if name not in ("users", "resumes"):
+                    await db.drop_collection(name)  # derived data of the previous seed
+            await migrations.migrate(db)
+            await leaderboard.rebuild(db)
+            await rollups.rebuild(db)
+            await search_index.rebuild(db)
+        return {**seeded, "prepare_s": round(time.perf_counter() - t0, 1)}
+    finally:
+        client.close()
+
+
+class Session:
+    """Logged-in bench users, the seeded admin, and a pool of upload PDFs."""
+
+    def __init__(self, users: list, admin: dict, pdfs: list):
+        self.users = users
+        self.admin = admin
+        self.pdfs = pdfs
+
+    def request(self, name: str, rng: random.Random) -> dict:
+        method, path = ROUTES[name]
+        kwargs = {"method": method, "url": path}
+        kwargs["headers"] = self.admin if name.startswith("admin_") else rng.choice(self.users)
+        if name == "analyze":
+            i = rng.randrange(len(self.pdfs))
+            kwargs["files"] = {"file": (f"bench_{i}.pdf", self.pdfs[i], "application/pdf")}
+        elif name == "job_match":
+            kwargs["json"] = {"job_description": rng.choice(JOB_DESCRIPTIONS)}
+        return kwargs
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    resp = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['token']}"}
+
+
+async def mongo_commands(client: httpx.AsyncClient) -> int:
+    text = (await client.get("/metrics")).text
+    return sum(int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(_MONGO_COUNT))
+
+
+async def calibrate(client: httpx.AsyncClient, session: Session, fake: FakeGemini, mix: dict, args) -> dict:
+    rng = random.Random(args.seed)
+    out = {}
+    for name in mix:
+        before, calls = await mongo_commands(client), fake.calls
+        latencies, statuses = [], Counter()
+        for _ in range(args.calibrate):
+            t0 = time.perf_counter()
+            resp = await client.request(**session.request(name, rng))
+            latencies.append(time.perf_counter() - t0)
+            statuses[resp.status_code] += 1
+        ops = await mongo_commands(client) - before
+        out[name] = {
+            "mongo_ops_per_request": round(ops / args.calibrate, 2),
+            "llm_calls_per_request": round((fake.calls - calls) / args.calibrate, 2),
+            "statuses": {str(k): v for k, v in statuses.items()},
+            "latency": summarize(latencies),
+        }
+    return out
+
+
+async def load(client: httpx.AsyncClient, session: Session, fake: FakeGemini, mix: dict, args) -> dict:
+    names, weights = list(mix), list(mix.values())
+    latencies, statuses = defaultdict(list), defaultdict(Counter)
+
+    async def worker(i: int, deadline: float):
+        rng = random.Random(args.seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(**session.request(name, rng))
+                statuses[name][str(resp.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[name][type(e).__name__] += 1
+            latencies[name].append(time.perf_counter() - t0)
+
+    before, calls, errors = await mongo_commands(client), fake.calls, fake.errors
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(i, start + args.duration) for i in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+    ops = await mongo_commands(client) - before
+
+    total = sum(len(v) for v in latencies.values())
+    ok = sum(n for c in statuses.values() for status, n in c.items() if status.startswith("2"))
+    return {
+        "duration_s": round(elapsed, 1),
+        "concurrency": args.concurrency,
+        "requests": total,
+        "requests_per_sec": round(total / elapsed, 1),
+        "ok_per_sec": round(ok / elapsed, 1),
+        "mongo_ops_per_request": round(ops / total, 2) if total else None,
+        "llm_calls": fake.calls - calls,
+        "llm_errors": fake.errors - errors,
+        "latency": summarize([v for values in latencies.values() for v in values]),
+        "routes": {
+            name: {"requests": len(latencies[name]), "statuses": dict(statuses[name]), "latency": summarize(latencies[name])}
+            for name in names if latencies[name]
+        },
+    }
+
+
+async def drive(base_url: str, fake: FakeGemini, users: int, mix: dict, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        rng = random.Random(args.seed)
+        emails = [f"bench{i}@example.com" for i in rng.sample(range(1, users), min(args.logins, users - 1))]
+        session = Session(
+            await asyncio.gather(*[login(client, email) for email in emails]),
+            await login(client, "bench0@example.com"),  # seed makes user 0 an admin
+            [resume_pdf(pages=rng.randint(1, 3), seed=i) for i in range(args.pdfs)],
+        )
+        return {
+            "calibration": await calibrate(client, session, fake, mix, args),
+            "load": await load(client, session, fake, mix, args),
+        }
+
+
+def run_scale(users: int, resumes: int, mix: dict, args) -> dict:
+    db_name = f"{args.db_prefix}_{users}_{resumes}"
+    prepared = asyncio.run(prepare(db_name, users, resumes, args.duplicates))
+    print(f"[E2E] {users} users / {resumes} resumes ready: {prepared}")
+    fake = FakeGemini(
+        latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate,
+        responses=args.responses, seed=args.seed,
+    ).start()
+    proc, base_url = start_app({
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": fake.base_url,
+        "DATABASE_NAME": db_name,
+        "METRICS_ENABLED": "1",
+        **dict(kv.split("=", 1) for kv in args.env),
+    })
+    try:
+        result = asyncio.run(drive(base_url, fake, users, mix, args))
+    finally:
+        proc.terminate()
+        proc.wait()
+        fake.stop()
+    print(f"[E2E] {users}/{resumes}: {result['load']['requests_per_sec']} req/s, p95 {result['load']['latency']['p95_ms']} ms")
+    return {"users": users, "resumes": resumes, "database": db_name, "prepare": prepared, **result}
+
+
+async def coalesced_pair(clients: list, headers: dict, fake: FakeGemini) -> dict:
+    """Send one fresh /job-match body through each client at once; Gemini should see one call."""
+    body = {"job_description": f"{JOB_DESCRIPTIONS[0]} Ref {uuid.uuid4().hex}", "resume_text": SAMPLE_RESUME}
+    apps = list(dict.fromkeys(clients))  # one health read per process
+    before = [(await c.get("/debug/health")).json()["singleflight"] for c in apps]
+    calls = fake.calls
+    responses = await asyncio.gather(*[c.post("/job-match", headers=headers, json=body) for c in clients])
+    after = [(await c.get("/debug/health")).json()["singleflight"] for c in apps]
+    result = {
+        "statuses": [r.status_code for r in responses],
+        "llm_calls": fake.calls - calls,
+        "same_answer": all(r.json() == responses[0].json() for r in responses),
+    }
+    for counter in ("coalesced", "remote_coalesced"):
+        result[counter] = sum(a[counter] - b[counter] for a, b in zip(after, before))
+    return result
+
+
+async def drive_singleflight(urls: list, fake: FakeGemini) -> dict:
+    async with httpx.AsyncClient(base_url=urls[0], timeout=120) as a, httpx.AsyncClient(base_url=urls[1], timeout=120) as b:
+        headers = await login(a, "bench1@example.com")
+        return {
+            "same_process": await coalesced_pair([a, a], headers, fake),
+            "cross_process": await coalesced_pair([a, b], headers, fake),
+        }
+
+
+def check_singleflight(db_name: str, args) -> dict:
+    """Two duplicate /job-match calls, in one process and across two, must cost one Gemini call."""
+    fake = FakeGemini(latency=max(args.llm_latency, 1.0), responses=args.responses, seed=args.seed).start()
+    env = {
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": fake.base_url,
+        "DATABASE_NAME": db_name,
+        "SINGLEFLIGHT_MONGO": "1",
+        **dict(kv.split("=", 1) for kv in args.env),
+    }
+    apps = []
+    try:
+        apps = [start_app(env) for _ in range(2)]
+        result = asyncio.run(drive_singleflight([url for _, url in apps], fake))
+    finally:
+        for proc, _ in apps:
+            proc.terminate()
+            proc.wait()
+        fake.stop()
+    for case, row in result.items():
+        assert row["statuses"] == [200, 200] and row["llm_calls"] == 1 and row["same_answer"], f"{case}: {row}"
+    assert result["same_process"]["coalesced"] == 1, result
+    assert result["cross_process"]["remote_coalesced"] == 1, result
+    print(f"[E2E] single-flight: {result}")
+    return result
+
+
+def compare(old: dict, new: dict) -> dict:
+    """Per scale and route: new vs old throughput and latency percentiles, as % change."""
+    def pct(a, b):
+        return round((b - a) / a * 100, 1) if a else None
+
+    old_scales = {(s["users"], s["resumes"]): s for s in old["scales"]}
+    out = {"old": old.get("git"), "new": new.get("git"), "scales": {}}
+    for s in new["scales"]:
+        base = old_scales.get((s["users"], s["resumes"]))
+        if base is None:
+            continue
+        rows = {"requests_per_sec": pct(base["load"]["requests_per_sec"], s["load"]["requests_per_sec"])}
+        for route, stats in s["load"]["routes"].items():
+            prev = base["load"]["routes"].get(route)
+            if prev is None:
+                continue
+            rows[route] = {q: pct(prev["latency"][q], stats["latency"][q]) for q in ("p50_ms", "p95_ms", "p99_ms")}
+            prev_ops = base["calibration"].get(route, {}).get("mongo_ops_per_request")
+            ops = s["calibration"].get(route, {}).get("mongo_ops_per_request")
+            if prev_ops is not None and ops is not None:
+                rows[route]["mongo_ops_per_request"] = round(ops - prev_ops, 2)
+        out["scales"][f"{s['users']}:{s['resumes']}"] = rows
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="200:2000,2000:20000", help="comma-separated users:resumes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route=weight pairs; routes: " + ", ".join(ROUTES))
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of mixed load per scale")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--calibrate", type=int, default=20, help="sequential requests per route before the load")
+    parser.add_argument("--logins", type=int, default=20, help="seeded users the load is spread over")
+    parser.add_argument("--pdfs", type=int, default=200, help="distinct resumes uploaded to /analyze")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="seeded re-analyzed resume fraction")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake Gemini seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.3)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--responses", default=RESPONSES, help="recorded Gemini replies to replay")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app environment")
+    parser.add_argument("--db-prefix", default="resume_analyzer_bench_e2e")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench-e2e.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    parser.add_argument("--skip-singleflight", action="store_true", help="skip the two-process single-flight check")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            print(json.dumps(compare(json.load(f_old), json.load(f_new)), indent=2))
+        return
+
+    mix = parse_mix(args.mix)
+    scales = [tuple(int(n) for n in s.split(":")) for s in args.scales.split(",")]
+    report = {
+        "git": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        "scales": [run_scale(users, resumes, mix, args) for users, resumes in scales],
+    }
+    if not args.skip_singleflight:
+        report["singleflight"] = check_singleflight(f"{args.db_prefix}_{scales[0][0]}_{scales[0][1]}", args)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[E2E] results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
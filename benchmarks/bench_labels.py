@@ -0,0 +1,115 @@
+"""Label canonicalization check + MongoDB round trips per analysis.
+
+First asserts that backend.labels.similarity keeps labels that mean
+different things apart (a different technology, an extra qualifier) and
+still merges spelling and inflection variants, at LABEL_SIMILARITY_THRESHOLD.
+Then, against a local MongoDB (skipped with --check-only), canonicalizes
+synthetic analysis results into a scratch database and reports the
+commands issued per result with a cold and a warm in-process cache.
+
+    python -m benchmarks.bench_labels --results 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from backend import labels
+from backend.config import LABEL_SIMILARITY_THRESHOLD, MONGODB_URL
+
+DIFFERENT = [
+    ("Strong Python skills", "Strong Java skills"),
+    ("Kubernetes", "Kubernetes certification"),
+    ("Leadership experience", "Leadership"),
+    ("Lack of metrics", "Lack of quantified metrics"),
+    ("Java", "JavaScript"),
+    ("Limited AWS experience", "Limited GCP experience"),
+]
+SAME = [
+    ("Lack of quantified metrics", "lack of quantifying metrics."),
+    ("Code optimisation", "code optimization"),
+    ("Limited cloud experience", "Limited cloud experiance"),
+    ("No measurable achievements", "Missing measurable achievement"),
+    ("Weak project descriptions", "Weak project description"),
+]
+PHRASES = ["Lack of quantified metrics", "Weak summary section", "Limited cloud experience", "No leadership examples",
+           "Strong Python skills", "Clear project descriptions", "Docker", "Kubernetes", "CI/CD", "System design",
+           "Unit testing", "GraphQL", "Good use of action verbs", "Inconsistent formatting", "Missing GitHub link"]
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def check():
+    for a, b in DIFFERENT:
+        sim = labels.similarity(labels.normalize(a), labels.normalize(b))
+        assert sim < LABEL_SIMILARITY_THRESHOLD, f"{a!r} / {b!r} would merge ({sim:.2f})"
+    for a, b in SAME:
+        sim = labels.similarity(labels.normalize(a), labels.normalize(b))
+        assert sim >= LABEL_SIMILARITY_THRESHOLD, f"{a!r} / {b!r} would not merge ({sim:.2f})"
+
+
+def random_result(rng: random.Random) -> dict:
+    def pick(n):
+        return [rng.choice(PHRASES) + rng.choice(["", ".", "s", f" {rng.randint(1, 400)}"]) for _ in range(n)]
+    return {"strengths": pick(5), "weaknesses": pick(5), "missing_keywords": pick(8)}
+
+
+async def round_trips(args) -> dict:
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[counter])
+    db = client["resume_analyzer_bench_labels"]
+    await db.label_canon.drop()
+    await db.label_canon.create_index([("kind", 1), ("keys", 1)])
+    rng = random.Random(args.seed)
+    results = [random_result(rng) for _ in range(args.results)]
+    report = {}
+    try:
+        for phase in ("cold", "warm"):
+            if phase == "cold":
+                labels._cache.clear()
+            counter.count = 0
+            t0 = time.perf_counter()
+            for result in results:
+                await labels.canonicalize_result(db, result)
+            elapsed = time.perf_counter() - t0
+            report[phase] = {
+                "commands_per_result": round(counter.count / len(results), 2),
+                "ms_per_result": round(elapsed / len(results) * 1000, 2),
+            }
+        report["canonical_labels"] = await db.label_canon.count_documents({})
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=200, help="synthetic analysis results to canonicalize")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--check-only", action="store_true", help="only run the similarity check (no MongoDB)")
+    args = parser.parse_args()
+
+    check()
+    report = {"threshold": LABEL_SIMILARITY_THRESHOLD, "check": "ok"}
+    if not args.check_only:
+        report.update(asyncio.run(round_trips(args)))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark PDF text extraction over a synthetic 1-200 page corpus.
+
+Compares the original approach (`text += page.extract_text()` over every
+page) with backend.pdf_extract (page/time budgets, early stop, single join,
+process pool). Each mode runs in its own subprocess so peak RSS is per mode.
+
+    python -m benchmarks.bench_pdf_extract --docs 40
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from pypdf import PdfReader
+from benchmarks.common import resume_pdf
+
+PAGE_COUNTS = [1, 2, 5, 10, 25, 50, 100, 200]
+
+
+def build_corpus(docs: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [resume_pdf(rng.choice(PAGE_COUNTS), seed=i) for i in range(docs)]
+
+
+def baseline_extract(data: bytes) -> str:
+    reader = PdfReader(io.BytesIO(data))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() or ""
+    return text
+
+
+def run_mode(mode: str, docs: int) -> dict:
+    corpus = build_corpus(docs)
+    total_bytes = sum(len(d) for d in corpus)
+    if mode == "baseline":
+        t0 = time.perf_counter()
+        chars = sum(len(baseline_extract(d)) for d in corpus)
+        elapsed = time.perf_counter() - t0
+    else:
+        from backend import pdf_extract
+
+        async def extract_all():
+            # warm the pool first so worker spawn time isn't counted
+            await asyncio.gather(*[pdf_extract.extract_text_async(corpus[0]) for _ in range(pdf_extract.PDF_WORKERS)])
+            start = time.perf_counter()
+            texts = await asyncio.gather(*[pdf_extract.extract_text_async(d) for d in corpus])
+            return texts, time.perf_counter() - start
+
+        texts, elapsed = asyncio.run(extract_all())
+        chars = sum(len(t) for t in texts)
+        pdf_extract.shutdown(wait=True)
+
+    rss_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "mode": mode,
+        "docs": docs,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(docs / elapsed, 2),
+        "mb_per_sec": round(total_bytes / elapsed / 1e6, 2),
+        "chars_extracted": chars,
+        "peak_rss_mb": round(rss_self / 1024, 1),  # ru_maxrss is KiB on Linux
+        "peak_rss_worker_mb": round(rss_children / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--mode", choices=["baseline", "engine"], help="run a single mode in-process")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.docs)))
+        return
+
+    results = []
+    for mode in ("baseline", "engine"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pdf_extract", "--mode", mode, "--docs", str(args.docs)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
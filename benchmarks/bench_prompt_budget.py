@@ -0,0 +1,156 @@
+"""Prompt size before/after compaction on a synthetic resume + JD corpus.
+
+Resumes look like extracted multi-page PDFs: contact block, per-page
+header/footer and page numbers, bullet glyphs, ragged whitespace, long
+experience sections, hobbies and references. JDs carry company blurbs,
+benefits and an EEO statement. For each endpoint's prompt the script
+reports estimated tokens with the raw inputs vs. with backend.prompts
+compaction, plus compaction time. No MongoDB or Gemini needed.
+
+It first checks that resumes without recognised headings (and the same
+text extracted as one line) keep close to the full budget rather than
+being cut down to the name/title header.
+
+    python -m benchmarks.bench_prompt_budget --docs 500
+"""
+import argparse
+import json
+import random
+import time
+from backend import prompts
+from benchmarks.common import summarize
+from benchmarks.seed import KEYWORDS, ROLES_TEXT
+
+VERBS = ["Developed", "Built", "Designed", "Implemented", "Optimized", "Led", "Migrated", "Automated"]
+THINGS = ["payments API", "data pipeline", "search service", "CI/CD workflow", "React dashboard",
+          "ML ranking model", "billing system", "Kubernetes platform", "ETL jobs", "mobile backend"]
+BULLETS = ["•", "●", "▪", "-", "*"]
+
+
+def make_resume(rng: random.Random, i: int) -> str:
+    name = f"Candidate {i}"
+    pages = rng.randint(1, 4)
+    lines = [
+        name.upper(),
+        rng.choice(ROLES_TEXT),
+        f"Email: candidate{i}@example.com   |   Phone: +91 98{rng.randint(10000000, 99999999)}",
+        f"LinkedIn: linkedin.com/in/candidate{i}   GitHub: github.com/candidate{i}",
+        "Curriculum Vitae",
+        "PROFESSIONAL SUMMARY",
+        f"{rng.choice(ROLES_TEXT)} with {rng.randint(2, 15)} years of experience in " + ", ".join(rng.sample(KEYWORDS, 4)) + ".",
+        "WORK EXPERIENCE",
+    ]
+    for job in range(rng.randint(2, 6)):
+        start = rng.randint(2008, 2020)
+        lines.append(f"Company {job}    —    {rng.choice(ROLES_TEXT)}        {start} - {start + rng.randint(1, 4)}")
+        for _ in range(rng.randint(3, 8)):
+            lines.append(
+                f"{rng.choice(BULLETS)}   {rng.choice(VERBS)} a {rng.choice(THINGS)} using {rng.choice(KEYWORDS)}, "
+                f"improving throughput by {rng.randint(5, 80)}% for {rng.randint(1, 50)}K+ users."
+            )
+    lines += ["PROJECTS"] + [f"{rng.choice(BULLETS)} {rng.choice(THINGS).title()}: {rng.choice(VERBS).lower()} with {rng.choice(KEYWORDS)}" for _ in range(rng.randint(1, 4))]
+    lines += ["TECHNICAL SKILLS", ", ".join(rng.sample(KEYWORDS, 6)), "EDUCATION", f"B.Tech Computer Science, {rng.randint(2005, 2018)}"]
+    lines += ["CERTIFICATIONS", "AWS Certified Solutions Architect", "HOBBIES", "Chess, trekking, photography, reading"]
+    lines += ["DECLARATION", "I hereby declare that the above information is true to the best of my knowledge."]
+    lines += ["REFERENCES", "References available upon request"]
+
+    # split into pages with a running header/footer and page numbers
+    per_page = -(-len(lines) // pages)
+    out = []
+    for p in range(pages):
+        out.append(f"{name} - Resume")
+        out.extend(lines[p * per_page:(p + 1) * per_page])
+        out.append("")
+        out.append(f"Page {p + 1} of {pages}")
+    return "\n".join("  " * rng.randint(0, 2) + line + " " * rng.randint(0, 4) for line in out)
+
+
+def make_jd(rng: random.Random) -> str:
+    role = rng.choice(ROLES_TEXT)
+    return "\n".join([
+        f"{role} — Remote",
+        "About Us",
+        "We are a fast-growing fintech company on a mission to make payments simple for everyone. " * 3,
+        "What You'll Do",
+        *[f"- {rng.choice(VERBS)} {rng.choice(THINGS)}s with {rng.choice(KEYWORDS)}" for _ in range(6)],
+        "Requirements",
+        *[f"- {rng.randint(2, 8)}+ years with {k}" for k in rng.sample(KEYWORDS, 5)],
+        "Benefits",
+        "- Competitive salary and equity", "- Health, dental and vision", "- Unlimited PTO", "- Learning budget",
+        "We are an equal opportunity employer and value diversity. All applicants are considered without regard to race, "
+        "color, religion, sex, national origin, age or disability. We provide reasonable accommodation on request.",
+    ])
+
+
+UNKNOWN_HEADINGS = ["Career Summary", "Technical Proficiencies", "Academic Record"]
+
+
+def check_unsectioned(rng: random.Random, budget: int = prompts.PROMPT_RESUME_TOKENS):
+    """Resumes the section splitter doesn't recognise must still fill their budget."""
+    for i in range(20):
+        lines = [f"Candidate {i}", rng.choice(ROLES_TEXT)]
+        for heading in UNKNOWN_HEADINGS:
+            lines.append(heading)
+            lines += [
+                f"{rng.choice(VERBS)} a {rng.choice(THINGS)} using {rng.choice(KEYWORDS)}, "
+                f"improving throughput by {rng.randint(5, 80)}% for {rng.randint(1, 50)}K+ users."
+                for _ in range(rng.randint(10, 40))
+            ]
+        text = "\n".join(lines)
+        for label, variant in (("unknown headings", text), ("single line", " ".join(lines))):
+            want = min(budget, prompts.estimate_tokens(variant)) * 0.9
+            got = prompts.estimate_tokens(prompts.fit_resume(variant, budget))
+            assert want <= got <= budget + 1, f"{label}: kept {got} tokens, expected at least {want:.0f}"
+
+
+def measure(build, raw_inputs: list, fitted_inputs: list) -> tuple:
+    t0 = time.perf_counter()
+    prompt = build()
+    elapsed = time.perf_counter() - t0
+    after = prompts.estimate_tokens(prompt)
+    before = after - sum(map(prompts.estimate_tokens, fitted_inputs)) + sum(map(prompts.estimate_tokens, raw_inputs))
+    return before, after, elapsed
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    check_unsectioned(rng)
+    resumes = [make_resume(rng, i) for i in range(args.docs)]
+    jds = [make_jd(rng) for _ in range(args.docs)]
+    role = "Software Engineer"
+    cases = {
+        "analyze": lambda r, jd: (lambda: prompts.analysis(r), [r], [prompts.fit_resume(r)]),
+        "job_match": lambda r, jd: (lambda: prompts.job_match(r, jd), [r, jd], [prompts.fit_resume(r), prompts.fit_job_description(jd)]),
+        "career_plan": lambda r, jd: (lambda: prompts.career_plan(role, r), [r], [prompts.fit_resume(r, prompts.PROMPT_CONTEXT_TOKENS)]),
+        "hr_questions": lambda r, jd: (lambda: prompts.hr_questions(r), [r], [prompts.fit_resume(r)]),
+    }
+    results = {}
+    for name, case in cases.items():
+        before_total = after_total = 0
+        latencies = []
+        for r, jd in zip(resumes, jds):
+            build, raw, fitted = case(r, jd)
+            before, after, elapsed = measure(build, raw, fitted)
+            before_total += before
+            after_total += after
+            latencies.append(elapsed)
+        results[name] = {
+            "avg_tokens_before": round(before_total / len(resumes)),
+            "avg_tokens_after": round(after_total / len(resumes)),
+            "reduction_pct": round((1 - after_total / before_total) * 100, 1),
+            "build": summarize(latencies),
+        }
+        print(json.dumps({name: results[name]}))
+    return {"docs": args.docs, "avg_resume_chars": round(sum(map(len, resumes)) / len(resumes)), "endpoints": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Equivalence check + microbenchmark for backend.scoring.
+
+First asserts that scoring.score_resume() gives exactly the same score as
+the original calculate_resume_score (kept verbatim below) on a randomized
+corpus, then times both.
+
+    python -m benchmarks.bench_scoring --docs 5000
+"""
+import argparse
+import json
+import random
+import re
+import time
+from backend import scoring
+from benchmarks.common import SAMPLE_RESUME
+
+
+def legacy_calculate_resume_score(text: str):
+    score = 0
+    skills = ["python", "java", "c++", "machine learning", "sql", "aws", "react"]
+    skill_count = sum(1 for skill in skills if skill.lower() in text.lower())
+    score += min(skill_count * 3, 20)
+
+    numbers = re.findall(r"\d+%|\d+\+", text)
+    score += min(len(numbers) * 4, 20)
+
+    years = re.findall(r"\d+\s+years", text.lower())
+    score += min(len(years) * 5, 20)
+
+    verbs = ["developed", "built", "designed", "implemented", "optimized"]
+    verb_count = sum(1 for v in verbs if v in text.lower())
+    score += min(verb_count * 2, 10)
+
+    word_count = len(text.split())
+    if word_count > 300:
+        score += 15
+    elif word_count > 200:
+        score += 10
+
+    if "experience" in text.lower() and "education" in text.lower():
+        score += 15
+
+    return min(score, 100)
+
+
+VOCAB = (
+    scoring.SKILLS + scoring.ACTION_VERBS + scoring.SECTIONS
+    + ["JavaScript", "PYTHON", "Experienced", "years", "YEARS", "team", "led", "the", "C++17", "AWS-certified"]
+    + ["12%", "5+", "3 years", "10  years", "7\tYears", "100%+", "2019", "+", "%", "4+ years", "reacted"]
+    + ["\u0663 years", "5\u2003years", "8\x1cyears", "9%%", "yearsyears", "\u0130", "\u00b2%"]
+)
+
+
+def random_resume(rng: random.Random) -> str:
+    if rng.random() < 0.2:
+        return SAMPLE_RESUME * rng.randint(1, 6)
+    words = [rng.choice(VOCAB) for _ in range(rng.randint(0, 600))]
+    return "".join(w + rng.choice([" ", " ", "\n", "", ", "]) for w in words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [random_resume(rng) for _ in range(args.docs)] + ["", "x", "Experience Education"]
+
+    for text in corpus:
+        expected = legacy_calculate_resume_score(text)
+        got = scoring.score_resume(text)["score"]
+        assert got == expected, f"score mismatch ({got} != {expected}) for {text[:200]!r}"
+
+    t0 = time.perf_counter()
+    for text in corpus:
+        legacy_calculate_resume_score(text)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scoring.score_batch(corpus)
+    engine = time.perf_counter() - t0
+
+    print(json.dumps({
+        "docs": len(corpus),
+        "equivalent": True,
+        "legacy_docs_per_sec": round(len(corpus) / legacy),
+        "engine_docs_per_sec": round(len(corpus) / engine),
+        "speedup": round(legacy / engine, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""/search latency over a seeded corpus.
+
+Seeds a local MongoDB (default 20k users / 1M resumes, reused across runs),
+builds the inverted index once (`--reindex` to force), then times a mix of
+term, boolean and phrase queries, globally and scoped to one user.
+
+    python -m benchmarks.bench_search --users 20000 --resumes 1000000
+"""
+import argparse
+import asyncio
+import json
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend import migrations, search_index
+from backend.config import MONGODB_URL
+from benchmarks.common import summarize
+from benchmarks.seed import seed
+
+QUERIES = [
+    "terraform",
+    "kafka spark",
+    '"ml engineer"',
+    "graphql -typescript",
+    "kubernetes OR terraform",
+    '"devops engineer" docker',
+]
+
+
+async def timed(db, q: str, user_id: str, repeat: int) -> dict:
+    latencies, total = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        total = (await search_index.search(db, q, user_id=user_id, limit=20))["total"]
+        latencies.append(time.perf_counter() - t0)
+    return {"query": q, "scope": "user" if user_id else "global", "hits": total, **summarize(latencies)}
+
+
+async def run(args) -> list:
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[args.db]
+    seeded = await seed(db, args.users, args.resumes)
+    print(seeded)
+    await migrations.migrate(db)
+    if seeded["seeded"] or args.reindex or not await db.search_postings.estimated_document_count():
+        t0 = time.perf_counter()
+        print(f"[SEARCH] rebuild: {await search_index.rebuild(db)} in {time.perf_counter() - t0:.1f}s")
+
+    sample = await db.resumes.find_one({}, {"user_id": 1})
+    results = []
+    for q in QUERIES:
+        for user_id in (None, sample["user_id"]):
+            results.append(await timed(db, q, user_id, args.repeat))
+            print(json.dumps(results[-1]))
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--resumes", type=int, default=1000000)
+    parser.add_argument("--db", default="resume_analyzer_bench")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reindex", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Cold-start report: `-X importtime` summary and time to first response.
+
+Each run is a fresh interpreter (as on a Vercel cold start) that imports
+`main` and sends one request through the ASGI app without lifespan. The
+report has:
+
+- import: total `import main` time and self time per top-level package
+  (from `python -X importtime`), and whether google.genai / pypdf were loaded
+- first response: process spawn -> interpreter ready -> `main` imported ->
+  first response to --path (default /auth/me with a registered user, so
+  auth, the Mongo connection and the users lookup are included)
+- deferred: what the first Gemini call and the first PDF still pay (SDK
+  import + client construction, pypdf import)
+
+With --ref the same numbers are taken for another commit (checked out in a
+temporary git worktree) for a before/after comparison. --out writes JSON.
+
+Requires a local MongoDB for the default path (MONGO_URI); "/" with
+`--env DB_AUTO_MIGRATE=0` runs without one.
+
+    python -m benchmarks.bench_startup --runs 10 --ref HEAD~1 --out startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+import httpx
+from benchmarks.common import ROOT
+
+HEAVY = ("google.genai", "pypdf")
+
+# Runs in the checkout under test, which may predate this file.
+CHILD = """
+import asyncio, json, sys, time
+ready = time.time()
+t0 = time.perf_counter()
+import main
+import_s = time.perf_counter() - t0
+loaded = {name: name in sys.modules for name in %(heavy)r}
+import httpx
+
+async def first(path, token):
+    headers = {"Authorization": "Bearer " + token} if token else {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        t0 = time.perf_counter()
+        resp = await client.get(path, headers=headers)
+        return time.perf_counter() - t0, resp.status_code
+
+first_s, status = asyncio.run(first(%(path)r, %(token)r))
+done = time.time()
+
+t0 = time.perf_counter()
+from backend import llm
+build = getattr(llm, "_build_client", None) or (lambda: None)
+build()
+client_s = time.perf_counter() - t0
+t0 = time.perf_counter()
+import pypdf
+pypdf_s = time.perf_counter() - t0
+print(json.dumps({
+    "ready": ready, "done": done, "import_s": import_s, "first_s": first_s, "status": status,
+    "loaded": loaded, "gemini_client_s": client_s, "pypdf_s": pypdf_s,
+}))
+"""
+
+
+def _env(args) -> dict:
+    return {**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY") or "fake", **dict(kv.split("=", 1) for kv in args.env)}
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """(total `main` import in ms, {top-level package: self ms})."""
+    total, packages = 0.0, defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if name == "main":
+            total = int(cumulative_us) / 1000
+    return total, dict(packages)
+
+
+def importtime(cwd: str, args) -> dict:
+    totals, packages = [], defaultdict(list)
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=cwd, env=_env(args), capture_output=True, text=True, check=True,
+        )
+        total, per_package = parse_importtime(out.stderr)
+        totals.append(total)
+        for name, ms in per_package.items():
+            packages[name].append(ms)
+    top = sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))[:args.top]
+    return {
+        "import_main_ms": round(statistics.median(totals), 1),
+        "top_packages_self_ms": {name: round(statistics.median(ms), 1) for name, ms in top},
+    }
+
+
+def first_response(cwd: str, token: str, args) -> dict:
+    rows = []
+    for _ in range(args.runs):
+        spawned = time.time()
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD % {"heavy": HEAVY, "path": args.path, "token": token}],
+            cwd=cwd, env=_env(args), capture_output=True, text=True, check=True,
+        )
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        row["interpreter_s"] = row["ready"] - spawned
+        row["total_s"] = row["done"] - spawned
+        rows.append(row)
+
+    def median_ms(key):
+        return round(statistics.median(r[key] for r in rows) * 1000, 1)
+
+    return {
+        "path": args.path,
+        "statuses": sorted({r["status"] for r in rows}),
+        "interpreter_ms": median_ms("interpreter_s"),
+        "import_main_ms": median_ms("import_s"),
+        "first_response_ms": median_ms("first_s"),
+        "spawn_to_first_response_ms": median_ms("total_s"),
+        "loaded_at_import": rows[-1]["loaded"],
+        "deferred": {"gemini_client_ms": median_ms("gemini_client_s"), "pypdf_import_ms": median_ms("pypdf_s")},
+    }
+
+
+def measure(cwd: str, token: str, args) -> dict:
+    return {"import": importtime(cwd, args), "cold_start": first_response(cwd, token, args)}
+
+
+async def register(args) -> str:
+    sys.path.insert(0, ROOT)
+    os.environ.update(_env(args))
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"startup-{uuid.uuid4().hex[:10]}@example.com"
+        resp = await client.post("/auth/register", json={"name": "startup", "email": email, "password": "bench-pass-123"})
+        resp.raise_for_status()
+        return resp.json()["token"]
+
+
+def at_ref(ref: str, token: str, args) -> dict:
+    tree = tempfile.mkdtemp(prefix="bench-startup-")
+    subprocess.run(["git", "worktree", "add", "--detach", tree, ref], cwd=ROOT, check=True, capture_output=True)
+    try:
+        return measure(tree, token, args)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=ROOT, check=True, capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes per measurement")
+    parser.add_argument("--path", default="/auth/me", help="first request (GET)")
+    parser.add_argument("--top", type=int, default=12, help="packages listed in the import summary")
+    parser.add_argument("--ref", help="also measure this git ref, e.g. HEAD~1")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app environment")
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args()
+
+    token = asyncio.run(register(args)) if args.path.startswith(("/auth/me", "/history")) else ""
+    report = {"current": measure(ROOT, token, args)}
+    if args.ref:
+        report[args.ref] = at_ref(args.ref, token, args)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
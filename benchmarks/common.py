@@ -0,0 +1,125 @@
+"""Shared helpers for the benchmark scripts: synthetic PDFs, app startup, stats."""
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_RESUME = """Jane Doe - Senior Software Engineer
+Experience
+Developed a Python and SQL data platform serving 2M+ users, cutting latency by 35%.
+Built React dashboards and designed AWS pipelines over 6 years in fintech.
+Implemented machine learning ranking models and optimized Java services by 40%.
+Education
+B.Tech Computer Science, 2016
+Skills: Python, Java, C++, SQL, AWS, React, Docker, Kubernetes
+"""
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: list) -> bytes:
+    """Build a minimal text PDF. `pages` is a list of page strings."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # pages tree, filled in once the kids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page_text in pages:
+        lines = page_text.splitlines() or [""]
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            f"({_pdf_escape(line)}) '" for line in lines
+        ) + " ET"
+        stream_bytes = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def resume_pdf(pages: int = 1, seed: int = 0) -> bytes:
+    """A synthetic resume PDF with `pages` pages; `seed` varies the content."""
+    body = [f"{SAMPLE_RESUME}\nProject {seed}-{p}: shipped feature {p} for client {seed}." for p in range(pages)]
+    return make_pdf(body)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(latencies: list) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    ms = [v * 1000 for v in latencies]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 1),
+        "p95_ms": round(percentile(ms, 95), 1),
+        "p99_ms": round(percentile(ms, 99), 1),
+        "max_ms": round(max(ms), 1) if ms else 0.0,
+    }
+
+
+def start_app(env: dict, port: int = None) -> tuple:
+    """Start `main:app` under uvicorn in a subprocess. Returns (process, base_url)."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return proc, base_url
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("app did not start within 30s")
+
+
+def register_user(base_url: str, prefix: str = "bench") -> str:
+    """Register a throwaway user and return its bearer token."""
+    email = f"{prefix}-{uuid.uuid4().hex[:10]}@example.com"
+    resp = httpx.post(base_url + "/auth/register", json={"name": prefix, "email": email, "password": "bench-pass-123"}, timeout=30)
+    resp.raise_for_status()
+    return resp.json()["token"]
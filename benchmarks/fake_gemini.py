@@ -0,0 +1,185 @@
+"""Local stand-in for the Gemini REST API.
+
+Point the app at it with GEMINI_BASE_URL=http://127.0.0.1:<port>. Every
+generateContent call sleeps for `latency` seconds (+/- `jitter`) and returns
+a canned answer shaped like the real thing, picked from the prompt wording;
+streamGenerateContent sends the same answer in chunks spread over `latency`.
+With `responses` (a JSON file of recorded replies per prompt kind, see
+gemini_responses.json) the recorded texts are replayed round-robin instead.
+`error_rate` of the calls fail with the 503 UNAVAILABLE Gemini returns
+when overloaded.
+
+Run standalone:  python -m benchmarks.fake_gemini --port 8765 --latency 2
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS = {
+    "strengths": ["Quantified impact", "Strong Python background"],
+    "weaknesses": ["Lack of metrics in older roles", "No summary section"],
+    "missing_keywords": ["Docker", "CI/CD"],
+    "suggestions": ["Add a two-line summary", "Quantify the older roles"],
+    "hr_questions": [f"Question {i}?" for i in range(1, 6)],
+    "tips": ["Keep it to one page"],
+}
+
+JOB_MATCH = {
+    "match_score": 72,
+    "top_matches": ["Python", "AWS"],
+    "gaps": ["Kubernetes"],
+    "priority_keywords": ["Kubernetes", "Terraform"],
+    "rewrite_summary": "Lead with platform work and quantify scale.",
+    "bullet_rewrites": ["Built X that did Y, improving Z by 30%."],
+}
+
+CAREER_PLAN = {
+    "mentor_rules": ["Ship weekly"],
+    "hr_expectations": ["Clear ownership"],
+    "weekly_focus": [{"week": "Week 1", "goal": "Audit", "deliverables": ["Gap list"]}],
+    "daily_micro_tasks": ["Rewrite one bullet"],
+}
+
+HR_QUESTIONS = "\n".join(
+    f"{i}. Question: Tell me about project {i}.\n   Expected Answer: A STAR story about project {i}."
+    for i in range(1, 11)
+)
+
+
+def prompt_kind(prompt: str) -> str:
+    if "ATS resume evaluator" in prompt:
+        return "batch" if "=== Resume " in prompt else "analysis"
+    if "job description" in prompt.lower():
+        return "job_match"
+    if "30-day plan" in prompt:
+        return "career_plan"
+    if "Expected Answer" in prompt:
+        return "hr_questions"
+    return "other"
+
+
+def canned_response(prompt: str) -> str:
+    kind = prompt_kind(prompt)
+    if kind == "batch":  # /analyze/batch packs several resumes into one prompt
+        return json.dumps([{"index": i, **ANALYSIS} for i in range(prompt.count("=== Resume "))])
+    if kind == "hr_questions":
+        return HR_QUESTIONS
+    return json.dumps({"analysis": ANALYSIS, "job_match": JOB_MATCH, "career_plan": CAREER_PLAN}.get(kind, {}))
+
+
+STREAM_CHUNK_CHARS = 40  # roughly what Gemini sends per streamed chunk
+OVERLOADED = {"error": {"code": 503, "message": "The model is overloaded. Please try again later.", "status": "UNAVAILABLE"}}
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+
+class FakeGemini:
+    """Threaded HTTP server answering :generateContent requests."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 responses: str = None, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._replay = {}  # kind -> cycling iterator over recorded texts
+        if responses:
+            with open(responses) as f:
+                self._replay = {kind: itertools.cycle(texts) for kind, texts in json.load(f).items() if texts}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                delay, fail, text = server._next(_prompt_text(body))
+                if ":streamGenerateContent" in self.path and not fail:
+                    self._stream(text, delay)
+                    return
+                time.sleep(delay)
+                status, payload = (503, OVERLOADED) if fail else (200, {
+                    "candidates": [{
+                        "content": {"role": "model", "parts": [{"text": text}]},
+                        "finishReason": "STOP",
+                    }],
+                })
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, text: str, delay: float):
+                """SSE chunks of STREAM_CHUNK_CHARS, spread evenly over `delay`."""
+                chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for i, chunk in enumerate(chunks):
+                    time.sleep(delay / len(chunks))
+                    candidate = {"content": {"role": "model", "parts": [{"text": chunk}]}}
+                    if i == len(chunks) - 1:
+                        candidate["finishReason"] = "STOP"
+                    self.wfile.write(f"data: {json.dumps({'candidates': [candidate]})}\r\n\r\n".encode())
+                    self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    def _next(self, prompt: str) -> tuple:
+        """(delay, fail?, reply text) for one call; handler threads share the rng and replay cursors."""
+        kind = prompt_kind(prompt)
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+            self.errors += fail
+            replay = self._replay.get(kind)
+            # batch replies must match the number of packed resumes, so they are always generated
+            text = next(replay) if replay is not None and kind != "batch" else None
+        return delay, fail, text if text is not None else canned_response(prompt)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per generateContent call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds added to each call's latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with a 503")
+    parser.add_argument("--responses", help="JSON file of recorded replies per prompt kind")
+    args = parser.parse_args()
+    fake = FakeGemini(args.port, args.latency, args.jitter, args.error_rate, args.responses)
+    print(f"Fake Gemini listening on {fake.base_url} (latency {args.latency}s, errors {args.error_rate:.0%})")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
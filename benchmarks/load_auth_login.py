@@ -0,0 +1,93 @@
+"""Load test: concurrent /auth/login throughput and tail latency.
+
+Starts the app with the given BCRYPT_ROUNDS / BCRYPT_WORKERS, registers
+`--users` accounts, then has `--concurrency` clients log in back to back
+for `--duration` seconds. A separate probe samples GET / at the same time;
+with hashing off the event loop its latency should stay flat.
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+
+    python -m benchmarks.load_auth_login --duration 20 --concurrency 32 --rounds 12
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+import httpx
+from benchmarks.common import start_app, summarize
+
+PASSWORD = "bench-pass-123"
+
+
+async def register(client: httpx.AsyncClient, count: int) -> list:
+    emails = [f"login-{uuid.uuid4().hex[:10]}@example.com" for _ in range(count)]
+    for email in emails:
+        resp = await client.post("/auth/register", json={"name": "login", "email": email, "password": PASSWORD})
+        resp.raise_for_status()
+    return emails
+
+
+async def login_loop(client: httpx.AsyncClient, emails: list, offset: int, deadline: float, latencies: list, counts: dict):
+    i = offset
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        resp = await client.post("/auth/login", json={"email": emails[i % len(emails)], "password": PASSWORD})
+        latencies.append(time.perf_counter() - t0)
+        counts["ok" if resp.status_code == 200 else "failed"] += 1
+        i += 1
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, interval: float) -> list:
+    latencies = []
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - t0)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        emails = await register(client, args.users)
+        latencies, counts = [], {"ok": 0, "failed": 0}
+        start = time.perf_counter()
+        deadline = start + args.duration
+        logins = [login_loop(client, emails, n, deadline, latencies, counts) for n in range(args.concurrency)]
+        _, probe_latencies = await asyncio.gather(asyncio.gather(*logins), probe(client, deadline, 0.05))
+        elapsed = time.perf_counter() - start
+    return {
+        "rounds": args.rounds,
+        "workers": args.workers,
+        "logins_per_sec": round(counts["ok"] / elapsed, 1),
+        "responses": counts,
+        "login_latency": summarize(latencies),
+        "root_latency_during_load": summarize(probe_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS for the app")
+    parser.add_argument("--workers", type=int, default=4, help="BCRYPT_WORKERS for the app")
+    args = parser.parse_args()
+
+    proc, base_url = start_app({
+        "GEMINI_API_KEY": "fake",
+        "BCRYPT_ROUNDS": str(args.rounds),
+        "BCRYPT_WORKERS": str(args.workers),
+    })
+    try:
+        print(json.dumps(asyncio.run(run(base_url, args)), indent=2))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Load test: /history latency while /analyze saturates the LLM gateway.
+
+Starts a fake Gemini server with a fixed latency and the app under uvicorn,
+measures /history latency at rest, then again while `--analyze-workers`
+clients hammer /analyze. With Gemini off the event loop the two /history
+p99 figures should be close.
+
+Every /analyze upload is a different resume, so neither the analysis cache
+nor single-flight answers it and each request really reaches the gateway
+(fake_gemini_calls should roughly match the successful requests).
+
+Requires a local MongoDB (MONGO_URI, default mongodb://localhost:27017).
+
+    python -m benchmarks.load_llm_gateway --duration 20 --analyze-workers 32
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import httpx
+from benchmarks.common import register_user, resume_pdf, start_app, summarize
+from benchmarks.fake_gemini import FakeGemini
+
+
+async def sample_history(client: httpx.AsyncClient, headers: dict, duration: float, interval: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        resp = await client.get("/history", headers=headers)
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def analyze_loop(client: httpx.AsyncClient, headers: dict, seeds, stop: asyncio.Event, counts: dict):
+    while not stop.is_set():
+        pdf = resume_pdf(2, seed=next(seeds))  # distinct content: no cache or single-flight hits
+        try:
+            resp = await client.post("/analyze", headers=headers, files={"file": ("resume.pdf", pdf, "application/pdf")})
+            counts["ok" if resp.status_code == 200 else "failed"] += 1
+        except httpx.HTTPError:
+            counts["failed"] += 1
+
+
+async def run(base_url: str, token: str, args) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=args.analyze_workers + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        idle = await sample_history(client, headers, args.duration / 2, args.interval)
+
+        stop = asyncio.Event()
+        counts = {"ok": 0, "failed": 0}
+        seeds = itertools.count(int(time.time()))  # also distinct from earlier runs' cached results
+        workers = [asyncio.create_task(analyze_loop(client, headers, seeds, stop, counts)) for _ in range(args.analyze_workers)]
+        await asyncio.sleep(1)  # let the gateway queue fill up
+        loaded = await sample_history(client, headers, args.duration, args.interval)
+        health = (await client.get("/debug/health")).json()
+        stop.set()
+        await asyncio.gather(*workers)
+
+    return {
+        "history_idle": summarize(idle),
+        "history_under_analyze_load": summarize(loaded),
+        "analyze_requests": counts,
+        "llm_gateway": health.get("llm"),
+        "singleflight": health.get("singleflight"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of /history sampling under load")
+    parser.add_argument("--analyze-workers", type=int, default=32)
+    parser.add_argument("--gemini-latency", type=float, default=2.0)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="LLM_MAX_CONCURRENCY for the app")
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between /history samples")
+    args = parser.parse_args()
+
+    fake = FakeGemini(latency=args.gemini_latency).start()
+    proc, base_url = start_app({
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": fake.base_url,
+        "LLM_MAX_CONCURRENCY": str(args.max_concurrency),
+    })
+    try:
+        token = register_user(base_url, "gateway")
+        report = asyncio.run(run(base_url, token, args))
+        report["fake_gemini_calls"] = fake.calls
+        print(json.dumps(report, indent=2))
+    finally:
+        proc.terminate()
+        proc.wait()
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
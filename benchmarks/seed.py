@@ -0,0 +1,122 @@
+"""Seed a MongoDB database with synthetic users and resume analyses.
+
+Documents have the shape the app wrote before resume_blobs (text and result
+inline, see routes_auth.register and routes_resume.build_history_doc);
+migration v7 moves them into blobs. With --duplicates, that fraction of the
+resumes re-analyzes an earlier resume (same text and cached result).
+Seeding is idempotent per scale: an already seeded database with the same
+counts is left alone.
+
+    python -m benchmarks.seed --users 50000 --resumes 500000 --db resume_analyzer_bench
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend.config import MONGODB_URL
+from backend.scoring import score_resume
+from benchmarks.common import SAMPLE_RESUME
+
+WEAKNESSES = [
+    "Lack of metrics", "lack of quantified metrics.", "No summary section", "Too long",
+    "Generic objective statement", "Missing links to projects", "Inconsistent formatting",
+]
+KEYWORDS = ["Docker", "Kubernetes", "CI/CD", "Terraform", "GraphQL", "Kafka", "Spark", "TypeScript"]
+STRENGTHS = ["Quantified impact", "Strong Python background", "Clear structure", "Relevant projects"]
+ROLES_TEXT = ["Backend engineer", "Data analyst", "Frontend developer", "ML engineer", "DevOps engineer"]
+
+# bcrypt hash of "bench-pass-123"; hashing per user would dominate seeding time
+PASSWORD_HASH = "$2b$12$nQEbE8oLSZ4r7eLCUduaY.IH9lq8uAfq.CSdiaDvoOhQ0DKpzvI7W"
+
+
+def make_resume_text(rng: random.Random, i: int) -> str:
+    extra = " ".join(rng.choice(KEYWORDS + ROLES_TEXT) for _ in range(rng.randint(5, 60)))
+    return f"{SAMPLE_RESUME}\n{rng.choice(ROLES_TEXT)} #{i}: {rng.randint(1, 15)} years. {extra}"
+
+
+def make_result(rng: random.Random, score: int) -> dict:
+    return {
+        "algorithm_score": score,
+        "ai_analysis": "",
+        "strengths": rng.sample(STRENGTHS, 2),
+        "weaknesses": rng.sample(WEAKNESSES, 2),
+        "missing_keywords": rng.sample(KEYWORDS, 3),
+        "suggestions": ["Add a summary"],
+        "hr_questions": ["Tell me about yourself."],
+        "tips": ["Quantify results"],
+    }
+
+
+async def seed(db, users: int, resumes: int, seed_value: int = 1, batch: int = 5000, duplicates: float = 0.0) -> dict:
+    """Drop and refill users/resumes unless the counts already match."""
+    if await db.users.estimated_document_count() == users and await db.resumes.estimated_document_count() == resumes:
+        return {"users": users, "resumes": resumes, "seeded": False}
+
+    rng = random.Random(seed_value)
+    await db.users.drop()
+    await db.resumes.drop()
+    now = datetime.now(timezone.utc)
+
+    user_ids = []
+    docs = []
+    for i in range(users):
+        oid = ObjectId()
+        user_ids.append(str(oid))
+        docs.append({
+            "_id": oid,
+            "name": f"Bench User {i}",
+            "email": f"bench{i}@example.com",
+            "password": PASSWORD_HASH,
+            "role": "admin" if i == 0 else "user",
+            "created_at": now - timedelta(days=rng.randint(0, 365), seconds=i),
+        })
+        if len(docs) >= batch:
+            await db.users.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        await db.users.insert_many(docs, ordered=False)
+
+    docs = []
+    originals = []  # (text, score, result) of recent distinct resumes
+    for i in range(resumes):
+        if originals and rng.random() < duplicates:
+            text, score, result = rng.choice(originals)
+        else:
+            text = make_resume_text(rng, i)
+            score = score_resume(text)["score"]
+            result = make_result(rng, score)
+            originals = originals[-999:] + [(text, score, result)]
+        docs.append({
+            "user_id": rng.choice(user_ids),
+            "filename": f"resume_{i}.pdf",
+            "score": score,
+            "result": dict(result),
+            "resume_text": text,
+            "created_at": now - timedelta(days=rng.randint(0, 180), seconds=rng.randint(0, 86400)),
+        })
+        if len(docs) >= batch:
+            await db.resumes.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        await db.resumes.insert_many(docs, ordered=False)
+    return {"users": users, "resumes": resumes, "seeded": True}
+
+
+async def _main(args):
+    client = AsyncIOMotorClient(MONGODB_URL)
+    try:
+        print(await seed(client[args.db], args.users, args.resumes, args.seed, duplicates=args.duplicates))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--db", default="resume_analyzer_bench")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duplicates", type=float, default=0.0, help="fraction of re-analyzed resumes")
+    asyncio.run(_main(parser.parse_args()))
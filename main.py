@@ -1,8 +1,11 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from backend.database import connect_db, close_db, ensure_db
+from backend import auth, batch, blobs, jobs, llm, metrics, pdf_extract, prompts, singleflight
 from backend.routes_auth import router as auth_router
 from backend.routes_resume import router as resume_router
 from backend.routes_admin import router as admin_router
@@ -14,8 +17,12 @@ from backend.routes_admin import router as admin_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_db()
+    asyncio.get_running_loop().run_in_executor(None, llm.preload)  # off the first /analyze, in the background
     yield
+    await jobs.shutdown()
     await close_db()
+    pdf_extract.shutdown()
+    auth.shutdown()
 
 
 # ------------------------
@@ -29,16 +36,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
 
 @app.middleware("http")
 async def ensure_db_middleware(request: Request, call_next):
     """In serverless (Vercel), lifespan events don't run.
-    This ensures MongoDB is connected before every request."""
+    This ensures MongoDB is connected before every request; it is a no-op
+    unless the event loop changed, and never re-runs index creation."""
     await ensure_db()
     return await call_next(request)
 
+
+if metrics.ENABLED:
+    # registered last, so it wraps everything else (including ensure_db)
+    app.middleware("http")(metrics.http_middleware)
+
 # --- Register routers ---
 app.include_router(auth_router)
 app.include_router(resume_router)
@@ -50,16 +64,34 @@ async def root():
     return {"status": "ok", "message": "AI Resume Analyzer API"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (per process)."""
+    if not metrics.ENABLED:
+        return JSONResponse({"detail": "Metrics are disabled"}, status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/debug/health")
 async def debug_health():
     """Debug endpoint to check DB connection and env vars on Vercel."""
     import os
     from backend.database import get_db
+    from backend import database
     info = {
         "mongo_uri_set": bool(os.environ.get("MONGO_URI")),
         "jwt_secret_set": bool(os.environ.get("JWT_SECRET")),
         "gemini_key_set": bool(os.environ.get("GEMINI_API_KEY")),
         "db_connected": get_db() is not None,
+        "db_pool": database.get_stats(),
+        "llm_in_flight": llm.get_stats()["in_flight"],
+        "llm": llm.get_stats(),
+        "jobs": jobs.get_stats(),
+        "batch": batch.get_stats(),
+        "blobs": blobs.get_stats(),
+        "prompts": prompts.get_stats(),
+        "metrics": metrics.get_stats(),
+        "singleflight": singleflight.get_stats(),
     }
     # Test actual DB ping
     try:
@@ -11,6 +11,7 @@ import {
   TrendingUp,
   Trophy,
   Users,
+  Zap,
 } from "lucide-react";
 import { useEffect, useState } from "react";
 import {
@@ -32,6 +33,7 @@ import { useAuth } from "../context/AuthContext";
 import {
   getAdminActivity,
   getAdminAnalytics,
+  getAdminCacheStats,
   getAdminStats,
   getAdminTopResumes,
   getAdminUserResumes,
@@ -55,14 +57,18 @@ export default function AdminDashboard() {
 
   const [stats, setStats] = useState(null);
   const [users, setUsers] = useState([]);
+  const [usersCursor, setUsersCursor] = useState(null);
+  const [usersLoading, setUsersLoading] = useState(false);
   const [topResumes, setTopResumes] = useState([]);
   const [activity, setActivity] = useState([]);
   const [analytics, setAnalytics] = useState(null);
+  const [cacheStats, setCacheStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   // user drill-down
   const [expandedUser, setExpandedUser] = useState(null);
   const [userResumes, setUserResumes] = useState([]);
+  const [userResumesCursor, setUserResumesCursor] = useState(null);
   const [userResumesLoading, setUserResumesLoading] = useState(false);
 
   // activity days filter
@@ -79,18 +85,21 @@ export default function AdminDashboard() {
   async function loadAll() {
     setLoading(true);
     try {
-      const [s, u, t, act, an] = await Promise.all([
+      const [s, u, t, act, an, cs] = await Promise.all([
         getAdminStats(token),
         getAdminUsers(token),
         getAdminTopResumes(token),
         getAdminActivity(token, activityDays),
         getAdminAnalytics(token),
+        getAdminCacheStats(token).catch(() => null),
       ]);
       setStats(s);
-      setUsers(u);
+      setUsers(u.rows);
+      setUsersCursor(u.nextCursor);
       setTopResumes(t);
       setActivity(act);
       setAnalytics(an);
+      setCacheStats(cs);
     } catch (err) {
       console.error("Admin load error", err);
     }
@@ -106,22 +115,65 @@ export default function AdminDashboard() {
     }
   }
 
+  async function loadMoreUsers() {
+    setUsersLoading(true);
+    try {
+      const page = await getAdminUsers(token, usersCursor);
+      setUsers((prev) => [...prev, ...page.rows]);
+      setUsersCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Admin users load error", err);
+    }
+    setUsersLoading(false);
+  }
+
   async function toggleUserResumes(userId) {
     if (expandedUser === userId) {
       setExpandedUser(null);
       return;
     }
     setExpandedUser(userId);
+    setUserResumes([]);
+    setUserResumesCursor(null);
     setUserResumesLoading(true);
     try {
-      const data = await getAdminUserResumes(userId, token);
-      setUserResumes(data);
+      const page = await getAdminUserResumes(userId, token);
+      setUserResumes(page.rows);
+      setUserResumesCursor(page.nextCursor);
     } catch {
       setUserResumes([]);
     }
     setUserResumesLoading(false);
   }
 
+  async function loadMoreUserResumes() {
+    setUserResumesLoading(true);
+    try {
+      const page = await getAdminUserResumes(expandedUser, token, userResumesCursor);
+      setUserResumes((prev) => [...prev, ...page.rows]);
+      setUserResumesCursor(page.nextCursor);
+    } catch {
+      /* keep what is shown */
+    }
+    setUserResumesLoading(false);
+  }
+
+  /* prompt cache savings summed over /job-match and /career-plan */
+  const promptSavings = Object.values(cacheStats?.prompt_savings ?? {}).reduce(
+    (acc, s) => ({
+      calls: acc.calls + (s.calls ?? 0),
+      avoided: acc.avoided + (s.calls_avoided ?? 0),
+      tokens: acc.tokens + (s.tokens_saved ?? 0),
+    }),
+    { calls: 0, avoided: 0, tokens: 0 },
+  );
+  const promptHitRate =
+    promptSavings.calls + promptSavings.avoided > 0
+      ? Math.round(
+          (promptSavings.avoided / (promptSavings.calls + promptSavings.avoided)) * 100,
+        )
+      : 0;
+
   /* score distribution from stats bucket (we use admin/score-distribution or derive from analytics) */
   const scoreDist = [
     { range: "0-19", count: 0 },
@@ -205,6 +257,30 @@ export default function AdminDashboard() {
           />
         </div>
 
+        {/* AI Cache Savings */}
+        <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-8">
+          <KPICard
+            icon={<Zap className="w-5 h-5 text-purple-600" />}
+            label="AI Calls Avoided"
+            value={promptSavings.avoided.toLocaleString()}
+            sub="Job match & career plan cache"
+            color="text-purple-600"
+          />
+          <KPICard
+            icon={<Zap className="w-5 h-5 text-teal-600" />}
+            label="Est. Tokens Saved"
+            value={promptSavings.tokens.toLocaleString()}
+            color="text-teal-600"
+          />
+          <KPICard
+            icon={<Zap className="w-5 h-5 text-orange-600" />}
+            label="Cache Hit Rate"
+            value={`${promptHitRate}%`}
+            sub={`${promptSavings.calls.toLocaleString()} Gemini calls made`}
+            color="text-orange-600"
+          />
+        </div>
+
         {/* Charts Row */}
         <div className="grid lg:grid-cols-2 gap-6 mb-8">
           {/* Activity Timeline */}
@@ -420,7 +496,7 @@ export default function AdminDashboard() {
         {/* Users Table */}
         <Card>
           <h2 className="text-base font-semibold text-gray-900 dark:text-white flex items-center gap-2 mb-4">
-            <Users className="w-5 h-5 text-blue-500" /> Users ({users.length})
+            <Users className="w-5 h-5 text-blue-500" /> Users ({stats?.total_users ?? users.length})
           </h2>
 
           {/* Table header */}
@@ -481,7 +557,7 @@ export default function AdminDashboard() {
                 {/* Expanded user resumes */}
                 {expandedUser === u.id && (
                   <div className="ml-10 mb-3 mt-1">
-                    {userResumesLoading ? (
+                    {userResumesLoading && userResumes.length === 0 ? (
                       <SkeletonLoader rows={2} />
                     ) : userResumes.length === 0 ? (
                       <p className="text-sm text-gray-400 py-2">
@@ -518,6 +594,15 @@ export default function AdminDashboard() {
                             </div>
                           </div>
                         ))}
+                        {userResumesCursor && (
+                          <button
+                            onClick={loadMoreUserResumes}
+                            disabled={userResumesLoading}
+                            className="w-full py-1.5 text-xs text-blue-600 hover:underline disabled:opacity-50"
+                          >
+                            {userResumesLoading ? "Loading..." : "Load more"}
+                          </button>
+                        )}
                       </div>
                     )}
                   </div>
@@ -526,6 +611,18 @@ export default function AdminDashboard() {
             ))}
           </div>
 
+          {usersCursor && (
+            <div className="text-center pt-4">
+              <button
+                onClick={loadMoreUsers}
+                disabled={usersLoading}
+                className="px-4 py-2 bg-white dark:bg-gray-800 rounded-lg border border-gray-200 dark:border-gray-700 text-sm text-gray-600 dark:text-gray-300 hover:bg-gray-50 dark:hover:bg-gray-700 transition shadow-sm disabled:opacity-50"
+              >
+                {usersLoading ? "Loading..." : `Load more (${users.length} shown)`}
+              </button>
+            </div>
+          )}
+
           {users.length === 0 && (
             <p className="text-sm text-gray-400 text-center py-8">
               No users registered yet
@@ -10,7 +10,9 @@ export default function History() {
   const { token } = useAuth();
   const navigate = useNavigate();
   const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selected, setSelected] = useState(null);
   const [detailLoading, setDetailLoading] = useState(false);
 
@@ -21,14 +23,28 @@ export default function History() {
   async function loadHistory() {
     setLoading(true);
     try {
-      const data = await getHistory(token);
-      setItems(data);
+      const page = await getHistory(token);
+      setItems(page.rows);
+      setNextCursor(page.nextCursor);
     } catch {
       setItems([]);
+      setNextCursor(null);
     }
     setLoading(false);
   }
 
+  async function loadMore() {
+    setLoadingMore(true);
+    try {
+      const page = await getHistory(token, nextCursor);
+      setItems((prev) => [...prev, ...page.rows]);
+      setNextCursor(page.nextCursor);
+    } catch {
+      // keep what is shown; the button stays for a retry
+    }
+    setLoadingMore(false);
+  }
+
   async function handleView(id) {
     setDetailLoading(true);
     try {
@@ -163,6 +179,17 @@ export default function History() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="text-center pt-2">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 bg-blue-100 text-blue-700 rounded-lg text-sm hover:bg-blue-200 transition disabled:opacity-50"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
 
@@ -36,14 +36,14 @@ import ProgressBar from "../components/ui/ProgressBar";
 import SkeletonLoader from "../components/ui/SkeletonLoader";
 import { useAuth } from "../context/AuthContext";
 import {
-  analyzeResume,
   getCareerPlan,
   getJobMatch,
   deleteHistory,
-  generateHRQuestions,
   getLeaderboard,
   getHistory,
   getHistoryDetail,
+  streamAnalyzeResume,
+  streamHRQuestions,
 } from "../services/api";
 
 /* ---------- tiny tab button ---------- */
@@ -90,7 +90,9 @@ export default function UserDashboard() {
 
   // history
   const [history, setHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const [historyLoading, setHistoryLoading] = useState(true);
+  const [historyLoadingMore, setHistoryLoadingMore] = useState(false);
   const [selectedDetail, setSelectedDetail] = useState(null);
   const [detailLoading, setDetailLoading] = useState(false);
   const [leaderboard, setLeaderboard] = useState([]);
@@ -115,14 +117,28 @@ export default function UserDashboard() {
   async function loadHistory() {
     setHistoryLoading(true);
     try {
-      const data = await getHistory(token);
-      setHistory(data);
+      const page = await getHistory(token);
+      setHistory(page.rows);
+      setHistoryCursor(page.nextCursor);
     } catch {
       setHistory([]);
+      setHistoryCursor(null);
     }
     setHistoryLoading(false);
   }
 
+  async function loadMoreHistory() {
+    setHistoryLoadingMore(true);
+    try {
+      const page = await getHistory(token, historyCursor);
+      setHistory((prev) => [...prev, ...page.rows]);
+      setHistoryCursor(page.nextCursor);
+    } catch {
+      /* keep what is shown */
+    }
+    setHistoryLoadingMore(false);
+  }
+
   async function loadLeaderboard() {
     setLeaderboardLoading(true);
     try {
@@ -145,11 +161,36 @@ export default function UserDashboard() {
     setHrQuestions([]);
     setFileName(file.name);
     try {
-      const data = await analyzeResume(file, token);
-      setResult(data);
-      setTab("results");
-      loadHistory(); // refresh history sidebar
-      loadLeaderboard();
+      // Sections fill in as the model writes them; "result" is the saved analysis.
+      await streamAnalyzeResume(file, token, (event, data) => {
+        if (event === "score") {
+          setResult({
+            algorithm_score: data.algorithm_score,
+            ai_analysis: "",
+            strengths: [],
+            weaknesses: [],
+            missing_keywords: [],
+            suggestions: [],
+            hr_questions: [],
+            tips: [],
+          });
+          setTab("results");
+        } else if (event === "item") {
+          setResult((prev) => ({
+            ...prev,
+            [data.field]: [...(prev?.[data.field] || []), data.value],
+          }));
+        } else if (event === "field") {
+          setResult((prev) => ({ ...prev, [data.field]: data.value }));
+        } else if (event === "result") {
+          setResult(data);
+          setTab("results");
+          loadHistory(); // refresh history sidebar
+          loadLeaderboard();
+        } else if (event === "error") {
+          setError(data.detail);
+        }
+      });
     } catch (err) {
       setError(
         err.response?.data?.detail || "Failed to analyze. Please try again.",
@@ -170,9 +211,12 @@ export default function UserDashboard() {
 
     if (!sourceText) return;
     setHrLoading(true);
+    setHrQuestions([]);
     try {
-      const data = await generateHRQuestions(sourceText, token);
-      setHrQuestions(data.questions || []);
+      await streamHRQuestions(sourceText, token, (event, data) => {
+        if (event === "question") setHrQuestions((prev) => [...prev, data]);
+        else if (event === "done") setHrQuestions(data.questions || []);
+      });
     } catch {
       setHrQuestions([]);
     }
@@ -254,11 +298,13 @@ export default function UserDashboard() {
   }
 
   /* ---------- computed stats ---------- */
+  // over the loaded pages (newest first); totals come from the leaderboard row
   const scores = history.map((h) => h.score);
   const avgScore = scores.length
     ? Math.round(scores.reduce((a, b) => a + b, 0) / scores.length)
     : 0;
-  const bestScore = scores.length ? Math.max(...scores) : 0;
+  const bestScore = Math.max(myRank?.best_score ?? 0, ...scores, 0);
+  const totalAnalyses = Math.max(myRank?.analyses ?? 0, history.length);
   const improvement =
     scores.length >= 2 ? scores[0] - scores[scores.length - 1] : 0;
 
@@ -333,7 +379,7 @@ export default function UserDashboard() {
                 </div>
                 <div>
                   <p className="text-gray-500 dark:text-gray-400">Analyses</p>
-                  <p className="font-semibold text-gray-900 dark:text-white">{history.length}</p>
+                  <p className="font-semibold text-gray-900 dark:text-white">{totalAnalyses}</p>
                 </div>
               </div>
             </div>
@@ -345,7 +391,7 @@ export default function UserDashboard() {
           <MiniKPI
             icon={<FileText className="w-5 h-5 text-blue-500" />}
             label="Total Analyses"
-            value={history.length}
+            value={totalAnalyses}
           />
           <MiniKPI
             icon={<TrendingUp className="w-5 h-5 text-green-500" />}
@@ -723,6 +769,17 @@ export default function UserDashboard() {
                       </div>
                     </div>
                   ))}
+                  {historyCursor && (
+                    <div className="text-center pt-4">
+                      <button
+                        onClick={loadMoreHistory}
+                        disabled={historyLoadingMore}
+                        className="px-4 py-2 bg-white dark:bg-gray-800 rounded-lg border border-gray-200 dark:border-gray-700 text-sm text-gray-600 dark:text-gray-300 hover:bg-gray-50 dark:hover:bg-gray-700 transition shadow-sm disabled:opacity-50"
+                      >
+                        {historyLoadingMore ? "Loading..." : `Load more (${history.length} shown)`}
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </Card>
@@ -1135,7 +1192,7 @@ function ResultsView({
             </button>
           </div>
 
-          {hrLoading && (
+          {hrLoading && hrQuestions.length === 0 && (
             <div className="mt-4">
               <SkeletonLoader rows={5} />
             </div>
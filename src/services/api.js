@@ -10,6 +10,15 @@ function authHeaders(token) {
   return token ? { Authorization: `Bearer ${token}` } : {};
 }
 
+// One page of a keyset-paginated listing; pass nextCursor back for the next one.
+async function getPage(url, token, limit, cursor = null) {
+  const res = await axios.get(url, {
+    headers: authHeaders(token),
+    params: cursor ? { limit, cursor } : { limit },
+  });
+  return { rows: res.data, nextCursor: res.headers["x-next-cursor"] || null };
+}
+
 // --- Auth ---
 
 export async function registerUser(name, email, password) {
@@ -47,6 +56,54 @@ export async function analyzeResume(file, token) {
   return res.data;
 }
 
+// POST and read a text/event-stream response, calling onEvent(event, data) per
+// frame. Resolves when the stream ends; HTTP errors reject like axios does.
+async function postEventStream(url, body, headers, onEvent) {
+  const res = await fetch(url, { method: "POST", body, headers });
+  if (!res.ok || !res.headers.get("content-type")?.includes("text/event-stream")) {
+    const data = await res.json().catch(() => ({}));
+    const err = new Error(data.detail || `Request failed with status ${res.status}`);
+    err.response = { status: res.status, data };
+    throw err;
+  }
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
+// Events: score, item {field, value}, field {field, value}, result, error.
+export async function streamAnalyzeResume(file, token, onEvent) {
+  const formData = new FormData();
+  formData.append("file", file);
+  return postEventStream(`${API_BASE}/analyze/stream`, formData, authHeaders(token), onEvent);
+}
+
+// Events: question {question, expected_answer}, error, done {questions}.
+export async function streamHRQuestions(resumeText, token, onEvent) {
+  return postEventStream(
+    `${API_BASE}/generate-hr-questions/stream`,
+    JSON.stringify({ resume_text: resumeText }),
+    { "Content-Type": "application/json", ...authHeaders(token) },
+    onEvent,
+  );
+}
+
 export async function generateHRQuestions(resumeText, token) {
   const res = await axios.post(
     `${API_BASE}/generate-hr-questions`,
@@ -58,11 +115,8 @@ export async function generateHRQuestions(resumeText, token) {
 
 // --- History ---
 
-export async function getHistory(token) {
-  const res = await axios.get(`${API_BASE}/history`, {
-    headers: authHeaders(token),
-  });
-  return res.data;
+export async function getHistory(token, cursor = null) {
+  return getPage(`${API_BASE}/history`, token, 50, cursor);
 }
 
 export async function getHistoryDetail(id, token) {
@@ -119,18 +173,12 @@ export async function getAdminStats(token) {
   return res.data;
 }
 
-export async function getAdminUsers(token) {
-  const res = await axios.get(`${API_BASE}/admin/users`, {
-    headers: authHeaders(token),
-  });
-  return res.data;
+export async function getAdminUsers(token, cursor = null) {
+  return getPage(`${API_BASE}/admin/users`, token, 100, cursor);
 }
 
-export async function getAdminUserResumes(userId, token) {
-  const res = await axios.get(`${API_BASE}/admin/users/${userId}/resumes`, {
-    headers: authHeaders(token),
-  });
-  return res.data;
+export async function getAdminUserResumes(userId, token, cursor = null) {
+  return getPage(`${API_BASE}/admin/users/${userId}/resumes`, token, 50, cursor);
 }
 
 export async function getAdminTopResumes(token) {
@@ -154,6 +202,13 @@ export async function getAdminAnalytics(token) {
   return res.data;
 }
 
+export async function getAdminCacheStats(token) {
+  const res = await axios.get(`${API_BASE}/admin/cache-stats`, {
+    headers: authHeaders(token),
+  });
+  return res.data;
+}
+
 export async function getAdminScoreDistribution(token) {
   const res = await axios.get(`${API_BASE}/admin/score-distribution`, {
     headers: authHeaders(token),